@@ -10,8 +10,15 @@ import time
 import sys
 import os
 import math
-from camera_test import JetBotCamera
+import json
+import queue
+import argparse
+import threading
+from camera_test import JetBotCamera, lane_roi_crop
 from jetbot_hardware import JetBotController
+from latency_trace import LatencyTracer
+from frame_governor import FrameGovernor
+from debug_view import DebugRenderer
 
 class PIDController:
     """PID 제어기"""
@@ -24,12 +31,13 @@ class PIDController:
         
         self.prev_error = 0.0
         self.integral = 0.0
-        self.last_time = time.time()
+        self.last_time = time.monotonic()
     
-    def update(self, measurement):
-        """PID 업데이트"""
-        current_time = time.time()
-        dt = current_time - self.last_time
+    def update(self, measurement, dt=None):
+        """PID 업데이트 (dt가 없으면 직전 호출부터의 time.monotonic 간격)"""
+        current_time = time.monotonic()
+        if dt is None:
+            dt = current_time - self.last_time
         
         if dt <= 0.0:
             return 0.0
@@ -59,14 +67,35 @@ class PIDController:
         """PID 리셋"""
         self.prev_error = 0.0
         self.integral = 0.0
-        self.last_time = time.time()
+        self.last_time = time.monotonic()
 
 class LaneDetector:
-    """차선 검출 클래스"""
+    """
+    차선 검출 클래스 (허프 변환)
+    다른 검출 방식도 이 클래스를 상속해 get_lane_center()와 같은 값을 반환 (lane_detectors.py 참고)
+    """
+    
+    # 검출기 등록 이름 (lane_detectors.DETECTORS)
+    backend = 'hough'
+    
+    # 설정 파일로 저장/로드하는 튜닝 파라미터 (lane_param_sweep.py로 탐색)
+    TUNABLE_PARAMS = ('roi_height_ratio', 'canny_low', 'canny_high', 'hough_threshold',
+                      'hough_min_line_length', 'hough_max_line_gap',
+                      'yellow_lower', 'yellow_upper', 'white_lower', 'white_upper')
     
     def __init__(self, roi_height_ratio=0.6):
         self.roi_height_ratio = roi_height_ratio
         
+        # 입력 프레임 형식 (카메라 파이프라인에서 crop/변환된 경우)
+        self.pixel_format = 'BGR'
+        self.pre_cropped = False
+        
+        # 단계별 지연 추적기 (latency_trace.LatencyTracer, 없으면 기록 안 함)
+        self.tracer = None
+        
+        # 내부 단계 프로파일러 (enable_profiling, cvtColor/블러/inRange/Canny/허프/분류 시간)
+        self.profiler = None
+        
         # HSV 색상 범위 (노란색과 흰색 차선)
         self.yellow_lower = np.array([15, 100, 100])
         self.yellow_upper = np.array([35, 255, 255])
@@ -83,26 +112,161 @@ class LaneDetector:
         self.hough_threshold = 50
         self.hough_min_line_length = 100
         self.hough_max_line_gap = 50
+        
+        # 허프 파라미터는 640px 폭 기준, 해상도가 바뀌면 배율 적용
+        self.reference_width = 640
+        self.hough_scale = 1.0
+        
+        # 직선 분류/피팅을 NumPy 배열 연산으로 처리 (False면 기존 반복문 방식)
+        self.vectorized_lines = True
+        
+        # BGR → 색상 마스크 룩업 테이블 (color_lut.ColorMaskLUT, None이면 HSV 변환 사용)
+        self.color_lut = None
     
-    def preprocess_frame(self, frame):
-        """프레임 전처리"""
-        height, width = frame.shape[:2]
+    def set_input_format(self, pixel_format='BGR', pre_cropped=False):
+        """
+        입력 프레임 형식 설정
+        pixel_format: 'BGR', 'GRAY8', 'I420' (JetBotCamera.frame_format() 참고)
+        pre_cropped: 카메라 파이프라인에서 이미 ROI만 잘라낸 경우 True
+        """
+        if pixel_format not in ('BGR', 'GRAY8', 'I420'):
+            raise ValueError(f"지원하지 않는 픽셀 포맷: {pixel_format}")
+        
+        self.pixel_format = pixel_format
+        self.pre_cropped = pre_cropped
+    
+    def enable_color_lut(self, bits=6, cache_dir=None):
+        """
+        색상 검출을 양자화 BGR 룩업 테이블 조회로 대체
+        테이블은 HSV 임계값이 바뀌면 다시 만들고, 임계값별로 디스크에 캐시
+        """
+        from color_lut import ColorMaskLUT, DEFAULT_CACHE_DIR
+        
+        self.color_lut = ColorMaskLUT(bits, cache_dir if cache_dir is not None else DEFAULT_CACHE_DIR)
+        self.color_lut.build(self.color_ranges())
+    
+    def enable_profiling(self, capacity=1024):
+        """내부 단계별 처리 시간 기록 시작 (최근 capacity 프레임), 반환값: 프로파일러"""
+        from latency_trace import LatencyTracer, DETECTOR_STAGES
         
-        # ROI 설정 (관심 영역만 추출)
-        roi_top = int(height * (1 - self.roi_height_ratio))
-        roi = frame[roi_top:height, 0:width]
+        self.profiler = LatencyTracer(DETECTOR_STAGES, capacity)
+        return self.profiler
+    
+    def disable_profiling(self):
+        """단계별 처리 시간 기록 중지, 반환값: 기록하던 프로파일러 (없으면 None)"""
+        profiler, self.profiler = self.profiler, None
+        return profiler
+    
+    def get_params(self):
+        """튜닝 파라미터 딕셔너리 (JSON 저장용, HSV 범위는 리스트)"""
+        params = {}
+        for name in self.TUNABLE_PARAMS:
+            value = getattr(self, name)
+            params[name] = [int(v) for v in value] if isinstance(value, np.ndarray) else value
+        return params
+    
+    def set_params(self, params):
+        """튜닝 파라미터 적용 (모르는 이름은 ValueError)"""
+        unknown = set(params) - set(self.TUNABLE_PARAMS)
+        if unknown:
+            raise ValueError(f"알 수 없는 차선 검출 파라미터: {', '.join(sorted(unknown))}")
+        
+        for name, value in params.items():
+            if name.endswith(('_lower', '_upper')):
+                value = np.array(value)
+            setattr(self, name, value)
+        self.reset()
+    
+    def load_config(self, filename):
+        """JSON 설정 파일에서 튜닝 파라미터 로드"""
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+            # lane_param_sweep.py 결과 파일은 파라미터를 "params" 아래에 저장
+            self.set_params(config.get("params", config))
+            print(f"차선 검출 설정 로드: {filename}")
+            return True
+        except (OSError, ValueError) as e:
+            print(f"차선 검출 설정 로드 실패: {e}")
+            return False
+    
+    def save_config(self, filename, **extra):
+        """튜닝 파라미터를 JSON 설정 파일로 저장 (extra는 측정 결과 등 참고용)"""
+        try:
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(dict(extra, params=self.get_params()), f, indent=2, ensure_ascii=False)
+            return True
+        except OSError as e:
+            print(f"차선 검출 설정 저장 실패: {e}")
+            return False
+    
+    def color_ranges(self):
+        """차선 색상 HSV 범위 목록 [(lower, upper), ...]"""
+        return ((self.yellow_lower, self.yellow_upper), (self.white_lower, self.white_upper))
+    
+    def _roi_bounds(self, frame):
+        """ROI 범위 (roi_top, height, width)"""
+        if self.pixel_format == 'I420':
+            # I420은 Y 평면(H행) 아래에 U/V 평면(H/2행)이 붙어 있음
+            height = frame.shape[0] * 2 // 3
+        else:
+            height = frame.shape[0]
+        width = frame.shape[1]
         
-        # 그레이스케일 변환
-        gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
+        # ROI 설정 (관심 영역만 추출, 파이프라인에서 잘랐으면 전체 사용)
+        roi_top = 0 if self.pre_cropped else int(height * (1 - self.roi_height_ratio))
+        return roi_top, height, width
+    
+    def extract_roi(self, frame):
+        """색상 검출용 ROI만 추출 (그레이스케일/블러 생략), 반환값: (roi, roi_top)"""
+        roi_top, height, width = self._roi_bounds(frame)
+        
+        if self.pixel_format == 'I420':
+            return cv2.cvtColor(frame, cv2.COLOR_YUV2BGR_I420)[roi_top:height, 0:width], roi_top
+        
+        return frame[roi_top:height, 0:width], roi_top
+    
+    def preprocess_frame(self, frame):
+        """프레임 전처리"""
+        roi_top, height, width = self._roi_bounds(frame)
+        
+        if self.pixel_format == 'GRAY8':
+            # 이미 그레이스케일이므로 변환 생략
+            roi = frame[roi_top:height, 0:width]
+            gray = roi
+        elif self.pixel_format == 'I420':
+            # Y 평면이 곧 그레이스케일, 색상 검출용 BGR만 변환
+            gray = frame[roi_top:height, 0:width]
+            roi = cv2.cvtColor(frame, cv2.COLOR_YUV2BGR_I420)[roi_top:height, 0:width]
+        else:
+            roi = frame[roi_top:height, 0:width]
+            
+            # 그레이스케일 변환
+            gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
+        self._profile('gray')
         
         # 가우시안 블러
         blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+        self._profile('blur')
         
         return roi, gray, blurred, roi_top
     
     def detect_color_lanes(self, frame):
         """색상 기반 차선 검출"""
+        if frame.ndim == 2:
+            # 그레이스케일 입력은 색상 정보가 없으므로 밝기(흰색 차선)만 사용
+            mask = cv2.inRange(frame, int(self.white_lower[2]), 255)
+            self._profile('inrange')
+            return mask
+        
+        if self.color_lut is not None:
+            # 테이블 조회 한 번으로 노란색/흰색 마스크 생성
+            mask = self.color_lut.apply(frame, self.color_ranges())
+            self._profile('inrange')
+            return mask
+        
         hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+        self._profile('hsv')
         
         # 노란색과 흰색 차선 마스크
         yellow_mask = cv2.inRange(hsv, self.yellow_lower, self.yellow_upper)
@@ -110,6 +274,7 @@ class LaneDetector:
         
         # 마스크 결합
         combined_mask = cv2.bitwise_or(yellow_mask, white_mask)
+        self._profile('inrange')
         
         return combined_mask
     
@@ -124,9 +289,9 @@ class LaneDetector:
             binary_image,
             self.hough_rho,
             self.hough_theta,
-            self.hough_threshold,
-            minLineLength=self.hough_min_line_length,
-            maxLineGap=self.hough_max_line_gap
+            max(1, int(self.hough_threshold * self.hough_scale)),
+            minLineLength=self.hough_min_line_length * self.hough_scale,
+            maxLineGap=self.hough_max_line_gap * self.hough_scale
         )
         
         return lines
@@ -179,34 +344,107 @@ class LaneDetector:
         
         return poly
     
+    def classify_lines_vectorized(self, lines, image_width):
+        """
+        직선을 좌측/우측 차선으로 분류 (classify_lines와 같은 기준, 배열 연산 한 번에 처리)
+        반환값: (left[N,4], right[M,4]) 선분 배열
+        """
+        if lines is None or len(lines) == 0:
+            empty = np.empty((0, 4), dtype=np.int32)
+            return empty, empty
+        
+        segments = lines.reshape(-1, 4)
+        x1, y1, x2, y2 = segments.T
+        dx = x2 - x1
+        
+        # 수직선(dx=0)은 기울기 0으로 두어 양쪽 모두에서 제외
+        vertical = dx == 0
+        slope = (y2 - y1) / np.where(vertical, 1, dx)
+        slope[vertical] = 0.0
+        
+        left = (slope < -0.3) & (np.maximum(x1, x2) < image_width * 0.6)
+        right = (slope > 0.3) & (np.minimum(x1, x2) > image_width * 0.4)
+        
+        return segments[left], segments[right]
+    
+    def fit_line(self, segments):
+        """
+        선분 끝점들로 x = a*y + b 최소자승 피팅 (average_line과 같은 결과)
+        추적기와 같은 lane_tracking.fit_points(정규방정식 닫힌 해)를 사용
+        """
+        from lane_tracking import fit_points
+        
+        if len(segments) == 0:
+            return None
+        
+        return fit_points(segments[:, 0::2].ravel(), segments[:, 1::2].ravel())
+    
+    def reset(self):
+        """프레임 간 상태 초기화 (해상도/ROI가 바뀐 경우, 상태가 있는 검출기에서 재정의)"""
+        pass
+    
+    def _trace(self, stage):
+        """지연 추적기에 단계 완료 기록"""
+        if self.tracer is not None:
+            self.tracer.mark(stage)
+    
+    def _profile(self, stage):
+        """프로파일러에 내부 단계 완료 기록 (다른 스레드에서 꺼도 안전하도록 한 번만 읽음)"""
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.mark(stage)
+    
     def get_lane_center(self, frame):
         """차선 중앙 위치 계산"""
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.begin_frame(profiler.count)
+        
         roi, gray, blurred, roi_top = self.preprocess_frame(frame)
         height, width = roi.shape[:2]
+        self._trace('preprocess')
         
         # 색상 기반 검출
         color_mask = self.detect_color_lanes(roi)
+        self._trace('color_mask')
         
         # 엣지 기반 검출
         edge_mask = self.detect_edge_lanes(blurred)
+        self._trace('canny')
+        self._profile('canny')
         
         # 마스크 결합
         combined_mask = cv2.bitwise_or(color_mask, edge_mask)
+        self._profile('combine')
         
         # 직선 검출
         lines = self.find_lane_lines(combined_mask)
+        self._trace('hough')
+        self._profile('hough')
         
         if lines is None:
             return None, None, roi, combined_mask
         
-        # 좌/우 차선 분류
-        left_lines, right_lines = self.classify_lines(lines, width)
+        # 좌/우 차선 분류 및 평균 직선 계산
+        if self.vectorized_lines:
+            left_lines, right_lines = self.classify_lines_vectorized(lines, width)
+            self._profile('classify')
+            left_poly = self.fit_line(left_lines)
+            right_poly = self.fit_line(right_lines)
+        else:
+            left_lines, right_lines = self.classify_lines(lines, width)
+            self._profile('classify')
+            left_poly = self.average_line(left_lines)
+            right_poly = self.average_line(right_lines)
         
-        # 평균 직선 계산
-        left_poly = self.average_line(left_lines)
-        right_poly = self.average_line(right_lines)
+        lane_center = self.lane_center_from_polys(left_poly, right_poly, height, width)
         
-        # 차선 중앙 계산
+        self._trace('fit')
+        self._profile('fit')
+        return lane_center, (left_poly, right_poly), roi, combined_mask
+    
+    def lane_center_from_polys(self, left_poly, right_poly, height, width):
+        """좌/우 차선 직선(x = a*y + b)으로 ROI 하단의 차선 중앙 계산"""
         lane_center = None
         y_eval = height - 1  # 화면 하단
         
@@ -224,15 +462,21 @@ class LaneDetector:
             right_x = right_poly[0] * y_eval + right_poly[1]
             lane_center = right_x - width * 0.3  # 추정
         
-        return lane_center, (left_poly, right_poly), roi, combined_mask
+        return lane_center
 
 class AutonomousDriving:
     """자율주행 시스템"""
     
-    def __init__(self):
-        self.camera = JetBotCamera(width=640, height=480, fps=30)
+    # 디버그 창 키 → 제어 명령 (control_channel.COMMANDS)
+    KEY_COMMANDS = {27: 'quit', ord('l'): 'stats', ord('s'): 'toggle', ord('d'): 'debug', ord('p'): 'profile'}
+    
+    def __init__(self, camera=None, recorder=None, governor=None, stream=None, detector=None):
+        if camera is None:
+            camera = JetBotCamera(width=640, height=480, fps=30, threaded=True, buffer_count=4)
+        self.camera = camera
         self.controller = JetBotController()
-        self.lane_detector = LaneDetector()
+        # detector: LaneDetector 또는 get_lane_center()가 같은 값을 반환하는 하위 클래스 (birdseye.BirdsEyeDetector 등)
+        self.lane_detector = detector if detector is not None else LaneDetector()
         
         # PID 제어기 (조향용)
         self.steering_pid = PIDController(kp=0.5, ki=0.1, kd=0.2, setpoint=0.0)
@@ -249,6 +493,69 @@ class AutonomousDriving:
         # 성능 모니터링
         self.frame_count = 0
         self.start_time = time.time()
+        
+        # 주행 세션 녹화기 (session_recorder.SessionRecorder, 선택)
+        self.recorder = recorder
+        
+        # 해상도/ROI/처리 FPS 조절기 (frame_governor.FrameGovernor, 선택)
+        self.governor = governor
+        self.process_fps = None
+        self.process_size = None
+        self._source_width = 640
+        self._frame_width = None
+        self._base_frame_size = None
+        self._base_output_size = None
+        self._resize_buffer = None
+        # 주행 시작 시 검출기의 ROI 비율 (--config 값, 조절기 단계는 이 값에 배율을 곱함)
+        self._configured_roi_ratio = None
+        
+        # 파이프라인 모드에서는 카메라 출력 크기 변경을 캡처 단계가 읽기 사이에 적용
+        # (인식 스레드가 읽기 중인 카메라를 다시 시작하지 않도록 요청만 남김)
+        self._defer_resize = False
+        self._resize_requested = False
+        self._requested_output_size = None
+        
+        # 캡처부터 모터 명령까지 단계별 지연 추적
+        self.tracer = LatencyTracer()
+        self.lane_detector.tracer = self.tracer
+        
+        # 프레임 간 차선 추적기 (lane_tracking.LaneTracker, None이면 매 프레임 전체 검출)
+        self.lane_tracker = None
+        
+        # 차선 상태 칼만 필터 (lane_state.LaneStateEstimator, 선택)
+        # detect_every=K면 K 프레임마다 검출하고 나머지 프레임은 예측값으로 제어
+        self.lane_state = None
+        self.detect_every = 1
+        self._last_command = (0.0, 0.0)
+        self._last_control_time = None
+        
+        # 고정 주기 제어 (Hz, None이면 프레임마다 제어)
+        # 인식은 publish_target()으로 최신 차선 중앙만 넘기고, 제어 스레드가 PID/슬루 제한/모터 갱신
+        # target_timeout(초) 동안 새 목표가 없으면 인식이 멈춘 것으로 보고 정지
+        self.control_rate = None
+        self.target_timeout = 0.5
+        
+        # 모터 워치독 (초, None이면 사용 안 함): 새 명령이 기한 안에 없으면 watchdog_speed로 감속
+        self.watchdog_deadline = None
+        self.watchdog_speed = 0.0
+        self._target = None
+        self._applied_target = None
+        self._applied_timestamp = None
+        
+        # 디버그 화면 렌더러 (debug_view.DebugRenderer, 시작할 때 생성)
+        # 주행 루프는 debug_fps 주기로 스냅샷만 넘기고 그리기/imshow/waitKey는 렌더링 스레드에서 처리
+        self.debug_renderer = None
+        self.debug_fps = 10
+        
+        # 헤드리스 제어 채널 (control_channel.StdinControl/SocketControl)과
+        # 프레임별 텔레메트리 기록기 (telemetry.TelemetryWriter), 선택
+        self.control_channel = None
+        self.telemetry = None
+        
+        # 원격 디버그 화면 (mjpeg_server.MJPEGServer, 선택)
+        # show_window=False면 로컬 창 없이 스트림으로만 확인 (헤드리스)
+        self.stream = stream
+        self.show_window = True
     
     def initialize(self):
         """시스템 초기화"""
@@ -258,6 +565,8 @@ class AutonomousDriving:
             print("카메라 초기화 실패!")
             return False
         
+        self._apply_frame_format()
+        
         if not self.controller.initialize():
             print("하드웨어 초기화 실패!")
             return False
@@ -265,20 +574,160 @@ class AutonomousDriving:
         print("자율주행 시스템 초기화 완료!")
         return True
     
-    def process_frame(self, frame):
-        """프레임 처리 및 제어 명령 생성"""
-        # 차선 중앙 검출
-        lane_center, lane_polys, roi, mask = self.lane_detector.get_lane_center(frame)
+    def _apply_frame_format(self):
+        """카메라 출력 형식에 맞춰 차선 검출기와 화면 중앙 설정"""
+        if not hasattr(self.camera, 'frame_format'):
+            return
+        
+        frame_format = self.camera.frame_format()
+        self.lane_detector.set_input_format(frame_format["pixel_format"],
+                                            pre_cropped=frame_format["crop"] is not None)
+        self.frame_center = frame_format["width"] // 2
+        
+        # 허프 파라미터 배율 기준이 되는 원본(축소 전) 폭
+        crop = frame_format["crop"]
+        self._source_width = crop[2] - crop[0] if crop is not None else self.camera.width
+        self._base_output_size = getattr(self.camera, 'output_size', None)
+    
+    def _expected_frame_shape(self):
+        """카메라 출력 형식으로 계산한 프레임 배열 크기 (모르면 None)"""
+        if not hasattr(self.camera, 'frame_format'):
+            return None
+        
+        frame_format = self.camera.frame_format()
+        width, height = frame_format["width"], frame_format["height"]
+        if frame_format["pixel_format"] == 'GRAY8':
+            return (height, width)
+        if frame_format["pixel_format"] == 'I420':
+            return (height * 3 // 2, width)
+        return (height, width, 3)
+    
+    def _match_frame_width(self, width):
+        """처리 프레임 폭이 바뀌면 화면 중앙과 허프 파라미터 배율 갱신"""
+        if width == self._frame_width:
+            return
+        
+        self._frame_width = width
+        self.frame_center = width // 2
+        self.lane_detector.hough_scale = width / self._source_width
+        
+        # 이전 해상도 기준 차선 위치는 더 이상 쓸 수 없음
+        self._reset_lane_state()
+    
+    def _reset_lane_state(self):
+        """픽셀 단위 차선 추적/추정 상태 초기화"""
+        self.lane_detector.reset()
+        if self.lane_tracker is not None:
+            self.lane_tracker.reset()
+        if self.lane_state is not None:
+            self.lane_state.reset()
+    
+    def _fit_frame(self, frame):
+        """카메라가 해상도를 바꾸지 못한 경우 조절기 목표 크기로 직접 축소"""
+        if self._base_frame_size is None:
+            height = frame.shape[0]
+            if self.lane_detector.pixel_format == 'I420':
+                height = height * 2 // 3
+            self._base_frame_size = (frame.shape[1], height)
+        
+        if self.process_size is None or self.lane_detector.pixel_format == 'I420':
+            return frame
+        
+        width, height = self.process_size
+        if frame.shape[1] == width and frame.shape[0] == height:
+            return frame
+        
+        shape = (height, width) + frame.shape[2:]
+        if self._resize_buffer is None or self._resize_buffer.shape != shape:
+            self._resize_buffer = np.empty(shape, dtype=frame.dtype)
+        return cv2.resize(frame, (width, height), dst=self._resize_buffer, interpolation=cv2.INTER_AREA)
+    
+    def _apply_profile(self, profile):
+        """조절기 단계 적용 (해상도, ROI 비율, 처리 FPS)"""
+        width, height, fps, roi_scale = profile
+        scale = width / self.governor.profiles[0][0]
+        if self._configured_roi_ratio is None:
+            self._configured_roi_ratio = self.lane_detector.roi_height_ratio
+        roi_height_ratio = self._configured_roi_ratio * roi_scale
+        
+        # 파이프라인에서 ROI를 잘라낸 경우 ROI 비율은 바꿀 수 없음
+        if not self.lane_detector.pre_cropped:
+            self.lane_detector.roi_height_ratio = roi_height_ratio
+            self._reset_lane_state()
+        self.process_fps = fps
+        
+        base_width, base_height = self._base_frame_size
+        target_size = (int(round(base_width * scale)), int(round(base_height * scale)))
+        camera_size = self._base_output_size if scale == 1.0 else target_size
+        
+        if self._defer_resize:
+            # 캡처 단계가 바꿀 때까지(또는 바꾸지 못하면 계속) 직접 축소, 이미 맞는 크기면 축소하지 않음
+            self._requested_output_size = camera_size
+            self._resize_requested = True
+            self.process_size = None if scale == 1.0 else target_size
+        elif hasattr(self.camera, 'set_output_size') and self.camera.set_output_size(camera_size):
+            self.process_size = None
+        else:
+            self.process_size = None if scale == 1.0 else target_size
+        
+        print(f"품질 단계 {self.governor.level}: {target_size[0]}x{target_size[1]}, "
+              f"{fps} FPS, ROI {roi_height_ratio:.2f} (평균 처리 {self.governor.changes[-1][3]:.1f}ms)")
+    
+    def _detect_lane(self, frame):
+        """차선 중앙 검출 (추적기가 있으면 이전 프레임 차선 주변만 탐색)"""
+        if self.lane_tracker is not None:
+            return self.lane_tracker.update(frame)
+        return self.lane_detector.get_lane_center(frame)
+    
+    def _estimate_lane(self, frame):
+        """
+        칼만 필터로 차선 중앙 추정
+        직전 명령 속도로 예측하고, 검출하는 프레임이면 측정값으로 보정
+        검출하지 않은 프레임은 roi, mask가 None
+        """
+        now = time.monotonic()
+        if self._last_control_time is not None:
+            # 일시 정지 중이면 로봇이 움직이지 않으므로 속도 0으로 예측
+            command = self._last_command if self.controller.is_running else (0.0, 0.0)
+            self.lane_state.predict(*command, now - self._last_control_time)
+        self._last_control_time = now
+        
+        roi = mask = None
+        if self.frame_count % self.detect_every == 0 or not self.lane_state.is_valid:
+            lane_center, lane_polys, roi, mask = self._detect_lane(frame)
+            measurement = self.lane_state.measure(lane_center, lane_polys, roi.shape[0], self.frame_center)
+            if measurement is not None:
+                self.lane_state.update(*measurement)
+        
+        # 검출이 max_coast 이상 끊기면 추정값을 쓰지 않음
+        if not self.lane_state.is_valid:
+            return None, roi, mask
+        return self.frame_center + self.lane_state.offset, roi, mask
+    
+    def perceive(self, frame):
+        """차선 중앙 계산 (칼만 필터가 있으면 추정값), 반환값: (lane_center, roi, mask)"""
+        if self.lane_state is not None:
+            return self._estimate_lane(frame)
         
+        lane_center, _, roi, mask = self._detect_lane(frame)
+        return lane_center, roi, mask
+    
+    def control(self, lane_center, row=None, dt=None, trace=True):
+        """
+        차선 중앙으로 제어 명령 계산, 반환값: (linear_speed, angular_speed)
+        row: 지연 추적기 프레임 행 (다른 스레드에서 호출할 때)
+        dt: PID 시간 간격 (없으면 직전 호출부터 측정), trace: 지연 추적기에 'pid' 기록
+        """
         if lane_center is None:
             # 차선을 찾지 못한 경우
-            return 0.0, 0.0, roi, mask
+            self._last_command = (0.0, 0.0)
+            return 0.0, 0.0
         
         # 조향 오차 계산
         steering_error = lane_center - self.frame_center
         
         # PID 제어로 조향 각도 계산
-        steering_output = self.steering_pid.update(steering_error)
+        steering_output = self.steering_pid.update(steering_error, dt)
         
         # 조향 제한
         steering_output = max(-self.max_steering, min(self.max_steering, steering_output))
@@ -286,54 +735,218 @@ class AutonomousDriving:
         # 속도 조정 (급격한 조향 시 감속)
         speed_factor = 1.0 - abs(steering_output) * 0.5
         linear_speed = self.base_speed * speed_factor
+        if trace:
+            self.tracer.mark('pid', row)
         
-        return linear_speed, -steering_output, roi, mask
+        self._last_command = (linear_speed, -steering_output)
+        return linear_speed, -steering_output
     
-    def run(self):
-        """자율주행 실행"""
+    def publish_target(self, lane_center, row=None, seq=0, timestamp=None):
+        """고정 주기 제어 스레드에 최신 차선 중앙 전달 (블로킹 없음, 이전 목표는 덮어씀)"""
+        self._target = (lane_center, row, seq, timestamp, time.monotonic())
+        self.controller.feed()
+    
+    def _control_step(self, dt):
+        """
+        고정 주기 제어 스레드의 한 틱 (JetBotController.start_control_loop)
+        새 목표가 온 틱만 PID 계산 (I/D는 프레임 캡처 시각 간격으로 갱신), 나머지 틱은 마지막 출력 유지
+        """
+        target = self._target
+        if target is None:
+            return 0.0, 0.0
+        
+        lane_center, row, seq, timestamp, published = target
+        if time.monotonic() - published > self.target_timeout:
+            # 인식이 멈추면 오래된 목표로 계속 조향하지 않음
+            lane_center = None
+        
+        fresh = target is not self._applied_target
+        if not fresh and lane_center is not None:
+            # 같은 측정으로 PID를 반복하면 D는 0, I는 지난 오차로 쌓이므로 출력만 유지 (슬루 제한이 부드럽게 이어줌)
+            return self._last_command
+        self._applied_target = target
+        
+        # PID 시간 간격은 직전 측정 프레임과의 캡처 시각 차이 (없으면 PID가 직접 측정)
+        frame_dt = None
+        if fresh:
+            if timestamp is not None and self._applied_timestamp is not None and timestamp > self._applied_timestamp:
+                frame_dt = timestamp - self._applied_timestamp
+            self._applied_timestamp = timestamp
+        
+        # 새 목표를 처음 쓰는 틱만 지연 추적과 텔레메트리에 기록 (모터 쓰기는 이 틱에서 바로 실행)
+        linear_speed, angular_speed = self.control(lane_center, row, frame_dt, trace=fresh)
+        if fresh:
+            self.tracer.mark('motor', row)
+            if self.telemetry is not None:
+                self._emit_telemetry(seq, timestamp, lane_center, linear_speed, angular_speed)
+        return linear_speed, angular_speed
+    
+    def process_frame(self, frame):
+        """프레임 처리 및 제어 명령 생성"""
+        lane_center, roi, mask = self.perceive(frame)
+        linear_speed, angular_speed = self.control(lane_center)
+        return linear_speed, angular_speed, roi, mask
+    
+    def _start(self):
+        """초기화 후 모터/녹화/스트리밍 시작"""
         if not self.initialize():
             return False
         
         self.controller.start()
         self.is_running = True
+        self._configured_roi_ratio = self.lane_detector.roi_height_ratio
+        
+        if self.control_rate:
+            self._target = self._applied_target = self._applied_timestamp = None
+            self.controller.start_control_loop(self._control_step, self.control_rate)
+        if self.watchdog_deadline:
+            self.controller.enable_watchdog(self.watchdog_deadline, self.watchdog_speed)
+        
+        if self.recorder is not None:
+            self.recorder.start(self._expected_frame_shape())
+        
+        if self.stream is not None and not self.stream.is_running:
+            self.stream.start()
+        
+        if self.show_window or self.stream is not None:
+            self.debug_renderer = DebugRenderer(fps=self.debug_fps, show_window=self.show_window, stream=self.stream)
+            self.debug_renderer.start()
         
-        print("자율주행 시작! (ESC 키로 종료)")
+        if self.control_channel is not None and not self.control_channel.start():
+            self.control_channel = None
+        if self.telemetry is not None and not self.telemetry.start():
+            self.telemetry = None
+        
+        if self.show_window:
+            print("자율주행 시작! (ESC 키로 종료)")
+        else:
+            print("자율주행 시작! (quit 명령 또는 Ctrl+C로 종료)")
         print(f"기본 속도: {self.base_speed}, 최대 조향: {self.max_steering}")
+        return True
+    
+    def _poll_command(self):
+        """디버그 창 키 또는 제어 채널 명령 (없으면 None, 블로킹 없음)"""
+        if self.debug_renderer is not None:
+            key = self.debug_renderer.poll_key()
+            if key in self.KEY_COMMANDS:
+                return self.KEY_COMMANDS[key]
+        
+        if self.control_channel is not None:
+            return self.control_channel.poll()
+        return None
+    
+    def _handle_command(self, command):
+        """제어 명령 처리, 반환값: 종료 명령이면 False"""
+        if command == 'quit':  # ESC 키
+            return False
+        elif command == 'stats':  # 'l' 키로 지연 통계 출력
+            self.tracer.report()
+        elif command in ('toggle', 'pause', 'resume'):  # 's' 키로 정지/재시작
+            pause = self.controller.is_running if command == 'toggle' else command == 'pause'
+            if pause and self.controller.is_running:
+                self.controller.stop()
+                print("일시 정지")
+            elif not pause and not self.controller.is_running:
+                self.controller.start()
+                print("재시작")
+        elif command == 'debug':  # 'd' 키로 디버그 모드 토글
+            self.debug_mode = not self.debug_mode
+            print(f"디버그 모드: {'ON' if self.debug_mode else 'OFF'}")
+        elif command == 'profile':  # 'p' 키로 검출기 단계별 프로파일 시작/결과 출력
+            profiler = self.lane_detector.disable_profiling()
+            if profiler is None:
+                self.lane_detector.enable_profiling()
+                print("검출기 단계별 프로파일 시작 (다시 누르면 결과 출력)")
+            elif profiler.count:
+                profiler.breakdown()
+            else:
+                print(f"기록된 단계가 없습니다 ({self.lane_detector.backend} 검출기는 허프 단계를 거치지 않음)")
+        return True
+    
+    def _emit_telemetry(self, seq, timestamp, lane_center, linear_speed, angular_speed):
+        """텔레메트리 레코드 기록 요청"""
+        from telemetry import FLAG_DETECTED, FLAG_MOTORS, FLAG_DEBUG
+        
+        flags = (FLAG_DETECTED if lane_center is not None else 0) \
+            | (FLAG_MOTORS if self.controller.is_running else 0) \
+            | (FLAG_DEBUG if self.debug_mode else 0)
+        self.telemetry.emit(seq, timestamp, lane_center, linear_speed, angular_speed, flags)
+    
+    def _throttle(self, process_start):
+        """처리 FPS 제한 (백그라운드 캡처가 오래된 프레임은 버림)"""
+        if self.process_fps:
+            delay = 1.0 / self.process_fps - (time.perf_counter() - process_start)
+            if delay > 0:
+                time.sleep(delay)
+    
+    def run(self):
+        """자율주행 실행"""
+        if not self._start():
+            return False
         
         try:
             while self.is_running:
-                ret, frame = self.camera.read_frame()
+                ret, frame, slot = self.camera.borrow_frame()
                 
                 if not ret:
                     print("프레임 읽기 실패")
                     break
                 
-                # 프레임 처리
-                linear_speed, angular_speed, roi, mask = self.process_frame(frame)
-                
-                # 로봇 제어
-                self.controller.move(linear_speed, angular_speed)
+                # 캡처 시각과 순번으로 프레임 지연 추적 시작
+                seq, timestamp = self.camera.frame_seq, self.camera.frame_timestamp
+                row = self.tracer.begin_frame(seq, timestamp)
+                self.tracer.mark('read')
+                process_start = time.perf_counter()
                 
-                # 디버그 정보 표시
-                if self.debug_mode:
-                    self._display_debug_info(frame, roi, mask, linear_speed, angular_speed)
+                try:
+                    # 프레임 처리
+                    frame = self._fit_frame(frame)
+                    self._match_frame_width(frame.shape[1])
+                    lane_center, roi, mask = self.perceive(frame)
+                    
+                    if self.control_rate:
+                        # 고정 주기 제어 스레드가 최신 목표로 PID/모터 갱신
+                        self.publish_target(lane_center, row, seq, timestamp)
+                        linear_speed, angular_speed = self._last_command
+                    else:
+                        linear_speed, angular_speed = self.control(lane_center)
+                        
+                        # 로봇 제어
+                        self.controller.move(linear_speed, angular_speed)
+                        self.tracer.mark('motor')
+                        
+                        if self.telemetry is not None:
+                            self._emit_telemetry(seq, timestamp, lane_center, linear_speed, angular_speed)
+                    process_ms = (time.perf_counter() - process_start) * 1000.0
+                    
+                    # 녹화 (큐에 넣기만 하고 가득 차면 버림)
+                    if self.recorder is not None:
+                        self.recorder.record(frame, linear_speed, angular_speed, seq, timestamp)
+                    
+                    # 디버그 정보 표시 (예측만 한 프레임은 이전 화면 유지)
+                    if self.debug_mode and roi is not None:
+                        self._display_debug_info(roi, mask, linear_speed, angular_speed)
+                finally:
+                    # 링 버퍼 슬롯 반납
+                    self.camera.release_frame(slot)
                 
                 self.frame_count += 1
                 
-                # 키보드 입력 처리
-                key = cv2.waitKey(1) & 0xFF
-                if key == 27:  # ESC 키
+                # 처리 시간에 따라 품질 단계 조절
+                if self.governor is not None:
+                    profile = self.governor.update(process_ms)
+                    if profile is not None:
+                        self._apply_profile(profile)
+                
+                # 키보드/제어 채널 명령 처리
+                command = self._poll_command()
+                if not self.control_rate:
+                    # 고정 주기 제어면 모터 기록이 제어 스레드에서 나중에 올 수 있으므로 생략
+                    self.tracer.mark('display')
+                if command is not None and not self._handle_command(command):
                     break
-                elif key == ord('s'):  # 's' 키로 정지/재시작
-                    if self.controller.is_running:
-                        self.controller.stop()
-                        print("일시 정지")
-                    else:
-                        self.controller.start()
-                        print("재시작")
-                elif key == ord('d'):  # 'd' 키로 디버그 모드 토글
-                    self.debug_mode = not self.debug_mode
-                    print(f"디버그 모드: {'ON' if self.debug_mode else 'OFF'}")
+                
+                self._throttle(process_start)
         
         except KeyboardInterrupt:
             print("사용자에 의해 중단됨")
@@ -343,13 +956,141 @@ class AutonomousDriving:
         
         return True
     
-    def _display_debug_info(self, frame, roi, mask, linear_speed, angular_speed):
-        """디버그 정보 표시"""
-        # ROI 및 마스크 표시
-        debug_roi = cv2.cvtColor(mask, cv2.COLOR_GRAY2BGR)
+    def run_pipelined(self, ui_fps=30):
+        """
+        파이프라인 자율주행 실행
+        캡처 → 인식 → 제어 단계를 각각의 스레드에서 깊이 1 최신값 큐로 연결하고
+        키 입력(UI)은 메인 스레드에서 ui_fps 주기로 확인 (화면은 디버그 렌더링 스레드)
+        제어 단계는 인식 결과만 기다리므로 화면 표시나 카메라 입출력에 막히지 않음
+        control_rate가 있으면 제어 단계 대신 고정 주기 제어 스레드가 최신 인식 결과를 사용
+        녹화는 인식 단계에서 하므로 직전 제어 명령이 함께 기록됨
+        """
+        from pipeline import LatestValue, PipelineStage
+        
+        if not self._start():
+            return False
+        
+        self._defer_resize = True
+        self._resize_requested = False
+        stop_event = threading.Event()
+        frames = LatestValue()      # 캡처 → 인식: (버퍼, seq, timestamp)
+        lanes = LatestValue()       # 인식 → 제어: (lane_center, 추적 행, seq, timestamp)
+        free_buffers = queue.Queue()
+        for _ in range(3):
+            free_buffers.put(None)
+        
+        def capture():
+            if self._resize_requested:
+                # 조절기가 요청한 출력 크기는 빌린 프레임이 없는 읽기 사이에 적용
+                self._resize_requested = False
+                if hasattr(self.camera, 'set_output_size'):
+                    self.camera.set_output_size(self._requested_output_size)
+            
+            ret, frame, slot = self.camera.borrow_frame()
+            if not ret:
+                print("프레임 읽기 실패")
+                return False
+            
+            try:
+                # 카메라 링 버퍼 슬롯은 바로 반납하도록 파이프라인 버퍼에 복사
+                buffer = free_buffers.get()
+                if buffer is None or buffer.shape != frame.shape:
+                    buffer = np.empty_like(frame)
+                np.copyto(buffer, frame)
+                seq, timestamp = self.camera.frame_seq, self.camera.frame_timestamp
+            finally:
+                self.camera.release_frame(slot)
+            
+            displaced = frames.put((buffer, seq, timestamp))
+            if displaced is not None:
+                free_buffers.put(displaced[0])
+        
+        def perceive(item):
+            buffer, seq, timestamp = item
+            row = self.tracer.begin_frame(seq, timestamp)
+            self.tracer.mark('read', row)
+            process_start = time.perf_counter()
+            
+            try:
+                frame = self._fit_frame(buffer)
+                self._match_frame_width(frame.shape[1])
+                lane_center, roi, mask = self.perceive(frame)
+                
+                if self.control_rate:
+                    self.publish_target(lane_center, row, seq, timestamp)
+                else:
+                    lanes.put((lane_center, row, seq, timestamp))
+                
+                if self.recorder is not None:
+                    self.recorder.record(frame, *self._last_command, seq, timestamp)
+                
+                # 렌더러가 debug_fps 주기로만 ROI/마스크를 복사해 감
+                if self.debug_mode and roi is not None:
+                    self._display_debug_info(roi, mask, *self._last_command)
+            finally:
+                free_buffers.put(buffer)
+            
+            process_ms = (time.perf_counter() - process_start) * 1000.0
+            self.frame_count += 1
+            
+            if self.governor is not None:
+                profile = self.governor.update(process_ms)
+                if profile is not None:
+                    self._apply_profile(profile)
+            
+            self._throttle(process_start)
+        
+        def control(item):
+            lane_center, row, seq, timestamp = item
+            linear_speed, angular_speed = self.control(lane_center, row)
+            self.controller.move(linear_speed, angular_speed)
+            self.tracer.mark('motor', row)
+            
+            if self.telemetry is not None:
+                self._emit_telemetry(seq, timestamp, lane_center, linear_speed, angular_speed)
+        
+        stages = [
+            PipelineStage("capture", capture, stop_event),
+            PipelineStage("perception", perceive, stop_event, source=frames)
+        ]
+        if not self.control_rate:
+            # 고정 주기 제어면 제어 스레드는 JetBotController가 관리
+            stages.append(PipelineStage("control", control, stop_event, source=lanes))
+        for stage in stages:
+            stage.start()
         
-        # 중앙선 표시
-        cv2.line(debug_roi, (self.frame_center, 0), (self.frame_center, roi.shape[0]), (0, 255, 0), 2)
+        ui_interval = 1.0 / ui_fps
+        try:
+            while self.is_running and not stop_event.is_set():
+                command = self._poll_command()
+                if command is not None and not self._handle_command(command):
+                    break
+                stop_event.wait(ui_interval)
+        
+        except KeyboardInterrupt:
+            print("사용자에 의해 중단됨")
+        
+        finally:
+            stop_event.set()
+            for value in (frames, lanes):
+                value.close()
+            for stage in stages:
+                stage.join(1.0)
+            
+            print("=== 파이프라인 단계 ===")
+            for stage in stages:
+                rate, mean_ms, utilization = stage.stats()
+                print(f"{stage.name:<11} {rate:>6.1f}Hz, 평균 {mean_ms:.2f}ms, 가동률 {utilization * 100:.0f}%")
+            print(f"버린 값: 프레임 {frames.dropped}, 차선 {lanes.dropped}")
+            self._defer_resize = False
+            self._cleanup()
+        
+        return True
+    
+    def _display_debug_info(self, roi, mask, linear_speed, angular_speed):
+        """디버그 정보 표시 (렌더러 주기가 아니면 아무것도 하지 않음)"""
+        if self.debug_renderer is None or not self.debug_renderer.due():
+            return
         
         # 정보 텍스트
         info_text = [
@@ -357,28 +1098,46 @@ class AutonomousDriving:
             f"Steering: {angular_speed:.2f}",
             f"FPS: {self.frame_count / (time.time() - self.start_time):.1f}"
         ]
+        if self.lane_tracker is not None:
+            info_text.append(f"Lane: {self.lane_tracker.mode} {self.lane_tracker.confidence:.2f}")
+        if self.lane_state is not None:
+            info_text.append(f"Est: {self.lane_state.offset:+.0f}px {self.lane_state.heading:+.2f}")
         
-        for i, text in enumerate(info_text):
-            cv2.putText(debug_roi, text, (10, 30 + i * 30), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-        
-        # 결과 표시
-        combined = np.hstack([cv2.resize(roi, (320, 240)), 
-                             cv2.resize(debug_roi, (320, 240))])
-        cv2.imshow('Autonomous Driving Debug', combined)
+        self.debug_renderer.submit(roi, mask, self.frame_center, info_text)
     
     def _cleanup(self):
         """리소스 정리"""
         self.is_running = False
         self.controller.cleanup()
         self.camera.release()
-        cv2.destroyAllWindows()
+        if self.debug_renderer is not None:
+            self.debug_renderer.stop()
+        if self.control_channel is not None:
+            self.control_channel.stop()
+        if self.telemetry is not None:
+            self.telemetry.stop()
+        
+        if self.recorder is not None:
+            self.recorder.stop()
+        
+        if self.stream is not None:
+            self.stream.stop()
         
         elapsed_time = time.time() - self.start_time
         avg_fps = self.frame_count / elapsed_time if elapsed_time > 0 else 0
         
         print(f"자율주행 종료")
         print(f"총 프레임: {self.frame_count}, 평균 FPS: {avg_fps:.1f}")
+        
+        # 지연 통계 출력 및 저장
+        if self.tracer.count > 0:
+            self.tracer.report()
+            try:
+                filename = f"latency_{time.strftime('%Y%m%d_%H%M%S')}.json"
+                self.tracer.save(filename)
+                print(f"지연 통계 저장됨: {filename}")
+            except Exception as e:
+                print(f"지연 통계 저장 실패: {e}")
 
 def manual_control_test():
     """수동 제어 테스트"""
@@ -428,8 +1187,353 @@ def manual_control_test():
     
     return True
 
+def benchmark_replay(source, realtime=False, max_frames=0, detector=None, tracker=None):
+    """녹화 데이터로 차선 검출 처리량 측정"""
+    print("=== 차선 검출 벤치마크 ===")
+    
+    camera = JetBotCamera(source=source, realtime=realtime, buffer_count=2)
+    if not camera.initialize():
+        print("재생 소스 초기화 실패!")
+        return None
+    
+    if detector is None:
+        detector = LaneDetector()
+    detect = tracker.update if tracker is not None else detector.get_lane_center
+    detect_times = []
+    errors = []
+    detected = 0
+    start_time = time.perf_counter()
+    
+    try:
+        while not max_frames or len(detect_times) < max_frames:
+            ret, frame, slot = camera.borrow_frame()
+            if not ret:
+                break
+            
+            try:
+                t0 = time.perf_counter()
+                lane_center, _, _, _ = detect(frame)
+                detect_times.append(time.perf_counter() - t0)
+            finally:
+                camera.release_frame(slot)
+            
+            if lane_center is not None:
+                detected += 1
+                
+                # 합성 소스는 프레임별 실제 차선 중앙을 제공
+                truth = getattr(camera.cap, 'last_lane_center', None)
+                if truth is not None:
+                    errors.append(abs(lane_center - truth))
+    
+    except KeyboardInterrupt:
+        print("사용자에 의해 중단됨")
+    
+    finally:
+        camera.release()
+    
+    elapsed_time = time.perf_counter() - start_time
+    if not detect_times:
+        print("처리한 프레임이 없습니다.")
+        return None
+    
+    times_ms = np.array(detect_times) * 1000.0
+    result = {
+        "frames": len(times_ms),
+        "fps": len(times_ms) / elapsed_time if elapsed_time > 0 else 0.0,
+        "detect_fps": 1000.0 / times_ms.mean(),
+        "mean_ms": float(times_ms.mean()),
+        "p50_ms": float(np.percentile(times_ms, 50)),
+        "p95_ms": float(np.percentile(times_ms, 95)),
+        "detection_rate": detected / len(times_ms)
+    }
+    
+    print(f"프레임: {result['frames']}, 전체 FPS: {result['fps']:.1f}, 검출 FPS: {result['detect_fps']:.1f}")
+    print(f"검출 시간: 평균 {result['mean_ms']:.2f}ms, p50 {result['p50_ms']:.2f}ms, p95 {result['p95_ms']:.2f}ms")
+    print(f"차선 검출률: {result['detection_rate'] * 100:.1f}%")
+    
+    if tracker is not None:
+        result["tracked_ratio"] = tracker.tracked_ratio
+        print(f"윈도우 추적 비율: {tracker.tracked_ratio * 100:.1f}% (전체 허프 검출 {tracker.full_frames} 프레임)")
+    
+    if errors:
+        result["mean_error_px"] = float(np.mean(errors))
+        result["p95_error_px"] = float(np.percentile(errors, 95))
+        print(f"차선 중앙 오차: 평균 {result['mean_error_px']:.1f}px, p95 {result['p95_error_px']:.1f}px")
+    return result
+
+def profile_detector(camera, detector, max_frames, output=None):
+    """
+    차선 검출기 단계별 처리 시간 측정 (cvtColor/블러/inRange/Canny/허프/분류)
+    output: .csv면 프레임별 단계 시간, 그 외는 JSON 요약으로 저장
+    """
+    print("=== 차선 검출 단계별 프로파일 ===")
+    
+    if not camera.initialize():
+        print("카메라 초기화 실패!")
+        return None
+    
+    if hasattr(camera, 'frame_format'):
+        frame_format = camera.frame_format()
+        detector.set_input_format(frame_format["pixel_format"], pre_cropped=frame_format["crop"] is not None)
+    
+    profiler = detector.enable_profiling(capacity=max_frames)
+    frames = 0
+    try:
+        while frames < max_frames:
+            ret, frame, slot = camera.borrow_frame()
+            if not ret:
+                break
+            
+            try:
+                detector.get_lane_center(frame)
+            finally:
+                camera.release_frame(slot)
+            frames += 1
+    
+    except KeyboardInterrupt:
+        print("사용자에 의해 중단됨")
+    
+    finally:
+        detector.disable_profiling()
+        camera.release()
+    
+    if not profiler.count:
+        print(f"기록된 단계가 없습니다 ({detector.backend} 검출기는 허프 단계를 거치지 않음)")
+        return None
+    
+    summary = profiler.breakdown()
+    if output:
+        if output.endswith(".csv"):
+            profiler.save_csv(output)
+        else:
+            with open(output, 'w', encoding='utf-8') as f:
+                json.dump(summary, f, ensure_ascii=False, indent=2)
+        print(f"프로파일 저장됨: {output}")
+    return summary
+
+def parse_args(argv=None):
+    """명령행 인자 처리"""
+    parser = argparse.ArgumentParser(description="JetBot C100 자율주행 시스템")
+    parser.add_argument("--source", help="카메라 대신 사용할 녹화 영상, 이미지 디렉토리, .npy 파일 또는 synthetic[:N]")
+    parser.add_argument("--fast", action="store_true", help="녹화 FPS를 무시하고 최대 속도로 재생")
+    parser.add_argument("--loop", action="store_true", help="재생 소스를 반복 재생")
+    parser.add_argument("--pixel-format", choices=("BGR", "GRAY8", "I420"), default="BGR",
+                        help="CSI 파이프라인 출력 픽셀 포맷 (GRAY8은 흰색 차선만 검출)")
+    parser.add_argument("--crop-roi", action="store_true",
+                        help="차선 검출 ROI를 카메라 파이프라인(nvvidconv)에서 잘라냄")
+    parser.add_argument("--output-size", metavar="WxH", help="nvvidconv에서 축소할 출력 크기 (예: 320x240)")
+    parser.add_argument("--record", nargs="?", const="recordings", metavar="DIR",
+                        help="주행 세션(프레임 + 조향/속도)을 DIR에 녹화")
+    parser.add_argument("--budget", type=float, metavar="MS",
+                        help="프레임 처리 예산(ms), 초과 시 해상도/ROI/처리 FPS를 자동으로 낮춤")
+    parser.add_argument("--bus", nargs="?", const="jetbot_frames", metavar="NAME",
+                        help="카메라 대신 공유 메모리 프레임 버스 구독 (frame_bus.py 발행자 필요)")
+    parser.add_argument("--stream", type=int, nargs="?", const=8080, metavar="PORT",
+                        help="디버그 화면을 HTTP MJPEG로 스트리밍 (기본 포트 8080)")
+    parser.add_argument("--no-window", action="store_true",
+                        help="로컬 디버그 창을 띄우지 않음 (헤드리스, --stream과 함께 사용)")
+    parser.add_argument("--debug-fps", type=float, default=10, metavar="FPS",
+                        help="디버그 화면 갱신 주기 (별도 스레드에서 렌더링, 기본 10)")
+    parser.add_argument("--color-lut", type=int, nargs="?", const=6, metavar="BITS",
+                        help="HSV 변환 대신 양자화 BGR 룩업 테이블로 색상 검출 (채널당 비트 수, 기본 6)")
+    parser.add_argument("--track", type=int, nargs="?", const=30, metavar="N",
+                        help="이전 프레임 차선 주변만 탐색, 신뢰도가 낮거나 N 프레임마다 전체 검출 (기본 30)")
+    parser.add_argument("--kalman", action="store_true",
+                        help="칼만 필터로 차선 상태를 추정 (검출 실패 프레임도 예측값으로 계속 제어)")
+    parser.add_argument("--detect-every", type=int, default=1, metavar="K",
+                        help="K 프레임마다 차선 검출, 나머지는 칼만 예측으로 제어 (--kalman 포함)")
+    from lane_detectors import available_detectors
+    detector_group = parser.add_mutually_exclusive_group()
+    detector_group.add_argument("--detector", choices=available_detectors() + ["auto"],
+                                help="차선 검출기 (auto: 시작할 때 처리 시간/오차를 재서 --budget 안에서 가장 정확한 것 선택)")
+    detector_group.add_argument("--birdseye", action="store_true",
+                                help="버드아이뷰 변환 후 2차 다항식으로 차선 검출 (곡률 제공, --detector birdseye와 같음)")
+    detector_group.add_argument("--histogram", action="store_true",
+                                help="Canny/허프 대신 열 히스토그램으로 빠르게 차선 검출 (테이프 트랙용, --detector histogram과 같음)")
+    parser.add_argument("--probe-source", metavar="SOURCE",
+                        help="--detector auto 프로브에 쓸 녹화 영상/이미지 디렉토리/.npy (기본: 합성 주행, 합성 장면으로 학습하는 검출기 제외)")
+    parser.add_argument("--config", metavar="FILE",
+                        help="차선 검출 파라미터 설정 파일 (lane_param_sweep.py --output 결과)")
+    parser.add_argument("--calibration", metavar="FILE",
+                        help="버드아이뷰 렌즈 왜곡 보정 파일 (npz: camera_matrix, dist_coeffs, image_size)")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="캡처/인식/제어/화면을 각각의 스레드에서 최신값 큐로 연결해 실행")
+    parser.add_argument("--control-rate", type=float, nargs="?", const=100, metavar="HZ",
+                        help="카메라 프레임과 별개로 고정 주기 스레드에서 PID/슬루 제한/모터 갱신 (기본 100Hz)")
+    parser.add_argument("--watchdog", type=float, nargs="?", const=250, metavar="MS",
+                        help="새 모터 명령이 MS 동안 없으면(프레임 읽기/처리 지연) 모터를 감속 (기본 250ms)")
+    parser.add_argument("--watchdog-speed", type=float, default=0.0, metavar="SPEED",
+                        help="워치독 감속 목표 선속도 (기본 0: 정지)")
+    parser.add_argument("--headless", action="store_true",
+                        help="화면/HighGUI 없이 실행 (--no-window 포함), 명령은 표준 입력 또는 --control-socket으로 받음")
+    parser.add_argument("--control-socket", nargs="?", const="/tmp/jetbot.sock", metavar="PATH",
+                        help="UNIX 소켓으로 pause/resume/debug/stats/quit 명령 받기 (기본 /tmp/jetbot.sock)")
+    parser.add_argument("--telemetry", metavar="FILE",
+                        help="프레임별 차선 중앙/제어 명령/지연 기록 파일 (-: 표준 출력, 로그는 표준 오류로)")
+    parser.add_argument("--telemetry-format", choices=("jsonl", "binary"), default="jsonl",
+                        help="텔레메트리 형식 (binary: telemetry.TELEMETRY_DTYPE 36바이트 레코드)")
+    parser.add_argument("--profile", type=int, nargs="?", const=300, metavar="N",
+                        help="N 프레임 동안 검출기 단계별(cvtColor/블러/inRange/Canny/허프/분류) 처리 시간 측정 (기본 300)")
+    parser.add_argument("--profile-output", metavar="FILE",
+                        help="프로파일 저장 파일 (.csv: 프레임별 단계 시간, 그 외: JSON 요약)")
+    parser.add_argument("--benchmark", type=int, nargs="?", const=0, metavar="N",
+                        help="재생 소스로 차선 검출 처리량 측정 (N 프레임, 생략 시 끝까지)")
+    return parser.parse_args(argv)
+
+def create_control_channel(args):
+    """명령행 인자에 맞는 제어 채널 (없으면 None)"""
+    if args.control_socket:
+        from control_channel import SocketControl
+        return SocketControl(args.control_socket)
+    if args.headless:
+        from control_channel import StdinControl
+        return StdinControl()
+    return None
+
+def create_camera(args, roi_height_ratio=None):
+    """
+    명령행 인자에 맞는 카메라 생성 (기본 카메라면 None)
+    roi_height_ratio: --crop-roi로 잘라낼 ROI 비율 (사용할 검출기 값, 없으면 기본 검출기 값)
+    """
+    if args.bus is not None:
+        from frame_bus import FrameSubscriber
+        return FrameSubscriber(args.bus)
+    
+    if args.source is not None:
+        return JetBotCamera(source=args.source, realtime=not args.fast, loop=args.loop,
+                            threaded=True, buffer_count=4)
+    
+    if args.crop_roi or args.output_size or args.pixel_format != "BGR":
+        if roi_height_ratio is None:
+            roi_height_ratio = LaneDetector().roi_height_ratio
+        crop = lane_roi_crop(640, 480, roi_height_ratio) if args.crop_roi else None
+        output_size = tuple(int(v) for v in args.output_size.split("x")) if args.output_size else None
+        return JetBotCamera(width=640, height=480, fps=30, threaded=True, buffer_count=4,
+                            crop=crop, output_size=output_size, pixel_format=args.pixel_format)
+    
+    return None
+
+def create_detector(args):
+    """명령행 인자에 맞는 차선 검출기 생성 (lane_detectors 등록부 사용)"""
+    import lane_detectors
+    
+    def configure(detector):
+        if args.config:
+            detector.load_config(args.config)
+        if args.color_lut is not None:
+            detector.enable_color_lut(args.color_lut)
+    
+    if args.detector == "auto":
+        # 처리할 해상도의 프레임으로 검출기별 시간/오차 측정 (--probe-source가 없으면 합성 주행 프레임)
+        size = tuple(int(v) for v in args.output_size.split("x")) if args.output_size else (640, 480)
+        frames = None
+        if args.probe_source:
+            frames, truths = lane_detectors.load_frames(args.probe_source, 30)
+        if frames is None:
+            frames, truths = lane_detectors.synthetic_frames(30, *size)
+            synthetic = True
+        else:
+            synthetic = args.probe_source.startswith("synthetic")
+            if frames[0].shape[1::-1] != size:
+                # 정답은 원본 좌표라 크기를 바꾸면 검출기들의 중앙값 기준으로 채점
+                frames = [cv2.resize(frame, size, interpolation=cv2.INTER_AREA) for frame in frames]
+                truths = None
+        _, detector = lane_detectors.select_detector(args.budget, frames, truths, configure=configure,
+                                                     synthetic=synthetic)
+    else:
+        name = args.detector or ("birdseye" if args.birdseye else "histogram" if args.histogram else "hough")
+        detector = lane_detectors.create_detector(name, configure)
+    
+    if args.calibration:
+        if hasattr(detector, "load_calibration"):
+            detector.load_calibration(args.calibration)
+        else:
+            print("--calibration은 버드아이뷰 검출기에서만 사용합니다.")
+    return detector
+
+def create_tracker(detector, args):
+    """--track 옵션이 있으면 차선 추적기 생성"""
+    if args.track is None:
+        return None
+    
+    if detector.backend != "hough":
+        # 추적기는 허프 검출 결과(원근 영상 직선, 전체 마스크)를 기준으로 윈도우를 잡음
+        print(f"--track은 기본(허프) 검출기에서만 사용할 수 있어 {detector.backend} 검출기로 매 프레임 검출합니다.")
+        return None
+    
+    from lane_tracking import LaneTracker
+    return LaneTracker(detector, redetect_interval=args.track)
+
 def main():
     """메인 함수"""
+    args = parse_args()
+    
+    # 표준 출력은 텔레메트리 전용으로 쓰고 로그는 표준 오류로
+    # (fd 1을 복제해 두고 stderr로 돌리므로 import 중 버퍼에 남은 출력도 stderr로 감)
+    telemetry_stream = None
+    if args.telemetry == "-":
+        telemetry_stream = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+        os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    
+    if args.benchmark is not None:
+        if args.source is None:
+            print("벤치마크에는 --source가 필요합니다.")
+            return
+        detector = create_detector(args)
+        benchmark_replay(args.source, realtime=not args.fast, max_frames=args.benchmark,
+                         detector=detector, tracker=create_tracker(detector, args))
+        return
+    
+    if args.profile is not None:
+        detector = create_detector(args)
+        if args.source is not None:
+            # 재생 소스는 프레임을 건너뛰지 않도록 캡처 스레드 없이 읽음
+            camera = JetBotCamera(source=args.source, realtime=False, loop=args.loop, buffer_count=2)
+        else:
+            camera = create_camera(args, detector.roi_height_ratio) or \
+                JetBotCamera(width=640, height=480, fps=30, threaded=True, buffer_count=4)
+        profile_detector(camera, detector, args.profile, args.profile_output)
+        return
+    
+    # --config의 ROI 비율로 카메라 crop을 잡도록 검출기를 먼저 생성
+    detector = create_detector(args) if len(sys.argv) > 1 else None
+    camera = create_camera(args, detector.roi_height_ratio if detector is not None else None)
+    recorder = None
+    if args.record is not None:
+        from session_recorder import SessionRecorder
+        recorder = SessionRecorder(args.record)
+    
+    governor = FrameGovernor(args.budget) if args.budget else None
+    
+    stream = None
+    if args.stream is not None:
+        from mjpeg_server import MJPEGServer
+        stream = MJPEGServer(port=args.stream)
+    
+    # 실행 옵션이 주어지면 메뉴 없이 바로 자율주행 시작
+    if len(sys.argv) > 1:
+        autonomous = AutonomousDriving(camera, recorder, governor, stream, detector)
+        autonomous.show_window = not (args.no_window or args.headless)
+        autonomous.control_channel = create_control_channel(args)
+        if args.telemetry:
+            from telemetry import TelemetryWriter
+            autonomous.telemetry = TelemetryWriter(telemetry_stream or args.telemetry, args.telemetry_format)
+        autonomous.debug_fps = args.debug_fps
+        autonomous.control_rate = args.control_rate
+        if args.watchdog:
+            autonomous.watchdog_deadline = args.watchdog / 1000.0
+            autonomous.watchdog_speed = args.watchdog_speed
+        autonomous.lane_tracker = create_tracker(autonomous.lane_detector, args)
+        if args.kalman or args.detect_every > 1:
+            from lane_state import LaneStateEstimator
+            autonomous.lane_state = LaneStateEstimator()
+            autonomous.detect_every = max(1, args.detect_every)
+        if args.pipeline:
+            autonomous.run_pipelined()
+        else:
+            autonomous.run()
+        return
+    
     print("JetBot C100 자율주행 시스템")
     print("1. 자율주행 시작")
     print("2. 수동 제어 테스트")
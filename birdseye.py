@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+버드아이뷰(위에서 내려다본 시점) 차선 검출
+렌즈 왜곡 보정과 원근 변환을 하나의 cv2.remap 테이블로 합쳐 해상도/보정값마다 한 번만 계산하고,
+변환된 영상에서 2차 다항식으로 차선을 피팅해 곡률과 전방 주시점을 제공
+"""
+
+import cv2
+import numpy as np
+
+from autonomous_driving import LaneDetector
+
+# 원근 변환 기준 사다리꼴 (입력 프레임 크기 대비 비율, 좌하/우하/우상/좌상)
+# 수평선이 화면 30% 높이인 카메라 기준 - 실제 장착 각도에 맞춰 set_perspective()로 보정
+DEFAULT_SRC_POINTS = ((0.0, 1.0), (1.0, 1.0), (0.68, 0.55), (0.32, 0.55))
+
+def fit_quadratic(xs, ys):
+    """점들로 x = a*y^2 + b*y + c 최소자승 피팅 (점이 2개면 직선)"""
+    xs = np.asarray(xs, dtype=np.float64)
+    ys = np.asarray(ys, dtype=np.float64)
+
+    degree = 2 if len(xs) >= 3 else 1
+    A = np.vander(ys, degree + 1)
+    try:
+        coeffs = np.linalg.solve(A.T @ A, A.T @ xs)
+    except np.linalg.LinAlgError:
+        return None
+
+    if degree == 1:
+        coeffs = np.concatenate([[0.0], coeffs])
+    return coeffs
+
+class BirdsEyeDetector(LaneDetector):
+    """
+    버드아이뷰 차선 검출기 (LaneDetector.get_lane_center와 같은 반환값)
+    roi, mask는 변환된 영상, 차선 다항식은 변환 영상 좌표의 x = a*y^2 + b*y + c
+    lane_center는 원본 프레임 하단 기준 x 좌표
+    """
+
+    backend = 'birdseye'
+
+    def __init__(self, output_size=(320, 240), src_points=DEFAULT_SRC_POINTS,
+                 camera_matrix=None, dist_coeffs=None, calibration_size=None,
+                 windows=8, margin=30, min_pixels=20, meters_per_px=None):
+        super().__init__()
+
+        self.output_size = output_size
+        self.src_points = np.float32(src_points)
+
+        # 렌즈 보정값 (calibration_size 해상도 기준, 없으면 왜곡 보정 생략)
+        self.camera_matrix = camera_matrix
+        self.dist_coeffs = dist_coeffs
+        self.calibration_size = calibration_size
+
+        # 슬라이딩 윈도우 설정
+        self.windows = windows
+        self.margin = margin
+        self.min_pixels = min_pixels
+
+        # 변환 영상 한 픽셀의 실제 거리 (m), 있으면 곡률을 1/m 단위로 제공
+        self.meters_per_px = meters_per_px
+
+        # 양쪽 차선이 보일 때 측정한 변환 영상 차선 폭 (한쪽만 보일 때 중앙 추정용)
+        self.lane_width_px = output_size[0] * 0.75
+
+        # 마지막 검출 결과
+        self.center_poly = None
+        self.curvature = None
+
+        self._maps = None
+        self._maps_key = None
+        self._warped = None
+        self._columns = np.arange(2 * margin + 1, dtype=np.float64)
+
+    def reset(self):
+        """마지막 검출 결과와 측정한 차선 폭 초기화"""
+        self.lane_width_px = self.output_size[0] * 0.75
+        self.center_poly = None
+        self.curvature = None
+
+    def set_perspective(self, src_points):
+        """원근 변환 사다리꼴 변경 (다음 프레임에서 remap 테이블 재계산)"""
+        self.src_points = np.float32(src_points)
+        self._maps_key = None
+
+    def set_calibration(self, camera_matrix, dist_coeffs, calibration_size):
+        """렌즈 보정값 변경 (cv2.calibrateCamera 결과와 보정 당시 해상도)"""
+        self.camera_matrix = np.asarray(camera_matrix, dtype=np.float64)
+        self.dist_coeffs = np.asarray(dist_coeffs, dtype=np.float64)
+        self.calibration_size = calibration_size
+        self._maps_key = None
+
+    def load_calibration(self, filename):
+        """npz 보정 파일 로드 (camera_matrix, dist_coeffs, image_size)"""
+        try:
+            data = np.load(filename)
+            self.set_calibration(data["camera_matrix"], data["dist_coeffs"], tuple(int(v) for v in data["image_size"]))
+            return True
+        except (OSError, KeyError, ValueError) as e:
+            print(f"카메라 보정 파일 로드 실패: {e}")
+            return False
+
+    def _build_maps(self, width, height):
+        """
+        변환 영상 픽셀 → 원본(왜곡된) 프레임 좌표 테이블 계산
+        원근 역변환과 렌즈 왜곡을 한 번에 적용해 remap 한 번으로 처리
+        """
+        out_w, out_h = self.output_size
+        src = self.src_points * np.float32([width - 1, height - 1])
+        dst = np.float32([[0, out_h - 1], [out_w - 1, out_h - 1], [out_w - 1, 0], [0, 0]])
+
+        self._to_image = cv2.getPerspectiveTransform(dst, src)
+
+        xs, ys = np.meshgrid(np.arange(out_w, dtype=np.float32), np.arange(out_h, dtype=np.float32))
+        points = np.stack([xs, ys], axis=-1).reshape(-1, 1, 2)
+        points = cv2.perspectiveTransform(points, self._to_image)
+
+        if self.camera_matrix is not None and self.dist_coeffs is not None:
+            # 보정 해상도와 다르면 카메라 행렬을 현재 해상도로 축척
+            K = self.camera_matrix.copy()
+            if self.calibration_size is not None:
+                K[0] *= width / self.calibration_size[0]
+                K[1] *= height / self.calibration_size[1]
+
+            # 왜곡 없는 픽셀 → 정규 좌표 → 왜곡 적용한 픽셀
+            normalized = cv2.undistortPoints(points, K, None)
+            rays = cv2.convertPointsToHomogeneous(normalized).reshape(-1, 3)
+            points, _ = cv2.projectPoints(rays, np.zeros(3), np.zeros(3), K, self.dist_coeffs)
+
+        map_xy = points.reshape(out_h, out_w, 2).astype(np.float32)
+        return cv2.convertMaps(map_xy, None, cv2.CV_16SC2)
+
+    def _maps_for(self, width, height):
+        """해상도/보정값이 바뀌었을 때만 remap 테이블 재계산"""
+        key = (width, height, self.output_size)
+        if self._maps_key != key:
+            self._maps = self._build_maps(width, height)
+            self._maps_key = key
+        return self._maps
+
+    def warp(self, frame):
+        """프레임을 버드아이뷰로 변환"""
+        if self.pixel_format == 'I420':
+            frame = cv2.cvtColor(frame, cv2.COLOR_YUV2BGR_I420)
+
+        map1, map2 = self._maps_for(frame.shape[1], frame.shape[0])
+        out_w, out_h = self.output_size
+        shape = (out_h, out_w) + frame.shape[2:]
+        if self._warped is None or self._warped.shape != shape:
+            self._warped = np.empty(shape, dtype=np.uint8)
+
+        return cv2.remap(frame, map1, map2, cv2.INTER_LINEAR, dst=self._warped)
+
+    def _base_positions(self, mask):
+        """하단 절반 열 히스토그램의 좌/우 최대값 위치"""
+        height, width = mask.shape[:2]
+        histogram = np.count_nonzero(mask[height // 2:], axis=0)
+        mid = width // 2
+
+        left = int(np.argmax(histogram[:mid]))
+        right = mid + int(np.argmax(histogram[mid:]))
+        left = left if histogram[left] > 0 else None
+        right = right if histogram[right] > 0 else None
+        return left, right
+
+    def _window_search(self, mask, base_x):
+        """아래에서 위로 윈도우를 옮겨가며 차선 픽셀 무게중심 탐색 후 2차 피팅"""
+        if base_x is None:
+            return None
+
+        height, width = mask.shape[:2]
+        band = height / self.windows
+        xs = []
+        ys = []
+        x_current = base_x
+
+        for i in range(self.windows):
+            y_bottom = int(round(height - i * band))
+            y_top = int(round(height - (i + 1) * band))
+
+            x_left = max(0, int(x_current) - self.margin)
+            x_right = min(width, int(x_current) + self.margin + 1)
+            if x_right <= x_left:
+                break
+
+            counts = np.count_nonzero(mask[y_top:y_bottom, x_left:x_right], axis=0)
+            total = counts.sum()
+            if total < self.min_pixels:
+                continue
+
+            x_current = x_left + np.dot(counts, self._columns[:x_right - x_left]) / total
+            xs.append(x_current)
+            ys.append((y_top + y_bottom - 1) / 2.0)
+
+        if len(xs) < 2:
+            return None
+        return fit_quadratic(xs, ys)
+
+    def _to_image_x(self, x, y):
+        """변환 영상 좌표를 원본 프레임 x 좌표로 변환 (렌즈 왜곡은 무시)"""
+        point = self._to_image @ np.array([x, y, 1.0])
+        return point[0] / point[2]
+
+    def get_lane_center(self, frame):
+        """버드아이뷰 차선 중앙 계산"""
+        warped = self.warp(frame)
+        self._trace('preprocess')
+
+        mask = self.detect_color_lanes(warped)
+        self._trace('color_mask')
+
+        left_base, right_base = self._base_positions(mask)
+        left_poly = self._window_search(mask, left_base)
+        right_poly = self._window_search(mask, right_base)
+
+        out_w, out_h = self.output_size
+        y_eval = out_h - 1
+
+        # 변환 영상에서는 차선 폭이 일정하므로 한쪽만 보이면 폭의 절반만큼 옮겨서 중앙 추정
+        if left_poly is not None and right_poly is not None:
+            width = np.polyval(right_poly, y_eval) - np.polyval(left_poly, y_eval)
+            if width > 0:
+                self.lane_width_px = width
+            self.center_poly = (left_poly + right_poly) / 2
+        elif left_poly is not None:
+            self.center_poly = left_poly + (0.0, 0.0, self.lane_width_px / 2)
+        elif right_poly is not None:
+            self.center_poly = right_poly - (0.0, 0.0, self.lane_width_px / 2)
+        else:
+            self.center_poly = None
+            self.curvature = None
+            self._trace('fit')
+            return None, (None, None), warped, mask
+
+        self.curvature = self.curvature_at(y_eval)
+        lane_center = self._to_image_x(np.polyval(self.center_poly, y_eval), y_eval)
+
+        self._trace('fit')
+        return lane_center, (left_poly, right_poly), warped, mask
+
+    def curvature_at(self, y):
+        """
+        차선 중앙선의 부호 있는 곡률 (meters_per_px가 있으면 1/m, 없으면 1/px)
+        양수면 앞쪽(위쪽)으로 갈수록 오른쪽으로 휨
+        """
+        if self.center_poly is None:
+            return None
+
+        a, b, _ = self.center_poly
+        # 위쪽이 앞쪽이므로 dx/dy의 부호를 뒤집은 기울기로 계산
+        slope = -(2 * a * y + b)
+        curvature = 2 * a / (1 + slope * slope) ** 1.5
+
+        if self.meters_per_px:
+            curvature /= self.meters_per_px
+        return curvature
+
+    def lookahead_points(self, distances):
+        """
+        현재 위치에서 앞쪽 distances(변환 영상 px, meters_per_px가 있으면 m) 거리의 차선 중앙점
+        반환값: [(횡방향 오프셋, 거리), ...] - 오프셋은 로봇 중심선 기준, 양수면 오른쪽
+        """
+        if self.center_poly is None:
+            return []
+
+        out_w, out_h = self.output_size
+        scale = self.meters_per_px or 1.0
+        points = []
+        for distance in distances:
+            y = (out_h - 1) - distance / scale
+            x = np.polyval(self.center_poly, y)
+            points.append(((x - out_w / 2) * scale, distance))
+        return points
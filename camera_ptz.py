@@ -7,6 +7,7 @@ JetBot C100 보드용 카메라 PTZ(Pan-Tilt-Zoom) 제어
 import time
 import math
 import sys
+import argparse
 import cv2
 import numpy as np
 
@@ -201,11 +202,17 @@ class ServoController:
 class PTZCamera:
     """PTZ 카메라 제어 클래스"""
     
-    def __init__(self):
-        self.camera = JetBotCamera()
+    def __init__(self, camera=None, stream=None):
+        # camera: JetBotCamera 또는 frame_bus.FrameSubscriber
+        self.camera = camera if camera is not None else JetBotCamera(threaded=True)
         self.servo_controller = ServoController()
         self.is_tracking = False
         
+        # 원격 화면 스트리밍 (mjpeg_server.MJPEGServer, 선택)
+        # show_window=False면 로컬 창 없이 스트림으로만 확인 (헤드리스, Ctrl+C로 종료)
+        self.stream = stream
+        self.show_window = True
+        
         # 객체 추적용 변수
         self.tracker = None
         self.tracking_bbox = None
@@ -228,9 +235,29 @@ class PTZCamera:
             print("서보 초기화 실패!")
             return False
         
+        if self.stream is not None and not self.stream.is_running:
+            self.stream.start()
+        
         print("PTZ 카메라 초기화 완료!")
         return True
     
+    def _show(self, window_name, frame):
+        """화면 표시 및 스트림 발행"""
+        if self.stream is not None:
+            self.stream.publish(frame)
+        if self.show_window:
+            cv2.imshow(window_name, frame)
+    
+    def _wait_key(self):
+        """키 입력 확인 (창이 없으면 키 입력 없음)"""
+        if not self.show_window:
+            return 0xFF
+        return cv2.waitKey(1) & 0xFF
+    
+    def _close_windows(self):
+        if self.show_window:
+            cv2.destroyAllWindows()
+    
     def manual_control(self):
         """수동 PTZ 제어"""
         print("=== PTZ 수동 제어 ===")
@@ -241,6 +268,9 @@ class PTZCamera:
         pan_step = 5
         tilt_step = 5
         
+        if not self.show_window:
+            print("창 없이 실행 중이라 키 입력을 받을 수 없습니다 (스트림 확인만 가능, Ctrl+C로 종료)")
+        
         try:
             while True:
                 ret, frame = self.camera.read_frame()
@@ -260,9 +290,9 @@ class PTZCamera:
                     cv2.line(frame, (w//2-20, h//2), (w//2+20, h//2), (0, 255, 0), 2)
                     cv2.line(frame, (w//2, h//2-20), (w//2, h//2+20), (0, 255, 0), 2)
                     
-                    cv2.imshow('PTZ Camera Control', frame)
+                    self._show('PTZ Camera Control', frame)
                 
-                key = cv2.waitKey(1) & 0xFF
+                key = self._wait_key()
                 
                 if key == ord('w'):  # 위로
                     self.servo_controller.relative_move(0, -tilt_step)
@@ -283,7 +313,7 @@ class PTZCamera:
             print("사용자에 의해 중단됨")
         
         finally:
-            cv2.destroyAllWindows()
+            self._close_windows()
     
     def face_tracking(self):
         """얼굴 추적 모드"""
@@ -308,8 +338,8 @@ class PTZCamera:
                 h, w = frame.shape[:2]
                 center_x, center_y = w // 2, h // 2
                 
-                # 얼굴 검출
-                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                # 얼굴 검출 (GRAY8 파이프라인이면 변환 생략)
+                gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
                 faces = self.face_cascade.detectMultiScale(gray, 1.3, 5)
                 
                 if len(faces) > 0:
@@ -346,16 +376,16 @@ class PTZCamera:
                 cv2.line(frame, (center_x-20, center_y), (center_x+20, center_y), (0, 255, 0), 2)
                 cv2.line(frame, (center_x, center_y-20), (center_x, center_y+20), (0, 255, 0), 2)
                 
-                cv2.imshow('Face Tracking', frame)
+                self._show('Face Tracking', frame)
                 
-                if cv2.waitKey(1) & 0xFF == 27:  # ESC 키
+                if self._wait_key() == 27:  # ESC 키
                     break
         
         except KeyboardInterrupt:
             print("사용자에 의해 중단됨")
         
         finally:
-            cv2.destroyAllWindows()
+            self._close_windows()
     
     def patrol_mode(self):
         """순찰 모드 (자동 스캔)"""
@@ -392,7 +422,7 @@ class PTZCamera:
                     cv2.putText(frame, f"Point: {point_index + 1}/{len(patrol_points)}", 
                                (10, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 0, 0), 2)
                     
-                    cv2.imshow('Patrol Mode', frame)
+                    self._show('Patrol Mode', frame)
                 
                 # 다음 포인트로 이동할 시간인지 확인
                 if time.time() - move_start_time > move_duration:
@@ -405,19 +435,21 @@ class PTZCamera:
                     
                     print(f"Moving to point {point_index + 1}: ({target_pan}, {target_tilt})")
                 
-                if cv2.waitKey(1) & 0xFF == 27:  # ESC 키
+                if self._wait_key() == 27:  # ESC 키
                     break
         
         except KeyboardInterrupt:
             print("사용자에 의해 중단됨")
         
         finally:
-            cv2.destroyAllWindows()
+            self._close_windows()
     
     def cleanup(self):
         """리소스 정리"""
         self.camera.release()
         self.servo_controller.cleanup()
+        if self.stream is not None:
+            self.stream.stop()
 
 class PIDController:
     """PID 제어기 (추적용)"""
@@ -437,13 +469,33 @@ class PIDController:
 
 def main():
     """메인 함수"""
+    parser = argparse.ArgumentParser(description="JetBot PTZ 카메라 제어")
+    parser.add_argument("--stream", type=int, nargs="?", const=8080, metavar="PORT",
+                        help="카메라 화면을 HTTP MJPEG로 스트리밍 (기본 포트 8080)")
+    parser.add_argument("--no-window", action="store_true",
+                        help="로컬 창을 띄우지 않음 (헤드리스, --stream과 함께 사용)")
+    parser.add_argument("--bus", nargs="?", const="jetbot_frames", metavar="NAME",
+                        help="카메라 대신 공유 메모리 프레임 버스 구독 (frame_bus.py 발행자 필요)")
+    args = parser.parse_args()
+    
     print("JetBot PTZ 카메라 제어 시스템")
     print("1. 수동 제어")
     print("2. 얼굴 추적")
     print("3. 순찰 모드")
     print("4. 서보 테스트")
     
-    ptz_camera = PTZCamera()
+    camera = None
+    if args.bus is not None:
+        from frame_bus import FrameSubscriber
+        camera = FrameSubscriber(args.bus)
+    
+    stream = None
+    if args.stream is not None:
+        from mjpeg_server import MJPEGServer
+        stream = MJPEGServer(port=args.stream)
+    
+    ptz_camera = PTZCamera(camera, stream)
+    ptz_camera.show_window = not args.no_window
     
     if not ptz_camera.initialize():
         print("PTZ 카메라 초기화 실패!")
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+JetBotCamera용 재생(replay) 소스
+녹화된 영상 파일, 이미지 디렉토리, .npy 프레임 스택, 주행 세션을 카메라처럼 읽기
+"""
+
+import os
+import csv
+import abc
+import time
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+class ReplaySource(abc.ABC):
+    """
+    재생 소스 기본 클래스 (cv2.VideoCapture와 같은 인터페이스)
+    realtime=True면 녹화 FPS에 맞춰 재생, False면 최대 속도로 재생
+    하위 클래스는 frame_count()와 _load_frame()을 구현
+    """
+
+    def __init__(self, fps=30.0, realtime=True, loop=False):
+        self.fps = fps if fps and fps > 0 else 30.0
+        self.realtime = realtime
+        self.loop = loop
+
+        self.frame_index = 0
+        self._opened = False
+        self._start_time = None
+
+    def __len__(self):
+        # 프레임 수를 모르는 소스는 0
+        return self.frame_count() or 0
+
+    @abc.abstractmethod
+    def frame_count(self):
+        """전체 프레임 수 (모르면 None)"""
+
+    @abc.abstractmethod
+    def _load_frame(self, index):
+        """index 번째 프레임 로드 (BGR ndarray 또는 None)"""
+
+    def isOpened(self):
+        return self._opened
+
+    def _pace(self):
+        """실시간 모드에서 녹화 FPS에 맞춰 대기"""
+        if self._start_time is None:
+            self._start_time = time.monotonic()
+            return
+
+        target_time = self._start_time + self.frame_index / self.fps
+        delay = target_time - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def read(self, image=None):
+        """다음 프레임 읽기"""
+        if not self._opened:
+            return False, None
+
+        count = self.frame_count()
+        if count is not None and self.frame_index >= count:
+            if not self.loop or count == 0:
+                return False, None
+            self.rewind()
+
+        if self.realtime:
+            self._pace()
+
+        frame = self._load_frame(self.frame_index)
+        if frame is None:
+            return False, None
+
+        self.frame_index += 1
+
+        # 호출자가 준 버퍼가 맞으면 그 안에 복사
+        if image is not None and image.shape == frame.shape and image.dtype == frame.dtype:
+            np.copyto(image, frame)
+            return True, image
+
+        return True, np.array(frame)
+
+    def rewind(self):
+        """처음부터 다시 재생"""
+        self.frame_index = 0
+        self._start_time = None
+
+    def set(self, prop_id, value):
+        # 재생 소스는 해상도/FPS 변경을 지원하지 않음
+        return False
+
+    def get(self, prop_id):
+        if prop_id == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop_id == cv2.CAP_PROP_FRAME_COUNT:
+            return len(self)
+        if prop_id == cv2.CAP_PROP_POS_FRAMES:
+            return self.frame_index
+        return 0
+
+    def release(self):
+        self._opened = False
+
+class VideoFileSource(ReplaySource):
+    """녹화 영상 파일 재생 소스"""
+
+    def __init__(self, path, fps=None, realtime=True, loop=False):
+        self.path = path
+        self.cap = cv2.VideoCapture(path)
+
+        if fps is None:
+            fps = self.cap.get(cv2.CAP_PROP_FPS)
+
+        super().__init__(fps, realtime, loop)
+        self._opened = self.cap.isOpened()
+        self._count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+    def frame_count(self):
+        # 일부 코덱은 프레임 수를 알려주지 않음 (끝까지 읽으면 _load_frame에서 확정)
+        return self._count if self._count > 0 else None
+
+    def _load_frame(self, index):
+        ret, frame = self.cap.read()
+        if not ret:
+            self._count = index
+            return None
+        return frame
+
+    def read(self, image=None):
+        ret, frame = super().read(image)
+        if not ret and self.loop and self.frame_index > 0:
+            # 실제 프레임 수가 메타데이터보다 적은 경우
+            self.rewind()
+            ret, frame = super().read(image)
+        return ret, frame
+
+    def rewind(self):
+        super().rewind()
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def release(self):
+        super().release()
+        self.cap.release()
+
+class ImageDirectorySource(ReplaySource):
+    """이미지 디렉토리 재생 소스 (파일 이름 순)"""
+
+    def __init__(self, path, fps=30.0, realtime=True, loop=False, preload=False):
+        super().__init__(fps, realtime, loop)
+        self.path = path
+        self.files = sorted(
+            os.path.join(path, name) for name in os.listdir(path)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+
+        # preload=True면 디코딩 비용을 측정에서 제외
+        self.frames = None
+        if preload:
+            self.frames = [cv2.imread(f) for f in self.files]
+
+        self._opened = len(self.files) > 0
+
+    def frame_count(self):
+        return len(self.files)
+
+    def _load_frame(self, index):
+        if self.frames is not None:
+            return self.frames[index]
+        return cv2.imread(self.files[index])
+
+class NpyStackSource(ReplaySource):
+    """.npy 프레임 스택 재생 소스 (N x H x W x 3, uint8)"""
+
+    def __init__(self, path, fps=30.0, realtime=True, loop=False):
+        super().__init__(fps, realtime, loop)
+        self.path = path
+
+        # 메모리 매핑으로 큰 파일도 바로 열기
+        self.frames = np.load(path, mmap_mode='r')
+        if self.frames.ndim not in (3, 4):
+            raise ValueError(f"지원하지 않는 프레임 스택 형태: {self.frames.shape}")
+
+        self._opened = len(self.frames) > 0
+
+    def frame_count(self):
+        return len(self.frames)
+
+    def _load_frame(self, index):
+        return self.frames[index]
+
+class RecordedSessionSource(ReplaySource):
+    """session_recorder로 녹화한 세션 재생 소스 (청크 영상 + index.csv)"""
+
+    def __init__(self, path, fps=None, realtime=True, loop=False):
+        self.path = path
+        with open(os.path.join(path, "index.csv"), newline='') as f:
+            self.records = list(csv.DictReader(f))
+
+        # FPS가 없으면 녹화 시각 간격으로 추정
+        if fps is None and len(self.records) > 1:
+            timestamps = np.array([float(r["timestamp"]) for r in self.records])
+            interval = np.median(np.diff(timestamps))
+            fps = 1.0 / interval if interval > 0 else None
+
+        super().__init__(fps, realtime, loop)
+        self.cap = None
+        self._chunk = None
+        self.last_record = None
+        self._opened = len(self.records) > 0
+
+    def frame_count(self):
+        return len(self.records)
+
+    def _load_frame(self, index):
+        record = self.records[index]
+        chunk = int(record["chunk"])
+
+        if chunk != self._chunk:
+            if self.cap is not None:
+                self.cap.release()
+            self.cap = cv2.VideoCapture(os.path.join(self.path, f"chunk_{chunk:04d}.avi"))
+            self._chunk = chunk
+
+        ret, frame = self.cap.read()
+        if not ret:
+            return None
+
+        # 녹화 당시의 조향/속도 출력
+        self.last_record = record
+        return frame
+
+    def rewind(self):
+        super().rewind()
+        if self.cap is not None:
+            self.cap.release()
+        self.cap = None
+        self._chunk = None
+
+    def release(self):
+        super().release()
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+def open_replay_source(path, realtime=True, loop=False, fps=None):
+    """
+    경로 형태에 맞는 재생 소스 생성
+    'synthetic' 또는 'synthetic:N'이면 N 프레임 합성 차선 장면 (lane_scene 참고)
+    """
+    if path == 'synthetic' or path.startswith('synthetic:'):
+        from lane_scene import SyntheticLaneSource
+        frames = int(path.split(':', 1)[1]) if ':' in path else 1000
+        return SyntheticLaneSource(frames, fps or 30.0, realtime, loop)
+
+    if os.path.isdir(path) and os.path.exists(os.path.join(path, "index.csv")):
+        return RecordedSessionSource(path, fps, realtime, loop)
+
+    if os.path.isdir(path):
+        return ImageDirectorySource(path, fps or 30.0, realtime, loop)
+
+    if path.lower().endswith('.npy'):
+        return NpyStackSource(path, fps or 30.0, realtime, loop)
+
+    return VideoFileSource(path, fps, realtime, loop)
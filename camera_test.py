@@ -9,35 +9,209 @@ import numpy as np
 import time
 import sys
 import os
+import threading
+from camera_sources import open_replay_source
+
+# appsink로 받을 수 있는 픽셀 포맷
+PIXEL_FORMATS = ('BGR', 'GRAY8', 'I420')
+
+def _crop_to_sensor(crop, width, height, flip_method):
+    """출력(뒤집힌) 좌표 기준 crop을 센서 원본 좌표로 변환"""
+    left, top, right, bottom = crop
+    
+    if flip_method == 0:      # 그대로
+        return left, top, right, bottom
+    if flip_method == 2:      # 180도 회전
+        return width - right, height - bottom, width - left, height - top
+    if flip_method == 4:      # 좌우 반전
+        return width - right, top, width - left, bottom
+    if flip_method == 6:      # 상하 반전
+        return left, height - bottom, right, height - top
+    
+    raise ValueError(f"crop은 flip-method={flip_method}를 지원하지 않습니다.")
+
+def build_gst_pipeline(sensor_id=0, width=640, height=480, fps=30, flip_method=2,
+                       crop=None, output_size=None, pixel_format='BGR'):
+    """
+    CSI 카메라용 GStreamer 파이프라인 생성
+    crop: (left, top, right, bottom) 출력 영상 좌표 기준 잘라낼 영역 (nvvidconv에서 처리)
+    output_size: (width, height) nvvidconv 축소 크기, 생략 시 crop 크기
+    pixel_format: 'BGR' (videoconvert 사용), 'GRAY8' 또는 'I420' (nvvidconv에서 바로 출력)
+    """
+    if pixel_format not in PIXEL_FORMATS:
+        raise ValueError(f"지원하지 않는 픽셀 포맷: {pixel_format}")
+    
+    crop_props = ""
+    out_width, out_height = width, height
+    
+    if crop is not None:
+        left, top, right, bottom = _crop_to_sensor(crop, width, height, flip_method)
+        crop_props = f" left={left} top={top} right={right} bottom={bottom}"
+        out_width, out_height = crop[2] - crop[0], crop[3] - crop[1]
+    
+    if output_size is not None:
+        out_width, out_height = output_size
+    
+    pipeline = (
+        f"nvarguscamerasrc sensor-id={sensor_id} ! "
+        f"video/x-raw(memory:NVMM), width=(int){width}, "
+        f"height=(int){height}, framerate=(fraction){fps}/1 ! "
+        f"nvvidconv flip-method={flip_method}{crop_props} ! "
+    )
+    
+    if pixel_format == 'BGR':
+        pipeline += (
+            f"video/x-raw, width=(int){out_width}, height=(int){out_height}, "
+            f"format=(string)BGRx ! videoconvert ! "
+            f"video/x-raw, format=(string)BGR ! appsink"
+        )
+    else:
+        # GRAY8/I420은 nvvidconv가 직접 변환하므로 videoconvert 불필요
+        pipeline += (
+            f"video/x-raw, width=(int){out_width}, height=(int){out_height}, "
+            f"format=(string){pixel_format} ! appsink"
+        )
+    
+    return pipeline
+
+def lane_roi_crop(width, height, roi_height_ratio):
+    """차선 검출 ROI(화면 하단)에 해당하는 crop 영역"""
+    roi_top = int(height * (1 - roi_height_ratio))
+    return (0, roi_top, width, height)
+
+class FrameRing:
+    """미리 할당된 프레임 링 버퍼 (읽기 전용 뷰 대여)"""
+    
+    def __init__(self, count, shape, dtype=np.uint8):
+        if count < 2:
+            raise ValueError("링 버퍼는 최소 2개 이상이어야 합니다.")
+        
+        self.count = count
+        self.buffers = [np.empty(shape, dtype=dtype) for _ in range(count)]
+        
+        # 소비자에게는 쓰기 불가능한 뷰만 전달
+        self.views = []
+        for buffer in self.buffers:
+            view = buffer.view()
+            view.flags.writeable = False
+            self.views.append(view)
+        
+        self.latest = None
+        self._lent = [0] * count
+        self._next = 0
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """쓰기용 빈 슬롯 확보 (대여 중인 슬롯과 최신 슬롯 제외)"""
+        with self._lock:
+            for i in range(self.count):
+                slot = (self._next + i) % self.count
+                if self._lent[slot] == 0 and slot != self.latest:
+                    self._next = (slot + 1) % self.count
+                    return slot
+        return None
+    
+    def publish(self, slot):
+        """쓰기가 끝난 슬롯을 최신 프레임으로 지정"""
+        with self._lock:
+            self.latest = slot
+    
+    def lend(self, slot):
+        """슬롯의 읽기 전용 뷰 대여"""
+        with self._lock:
+            self._lent[slot] += 1
+        return self.views[slot]
+    
+    def release(self, slot):
+        """대여한 슬롯 반납"""
+        with self._lock:
+            if self._lent[slot] > 0:
+                self._lent[slot] -= 1
+    
+    def lent_count(self):
+        """현재 대여 중인 슬롯 수"""
+        with self._lock:
+            return sum(1 for count in self._lent if count > 0)
+
+def copy_frame(dst, frame):
+    """호출자 버퍼에 프레임 복사 (크기/타입이 다르면 ValueError), 반환값: dst"""
+    if dst.shape != frame.shape or dst.dtype != frame.dtype:
+        raise ValueError(f"버퍼 크기가 프레임과 다릅니다: {dst.shape} {dst.dtype}, 프레임 {frame.shape} {frame.dtype}")
+    np.copyto(dst, frame)
+    return dst
 
 class JetBotCamera:
-    def __init__(self, width=640, height=480, fps=30, camera_id=0):
+    def __init__(self, width=640, height=480, fps=30, camera_id=0, threaded=False, buffer_count=0,
+                 source=None, realtime=True, loop=False,
+                 crop=None, output_size=None, pixel_format='BGR', flip_method=2):
         self.width = width
         self.height = height
         self.fps = fps
         self.camera_id = camera_id
         self.cap = None
         
+        # 파이프라인 내 crop/축소/픽셀 포맷 (CSI 카메라에서만 적용)
+        self.crop = crop
+        self.output_size = output_size
+        self.pixel_format = pixel_format
+        self.flip_method = flip_method
+        
+        # 실제로 열린 백엔드 ('gstreamer', 'usb', 'replay')
+        self.backend = None
+        
+        # 재생 소스 (영상 파일, 이미지 디렉토리, .npy 스택)
+        self.source = source
+        self.realtime = realtime
+        self.loop = loop
+        
+        # 백그라운드 캡처 모드 (항상 최신 프레임만 전달)
+        self.threaded = threaded
+        self.read_timeout = 1.0
+        self._grab_thread = None
+        self._grab_running = False
+        self._frame_cond = threading.Condition()
+        self._latest_frame = None
+        self._latest_seq = 0
+        self._latest_timestamp = None
+        self._last_read_seq = 0
+        self._grab_failed = False
+        
+        # 프레임 링 버퍼 (buffer_count > 0이면 프레임마다 새로 할당하지 않음)
+        self.buffer_count = buffer_count
+        self._ring = None
+        
+        # 마지막으로 전달한 프레임 정보
+        self.frame_seq = 0
+        self.frame_timestamp = None
+        self.dropped_frames = 0
+        
     def initialize(self):
         """카메라 초기화"""
+        if self.source is not None:
+            return self._initialize_replay()
+        
         try:
             # GStreamer 파이프라인으로 CSI 카메라 접근
-            gst_pipeline = (
-                f"nvarguscamerasrc sensor-id={self.camera_id} ! "
-                f"video/x-raw(memory:NVMM), width=(int){self.width}, "
-                f"height=(int){self.height}, framerate=(fraction){self.fps}/1 ! "
-                f"nvvidconv flip-method=2 ! "
-                f"video/x-raw, width=(int){self.width}, height=(int){self.height}, "
-                f"format=(string)BGRx ! videoconvert ! "
-                f"video/x-raw, format=(string)BGR ! appsink"
+            gst_pipeline = build_gst_pipeline(
+                self.camera_id, self.width, self.height, self.fps, self.flip_method,
+                crop=self.crop, output_size=self.output_size, pixel_format=self.pixel_format
             )
             
             print(f"GStreamer 파이프라인으로 카메라 초기화 중... (ID: {self.camera_id})")
             self.cap = cv2.VideoCapture(gst_pipeline, cv2.CAP_GSTREAMER)
+            self.backend = 'gstreamer'
             
             if not self.cap.isOpened():
                 print("GStreamer 실패, USB 카메라로 시도 중...")
                 self.cap = cv2.VideoCapture(self.camera_id)
+                self.backend = 'usb'
+                
+                # USB 카메라는 전체 BGR 프레임만 제공
+                if self.crop is not None or self.output_size is not None or self.pixel_format != 'BGR':
+                    print("USB 카메라에서는 crop/축소/픽셀 포맷 설정을 사용할 수 없어 BGR 전체 프레임으로 동작합니다.")
+                    self.crop = None
+                    self.output_size = None
+                    self.pixel_format = 'BGR'
                 
             if not self.cap.isOpened():
                 raise Exception("카메라를 열 수 없습니다.")
@@ -47,6 +221,9 @@ class JetBotCamera:
             self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
             self.cap.set(cv2.CAP_PROP_FPS, self.fps)
             
+            if self.threaded:
+                self._start_grab_thread()
+            
             print(f"카메라 초기화 성공! 해상도: {self.width}x{self.height}, FPS: {self.fps}")
             return True
             
@@ -54,22 +231,310 @@ class JetBotCamera:
             print(f"카메라 초기화 실패: {e}")
             return False
             
-    def read_frame(self):
-        """프레임 읽기"""
+    def frame_format(self):
+        """
+        소비자용 프레임 형식 정보
+        pixel_format: 'BGR' (H x W x 3), 'GRAY8' (H x W), 'I420' (H*3/2 x W)
+        crop: 원본 영상 기준 잘라낸 영역 (없으면 None)
+        """
+        if self.crop is not None:
+            width, height = self.crop[2] - self.crop[0], self.crop[3] - self.crop[1]
+        else:
+            width, height = self.width, self.height
+        
+        if self.output_size is not None:
+            width, height = self.output_size
+        
+        return {
+            "pixel_format": self.pixel_format,
+            "width": width,
+            "height": height,
+            "crop": self.crop
+        }
+    
+    def set_output_size(self, output_size):
+        """
+        파이프라인 출력 크기 변경 (CSI 카메라만 지원, 카메라를 다시 시작함)
+        반환값: 적용 여부 (False면 호출자가 직접 축소해야 함)
+        """
+        if self.backend != 'gstreamer':
+            return False
+        
+        if output_size == self.output_size:
+            return True
+        
+        previous_size = self.output_size
+        self.release()
+        self.output_size = output_size
+        
+        if self.initialize() and self.backend == 'gstreamer':
+            return True
+        
+        # 실패하면 이전 설정으로 복구
+        print("출력 크기 변경 실패, 이전 설정으로 복구합니다.")
+        self.release()
+        self.output_size = previous_size
+        self.initialize()
+        return False
+    
+    def _initialize_replay(self):
+        """녹화 데이터 재생 소스 초기화"""
+        try:
+            print(f"재생 소스 여는 중... ({self.source})")
+            self.cap = open_replay_source(self.source, realtime=self.realtime, loop=self.loop)
+            self.backend = 'replay'
+            
+            if not self.cap.isOpened():
+                raise Exception("재생 소스를 열 수 없습니다.")
+            
+            self.fps = self.cap.fps
+            
+            if self.threaded:
+                self._start_grab_thread()
+            
+            mode = "실시간" if self.realtime else "최대 속도"
+            count = self.cap.frame_count()
+            count = count if count is not None else "알 수 없음"
+            print(f"재생 소스 초기화 성공! 프레임 수: {count}, FPS: {self.fps:.1f} ({mode})")
+            return True
+            
+        except Exception as e:
+            print(f"재생 소스 초기화 실패: {e}")
+            self.cap = None
+            return False
+    
+    def _read_into_ring(self):
+        """
+        링 버퍼 슬롯에 직접 디코딩
+        반환값: (ret, slot), 빈 슬롯이 없으면 (None, None)
+        """
+        if self._ring is None:
+            # 첫 프레임으로 실제 해상도를 확인한 뒤 버퍼 할당
+            ret, frame = self.cap.read()
+            if not ret:
+                return False, None
+            
+            self._ring = FrameRing(self.buffer_count, frame.shape, frame.dtype)
+            slot = self._ring.acquire()
+            np.copyto(self._ring.buffers[slot], frame)
+            return True, slot
+        
+        slot = self._ring.acquire()
+        if slot is None:
+            return None, None
+        
+        ret, _ = self._decode_into(self._ring.buffers[slot])
+        if not ret:
+            return False, None
+        
+        return True, slot
+    
+    def _decode_into(self, buffer):
+        """주어진 버퍼에 프레임 디코딩"""
+        ret, frame = self.cap.read(buffer)
+        if not ret:
+            return False, None
+        
+        # 백엔드가 버퍼를 재사용하지 않은 경우 복사
+        if frame is not buffer:
+            if frame.shape != buffer.shape:
+                return False, None
+            np.copyto(buffer, frame)
+        
+        return True, buffer
+    
+    def read_into(self, buffer):
+        """
+        호출자가 준 버퍼(공유 메모리 등)에 직접 프레임 읽기
+        반환값: (ret, buffer), 백그라운드 캡처 모드에서는 최신 프레임을 복사
+        버퍼 크기/타입이 프레임과 다르면 ValueError
+        """
         if self.cap is None:
             return None, None
+        
+        if self.threaded:
+            ret, frame, slot = self.borrow_frame()
+            if not ret:
+                return False, None
             
-        ret, frame = self.cap.read()
-        if ret:
-            return True, frame
-        else:
+            try:
+                copy_frame(buffer, frame)
+            finally:
+                self.release_frame(slot)
+            return True, buffer
+        
+        ret, frame = self._decode_into(buffer)
+        if not ret:
             return False, None
+        
+        self.frame_seq += 1
+        self.frame_timestamp = time.monotonic()
+        return True, frame
+    
+    def _start_grab_thread(self):
+        """백그라운드 캡처 스레드 시작"""
+        with self._frame_cond:
+            self._latest_frame = None
+            self._latest_seq = 0
+            self._latest_timestamp = None
+            self._last_read_seq = 0
+            self._grab_failed = False
+        
+        self._grab_running = True
+        self._grab_thread = threading.Thread(target=self._grab_loop, name="JetBotCameraGrab", daemon=True)
+        self._grab_thread.start()
+    
+    def _stop_grab_thread(self):
+        """백그라운드 캡처 스레드 정지"""
+        self._grab_running = False
+        with self._frame_cond:
+            self._frame_cond.notify_all()
+        
+        if self._grab_thread is not None:
+            self._grab_thread.join(timeout=2.0)
+            self._grab_thread = None
+    
+    def _grab_loop(self):
+        """드라이버 큐를 계속 비우면서 최신 프레임만 보관"""
+        failures = 0
+        
+        while self._grab_running:
+            if self.buffer_count:
+                ret, slot = self._read_into_ring()
+                frame = None
+                if ret is None:
+                    # 모든 슬롯이 대여 중이면 반납을 기다림
+                    time.sleep(0.001)
+                    continue
+            else:
+                ret, frame = self.cap.read()
+            timestamp = time.monotonic()
+            
+            if not ret:
+                failures += 1
+                if failures >= 30:
+                    # 연속 실패 시 읽기 대기 중인 쪽에 종료를 알림
+                    with self._frame_cond:
+                        self._grab_failed = True
+                        self._frame_cond.notify_all()
+                    break
+                time.sleep(0.005)
+                continue
+            
+            failures = 0
+            
+            with self._frame_cond:
+                # 소비되지 않은 이전 프레임은 버려짐
+                if self._latest_seq > self._last_read_seq:
+                    self.dropped_frames += 1
+                
+                if self.buffer_count:
+                    self._ring.publish(slot)
+                
+                self._latest_frame = frame
+                self._latest_seq += 1
+                self._latest_timestamp = timestamp
+                self._frame_cond.notify_all()
+    
+    def borrow_frame(self, timeout=None):
+        """
+        최신 프레임 대여 (링 버퍼 모드에서는 복사 없는 읽기 전용 뷰)
+        반환값: (ret, frame, slot), 사용 후 release_frame(slot) 호출 필요
+        seq와 캡처 시각은 frame_seq, frame_timestamp에 기록됨
+        ret=False는 스트림 끝/읽기 실패(백그라운드 모드는 시간 초과 포함)
+        백그라운드 없는 링 버퍼 모드에서 슬롯이 모두 대여 중이면 RuntimeError
+        (백그라운드 모드는 캡처 스레드가 반납을 기다림)
+        """
+        if self.cap is None:
+            return None, None, None
+        
+        if not self.threaded:
+            if self.buffer_count:
+                ret, slot = self._read_into_ring()
+                if ret is None:
+                    # 반납할 수 있는 쪽이 호출자뿐이므로 기다리지 않고 바로 알림 (스트림 끝과 구분)
+                    raise RuntimeError(f"프레임 슬롯 {self.buffer_count}개가 모두 대여 중입니다 "
+                                       "(release_frame() 누락 또는 buffer_count 부족)")
+                if not ret:
+                    return False, None, None
+                frame = self._ring.lend(slot)
+            else:
+                ret, frame = self.cap.read()
+                slot = None
+                if not ret:
+                    return False, None, None
+            
+            self.frame_seq += 1
+            self.frame_timestamp = time.monotonic()
+            return True, frame, slot
+        
+        if timeout is None:
+            timeout = self.read_timeout
+        
+        with self._frame_cond:
+            # 아직 전달하지 않은 새 프레임이 올 때까지 대기
+            has_new_frame = self._frame_cond.wait_for(
+                lambda: self._latest_seq > self._last_read_seq or self._grab_failed or not self._grab_running,
+                timeout=timeout
+            )
+            
+            if not has_new_frame or self._latest_seq <= self._last_read_seq:
+                return False, None, None
+            
+            if self.buffer_count:
+                slot = self._ring.latest
+                frame = self._ring.lend(slot)
+            else:
+                slot = None
+                frame = self._latest_frame
+            
+            self._last_read_seq = self._latest_seq
+            self.frame_seq = self._latest_seq
+            self.frame_timestamp = self._latest_timestamp
+        
+        return True, frame, slot
+    
+    def release_frame(self, slot):
+        """대여한 프레임 반납"""
+        if slot is not None and self._ring is not None:
+            self._ring.release(slot)
+    
+    def read_latest(self, timeout=None, out=None):
+        """
+        최신 프레임 읽기
+        반환값: (ret, frame, seq, timestamp)
+        seq는 캡처 순번, timestamp는 time.monotonic() 기준 캡처 시각
+        out: 프레임을 복사할 호출자 버퍼 (없으면 링 버퍼 모드에서 새 사본 할당)
+        """
+        ret, frame, slot = self.borrow_frame(timeout)
+        if not ret:
+            return ret, None, None, None
+        
+        try:
+            if out is not None:
+                frame = copy_frame(out, frame)
+            elif slot is not None:
+                # 기존 호출자는 프레임에 직접 그리므로 쓰기 가능한 사본 전달
+                frame = frame.copy()
+        finally:
+            self.release_frame(slot)
+        
+        return True, frame, self.frame_seq, self.frame_timestamp
+    
+    def read_frame(self, out=None):
+        """프레임 읽기 (out: 프레임을 복사할 호출자 버퍼)"""
+        ret, frame, _, _ = self.read_latest(out=out)
+        return ret, frame
             
     def release(self):
         """카메라 해제"""
+        if self._grab_thread is not None:
+            self._stop_grab_thread()
+        
         if self.cap is not None:
             self.cap.release()
             self.cap = None
+            self._ring = None
             print("카메라 해제됨")
 
 def test_camera_basic():
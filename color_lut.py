@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+BGR → 차선 색상 마스크 룩업 테이블
+노란색/흰색 HSV 범위를 양자화된 BGR 3차원 테이블로 한 번 계산해 두고,
+프레임마다 HSV 변환 + inRange 대신 테이블 조회(cv2.remap) 한 번으로 마스크 생성
+"""
+
+import os
+import hashlib
+import cv2
+import numpy as np
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "jetbot")
+
+def _normalize_ranges(ranges):
+    """HSV 범위를 비교/해시 가능한 정수 튜플로 변환"""
+    return tuple((tuple(int(v) for v in lower), tuple(int(v) for v in upper)) for lower, upper in ranges)
+
+class ColorMaskLUT:
+    """
+    양자화 BGR 색상 마스크 테이블
+    bits: 채널당 양자화 비트 수 (4~7, 6이면 64단계, 테이블 약 1MB)
+    테이블은 임계값 해시를 키로 디스크에 캐시
+    """
+
+    def __init__(self, bits=6, cache_dir=DEFAULT_CACHE_DIR):
+        if not 4 <= bits <= 7:
+            # remap 좌표(int16)에 x = r | g << 8이 들어가야 하므로 최대 7비트
+            raise ValueError(f"지원하지 않는 양자화 비트 수: {bits}")
+
+        self.bits = bits
+        self.shift = 8 - bits
+        self.cache_dir = cache_dir
+
+        # RGBA 픽셀을 uint32로 보고 채널별 상위 비트만 남기는 마스크 (알파는 0)
+        level_mask = (0xFF >> self.shift) << self.shift
+        self._pixel_mask = np.uint32(level_mask | level_mask << 8 | level_mask << 16)
+
+        self.table = None
+        self.ranges = None
+        self._map = None
+
+    def cache_key(self, ranges):
+        """임계값과 양자화 비트 수로 만든 캐시 키"""
+        values = [self.bits] + [int(v) for lower, upper in ranges for v in (*lower, *upper)]
+        return hashlib.sha1(",".join(map(str, values)).encode("ascii")).hexdigest()[:16]
+
+    def _cache_path(self, ranges):
+        return os.path.join(self.cache_dir, f"lane_lut_{self.cache_key(ranges)}.npy")
+
+    def _compute_table(self, ranges):
+        """
+        양자화 칸 중심 색상의 HSV 마스크 계산
+        반환값: remap용 2차원 테이블 (행 = b, 열 = r | g << 8)
+        """
+        levels = 1 << self.bits
+        step = 256 // levels
+        values = (np.arange(levels) * step + step // 2).astype(np.uint8)
+
+        b, g, r = np.meshgrid(values, values, values, indexing='ij')
+        colors = np.stack([b, g, r], axis=-1).reshape(-1, 1, 3)
+        hsv = cv2.cvtColor(colors, cv2.COLOR_BGR2HSV)
+
+        mask = np.zeros(len(colors), dtype=np.uint8)
+        for lower, upper in ranges:
+            mask |= cv2.inRange(hsv, np.asarray(lower), np.asarray(upper)).ravel()
+
+        index = np.arange(levels)
+        bq, gq, rq = np.meshgrid(index, index, index, indexing='ij')
+        table = np.zeros((levels, ((levels - 1) << 8) + levels), dtype=np.uint8)
+        table[bq, rq | (gq << 8)] = mask.reshape(levels, levels, levels)
+        return table
+
+    def build(self, ranges):
+        """
+        테이블 준비 (디스크 캐시가 있으면 로드, 없으면 계산 후 저장)
+        ranges: [(hsv_lower, hsv_upper), ...] - 하나라도 만족하면 마스크 255
+        """
+        ranges = _normalize_ranges(ranges)
+        path = self._cache_path(ranges) if self.cache_dir else None
+
+        table = None
+        if path and os.path.exists(path):
+            try:
+                table = np.load(path)
+            except (OSError, ValueError) as e:
+                print(f"색상 테이블 캐시 로드 실패, 다시 계산합니다: {e}")
+
+        if table is None:
+            table = self._compute_table(ranges)
+            if path:
+                try:
+                    os.makedirs(self.cache_dir, exist_ok=True)
+                    np.save(path, table)
+                except OSError as e:
+                    print(f"색상 테이블 캐시 저장 실패: {e}")
+
+        self.table = table
+        self.ranges = ranges
+        return table
+
+    def apply(self, frame, ranges):
+        """BGR 프레임의 색상 마스크 (임계값이 바뀌었으면 테이블 재생성)"""
+        ranges = _normalize_ranges(ranges)
+        if ranges != self.ranges:
+            self.build(ranges)
+
+        height, width = frame.shape[:2]
+        if self._map is None or self._map.shape[:2] != (height, width):
+            self._map = np.empty((height, width, 4), dtype=np.uint8)
+
+        # RGBA 바이트 [r, g, b, a]를 양자화하면 그대로 remap 좌표 (x = r | g << 8, y = b)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGBA, dst=self._map)
+        pixels = self._map.view(np.uint32)
+        np.bitwise_and(pixels, self._pixel_mask, out=pixels)
+        np.right_shift(pixels, self.shift, out=pixels)
+
+        return cv2.remap(self.table, self._map.view(np.int16), None, cv2.INTER_NEAREST)
+
+def benchmark_lut(frames=200, bits=6):
+    """HSV 변환 방식과 테이블 방식의 처리 시간 및 마스크 차이 비교"""
+    import time
+    from autonomous_driving import LaneDetector
+    from lane_scene import SyntheticLaneScene
+
+    scene = SyntheticLaneScene(seed=0)
+    rois = [scene.render(**scene.random_params())[0][192:] for _ in range(frames)]
+
+    detector = LaneDetector()
+    lut = ColorMaskLUT(bits, cache_dir=None)
+    ranges = detector.color_ranges()
+    lut.build(ranges)
+
+    results = {}
+    for name, func in (("HSV", detector.detect_color_lanes), ("LUT", lambda roi: lut.apply(roi, ranges))):
+        func(rois[0])
+        start_time = time.perf_counter()
+        for roi in rois:
+            func(roi)
+        results[name] = (time.perf_counter() - start_time) / frames * 1000
+
+    mismatch = np.mean([np.mean(detector.detect_color_lanes(roi) != lut.apply(roi, ranges)) for roi in rois])
+    noise = np.random.default_rng(0).integers(0, 256, rois[0].shape, dtype=np.uint8)
+    noise_mismatch = np.mean(detector.detect_color_lanes(noise) != lut.apply(noise, ranges))
+
+    print(f"ROI {rois[0].shape[1]}x{rois[0].shape[0]}, {bits}비트 테이블 ({lut.table.nbytes / 1024:.0f}KB)")
+    print(f"HSV + inRange: {results['HSV']:.3f}ms, 테이블 조회: {results['LUT']:.3f}ms "
+          f"({results['HSV'] / results['LUT']:.1f}x)")
+    print(f"마스크 불일치: 합성 프레임 {mismatch * 100:.3f}%, 무작위 색상 {noise_mismatch * 100:.3f}%")
+
+if __name__ == "__main__":
+    benchmark_lut()
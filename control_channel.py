@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+헤드리스 제어 채널
+화면/키보드 없이 표준 입력이나 UNIX 소켓으로 한 줄에 하나씩 명령을 받아
+주행 루프가 블로킹 없이 꺼내 쓰도록 큐에 넣음
+"""
+
+import os
+import abc
+import sys
+import stat
+import queue
+import socket
+import selectors
+import threading
+
+# 명령 → 설명 (AutonomousDriving._handle_command 참고)
+COMMANDS = {
+    "pause": "모터 정지",
+    "resume": "모터 재시작",
+    "toggle": "정지/재시작 전환",
+    "debug": "디버그 화면 전환",
+    "stats": "지연 통계 출력",
+    "profile": "검출기 단계별 프로파일 시작/결과 출력",
+    "quit": "자율주행 종료"
+}
+
+class ControlChannel(abc.ABC):
+    """명령 큐 (하위 클래스의 읽기 스레드가 채움)"""
+
+    def __init__(self):
+        self._commands = queue.Queue()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._read_loop, name=type(self).__name__, daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._running = False
+
+    def poll(self):
+        """받은 명령 하나 (없으면 None, 블로킹 없음)"""
+        try:
+            return self._commands.get_nowait()
+        except queue.Empty:
+            return None
+
+    def _accept(self, line):
+        """명령 한 줄 처리, 반환값: 응답 문자열"""
+        command = line.strip().lower()
+        if not command:
+            return None
+        if command not in COMMANDS:
+            return f"error: 알 수 없는 명령 {command} (사용 가능: {', '.join(COMMANDS)})"
+        self._commands.put(command)
+        return f"ok {command}"
+
+    @abc.abstractmethod
+    def _read_loop(self):
+        """명령을 읽어 _accept()에 넘기는 스레드 본체"""
+
+class StdinControl(ControlChannel):
+    """
+    표준 입력 명령 (입력이 닫혀도 주행은 계속)
+    selectors로 0.5초씩 기다리며 읽으므로 stop() 후 곧 스레드가 끝남
+    select를 쓸 수 없는 입력(Windows 콘솔, 리다이렉트한 파일)은 줄 단위 블로킹 읽기로 대체하며,
+    이때는 데몬 스레드가 다음 줄이 올 때까지 남아 있다가 프로세스와 함께 종료됨
+    """
+
+    def _read_loop(self):
+        try:
+            fd = sys.stdin.fileno()
+            selector = selectors.DefaultSelector()
+            selector.register(fd, selectors.EVENT_READ)
+        except (AttributeError, OSError, ValueError):
+            self._blocking_loop()
+            return
+
+        pending = b""
+        with selector:
+            while self._running:
+                try:
+                    if not selector.select(timeout=0.5):
+                        continue
+                except OSError:
+                    self._blocking_loop()
+                    return
+                # sys.stdin 버퍼를 거치지 않고 읽어야 select 결과와 어긋나지 않음
+                chunk = os.read(fd, 4096)
+                if not chunk:
+                    break
+                *lines, pending = (pending + chunk).split(b"\n")
+                for line in lines:
+                    self._reply(line.decode("utf-8", "replace"))
+
+    def _blocking_loop(self):
+        for line in sys.stdin:
+            if not self._running:
+                break
+            self._reply(line)
+
+    def _reply(self, line):
+        reply = self._accept(line)
+        if reply is not None and reply.startswith("error"):
+            print(reply, file=sys.stderr)
+
+class SocketControl(ControlChannel):
+    """
+    UNIX 소켓 명령 서버 (예: echo pause | nc -U /tmp/jetbot.sock)
+    연결마다 스레드 하나, 명령마다 한 줄 응답
+    """
+
+    def __init__(self, path="/tmp/jetbot.sock"):
+        super().__init__()
+        self.path = path
+        self._server = None
+
+    def start(self):
+        if not hasattr(socket, "AF_UNIX"):
+            print("이 플랫폼은 UNIX 소켓을 지원하지 않습니다. 표준 입력 제어를 사용하세요.")
+            return False
+
+        try:
+            # 이전 실행이 남긴 소켓 파일만 제거 (잘못 입력한 경로의 일반 파일은 지우지 않음)
+            if os.path.lexists(self.path):
+                if not stat.S_ISSOCK(os.lstat(self.path).st_mode):
+                    print(f"제어 소켓 경로에 소켓이 아닌 파일이 있습니다: {self.path}")
+                    return False
+                os.unlink(self.path)
+            self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._server.bind(self.path)
+            self._server.listen(4)
+            self._server.settimeout(0.5)
+        except OSError as e:
+            print(f"제어 소켓 생성 실패: {e}")
+            return False
+
+        print(f"제어 소켓 대기 중: {self.path}")
+        return super().start()
+
+    def stop(self):
+        super().stop()
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+    def _read_loop(self):
+        while self._running:
+            try:
+                conn, _ = self._server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        """연결 하나의 명령 처리"""
+        try:
+            with conn, conn.makefile("rwb", buffering=0) as stream:
+                for line in stream:
+                    if not self._running:
+                        break
+                    reply = self._accept(line.decode("utf-8", "replace"))
+                    if reply is not None:
+                        stream.write((reply + "\n").encode("utf-8"))
+        except OSError:
+            pass
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+자율주행 디버그 화면 렌더러
+주행 루프는 정해진 주기마다 ROI/마스크 사본과 표시할 값만 넘기고,
+마스크 변환/그리기/축소/imshow/waitKey는 렌더링 스레드에서 처리 (키 입력은 큐로 전달)
+"""
+
+import time
+import queue
+import threading
+import cv2
+import numpy as np
+
+class DebugRenderer:
+    """
+    별도 스레드 디버그 화면
+    fps: 화면 갱신 주기 (주행 루프보다 낮게), show_window: 로컬 창 표시,
+    stream: mjpeg_server.MJPEGServer (선택)
+    HighGUI 호출(imshow, waitKey, destroyWindow)은 모두 렌더링 스레드에서만 실행
+    """
+
+    def __init__(self, window_name='Autonomous Driving Debug', fps=10, show_window=True, stream=None,
+                 size=(640, 240), key_interval=0.05):
+        self.window_name = window_name
+        self.interval = 1.0 / fps if fps else 0.0
+        self.show_window = show_window
+        self.stream = stream
+        self.size = size
+
+        # 새 스냅샷이 없어도 이 간격으로 waitKey를 불러 창과 키 입력 유지
+        self.key_interval = key_interval
+
+        self._cond = threading.Condition()
+        self._keys = queue.Queue()
+        self._thread = None
+        self._running = False
+
+        # 스냅샷 버퍼 두 벌 (렌더링 중인 쪽은 건드리지 않음)
+        self._rois = [None, None]
+        self._masks = [None, None]
+        self._info = [None, None]
+        self._pending = None
+        self._rendering = None
+        self._next_submit = 0.0
+
+        # 렌더링 버퍼와 텍스트 캐시 (줄 번호 → (문자열, 글자 이미지, 글자 픽셀 마스크))
+        self._canvas = np.zeros((size[1], size[0], 3), dtype=np.uint8)
+        self._mask_bgr = None
+        self._text_cache = {}
+
+        # 통계
+        self.submitted = 0
+        self.rendered = 0
+        self.text_redraws = 0
+
+    def start(self):
+        """렌더링 스레드 시작"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._render_loop, name="debug-renderer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """렌더링 스레드 종료 (창도 스레드에서 닫음)"""
+        if not self._running:
+            return
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._thread.join(2.0)
+        print(f"디버그 화면: 요청 {self.submitted}회, 렌더링 {self.rendered}회, 텍스트 다시 그림 {self.text_redraws}회")
+
+    def due(self):
+        """새 스냅샷을 넘길 때가 됐는지 (주행 루프에서 값을 만들기 전에 확인)"""
+        return self._running and time.monotonic() >= self._next_submit
+
+    def submit(self, roi, mask, center_x, lines):
+        """
+        스냅샷 전달 (due()가 아니면 무시, 반환값: 전달했으면 True)
+        roi/mask는 복사하므로 호출 후 바로 재사용 가능, lines는 표시할 문자열 목록
+        """
+        if not self.due():
+            return False
+        self._next_submit = time.monotonic() + self.interval
+
+        with self._cond:
+            index = 1 if self._rendering == 0 else 0
+            if self._rois[index] is None or self._rois[index].shape != roi.shape:
+                self._rois[index] = np.empty_like(roi)
+            if self._masks[index] is None or self._masks[index].shape != mask.shape:
+                self._masks[index] = np.empty_like(mask)
+            np.copyto(self._rois[index], roi)
+            np.copyto(self._masks[index], mask)
+            self._info[index] = (int(center_x), tuple(lines))
+            self._pending = index
+            self.submitted += 1
+            self._cond.notify()
+        return True
+
+    def poll_key(self):
+        """렌더링 스레드가 받은 키 (없으면 0xFF, 블로킹 없음)"""
+        try:
+            return self._keys.get_nowait()
+        except queue.Empty:
+            return 0xFF
+
+    def _render_loop(self):
+        try:
+            while True:
+                with self._cond:
+                    if self._pending is None and self._running:
+                        self._cond.wait(self.key_interval)
+                    if not self._running:
+                        break
+                    index = self._pending
+                    self._pending = None
+                    self._rendering = index
+
+                if index is not None:
+                    self._render(self._rois[index], self._masks[index], *self._info[index])
+                    with self._cond:
+                        self._rendering = None
+
+                if self.show_window:
+                    key = cv2.waitKey(1) & 0xFF
+                    if key != 0xFF:
+                        self._keys.put(key)
+        except Exception as e:
+            print(f"디버그 화면 오류: {e}")
+        finally:
+            if self.show_window and self.rendered:
+                cv2.destroyWindow(self.window_name)
+                cv2.waitKey(1)
+
+    def _render(self, roi, mask, center_x, lines):
+        """ROI | 마스크 캔버스 구성 후 표시/스트리밍"""
+        if self._mask_bgr is None or self._mask_bgr.shape[:2] != mask.shape[:2]:
+            self._mask_bgr = np.empty((mask.shape[0], mask.shape[1], 3), dtype=np.uint8)
+        cv2.cvtColor(mask, cv2.COLOR_GRAY2BGR, dst=self._mask_bgr)
+
+        # 중앙선 표시
+        cv2.line(self._mask_bgr, (center_x, 0), (center_x, mask.shape[0]), (0, 255, 0), 2)
+
+        half = self.size[0] // 2
+        if roi.ndim == 2:
+            roi = cv2.cvtColor(roi, cv2.COLOR_GRAY2BGR)
+        cv2.resize(roi, (half, self.size[1]), dst=self._canvas[:, :half])
+        cv2.resize(self._mask_bgr, (self.size[0] - half, self.size[1]), dst=self._canvas[:, half:])
+
+        self._draw_text(self._canvas[:, half:], lines)
+
+        # 원격 시청자에게는 인코딩 스레드가 한 번만 JPEG로 변환해 전달
+        if self.stream is not None:
+            self.stream.publish(self._canvas)
+        if self.show_window:
+            cv2.imshow(self.window_name, self._canvas)
+        self.rendered += 1
+
+    def _draw_text(self, region, lines, line_height=24):
+        """줄별 글자 이미지를 캐시해 두고 문자열이 바뀐 줄만 putText로 다시 그림"""
+        width = region.shape[1]
+        for i, text in enumerate(lines):
+            top = 8 + i * line_height
+            if top + line_height > region.shape[0]:
+                break
+
+            cached = self._text_cache.get(i)
+            if cached is None or cached[0] != text:
+                patch = np.zeros((line_height, width, 3), dtype=np.uint8)
+                cv2.putText(patch, text, (8, line_height - 6), cv2.FONT_HERSHEY_SIMPLEX, 0.55, (0, 255, 0), 2)
+                cached = (text, patch, patch.any(axis=2, keepdims=True))
+                self._text_cache[i] = cached
+                self.text_redraws += 1
+
+            np.copyto(region[top:top + line_height], cached[1], where=cached[2])
@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+"""
+공유 메모리 프레임 버스
+카메라 하나를 여러 프로세스(차선 추종, PTZ 얼굴 추적, VLM)가 함께 사용
+
+슬롯마다 seqlock 카운터로 쓰기 중/덮어쓰기를 검출
+메모리 순서: NumPy int64 저장은 프로세스 사이 순서를 보장하지 않으므로 (x86은 저장 순서가 유지되지만
+aarch64(Jetson)는 아님) 카운터/메타데이터는 버스 잠금 파일의 flock 안에서만 읽고 씀
+잠금 획득/해제가 메모리 장벽 역할을 해서, 잠금 밖에서 쓴 프레임 데이터도 다음 잠금 구간 전에 보이게 됨
+(fcntl이 없는 플랫폼은 잠금 없이 동작하며 x86 저장 순서에 의존)
+"""
+
+import os
+import time
+import signal
+import contextlib
+import argparse
+import tempfile
+import numpy as np
+from multiprocessing import shared_memory
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from camera_test import JetBotCamera
+
+DEFAULT_BUS_NAME = "jetbot_frames"
+BUS_MAGIC = 0x4A424655  # 'JBFU'
+
+# 헤더 필드 (int64)
+HDR_MAGIC = 0
+HDR_SLOTS = 1
+HDR_HEIGHT = 2
+HDR_WIDTH = 3
+HDR_CHANNELS = 4
+HDR_LATEST_SEQ = 5
+HDR_LATEST_SLOT = 6
+HDR_CLOSED = 7
+HEADER_FIELDS = 8
+
+# 슬롯 메타데이터 필드 (int64)
+META_LOCK = 0       # seqlock 카운터 (홀수면 쓰는 중)
+META_SEQ = 1        # 프레임 순번
+META_TIMESTAMP = 2  # 캡처 시각 (time.monotonic_ns)
+META_FIELDS = 3
+
+def _bus_size(slots, height, width, channels):
+    """공유 메모리 전체 크기"""
+    return (HEADER_FIELDS + slots * META_FIELDS) * 8 + slots * height * width * channels
+
+def _map_bus(buf, slots, height, width, channels):
+    """공유 메모리를 헤더, 메타데이터, 프레임 배열로 매핑"""
+    header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=buf)
+    meta = np.ndarray((slots, META_FIELDS), dtype=np.int64, buffer=buf, offset=HEADER_FIELDS * 8)
+
+    frame_shape = (slots, height, width, channels) if channels > 1 else (slots, height, width)
+    frames = np.ndarray(frame_shape, dtype=np.uint8, buffer=buf,
+                        offset=(HEADER_FIELDS + slots * META_FIELDS) * 8)
+    return header, meta, frames
+
+class BusLock:
+    """프레임 버스 메타데이터 잠금 (잠금 파일 flock, 프로세스 간 메모리 장벽)"""
+
+    def __init__(self, name):
+        self.path = os.path.join(tempfile.gettempdir(), f"{name}.lock")
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666) if fcntl is not None else None
+
+    @contextlib.contextmanager
+    def _hold(self, mode):
+        if self.fd is None:
+            yield
+            return
+        fcntl.flock(self.fd, mode)
+        try:
+            yield
+        finally:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    def shared(self):
+        """읽기 잠금 (with 문)"""
+        return self._hold(fcntl.LOCK_SH if fcntl is not None else None)
+
+    def exclusive(self):
+        """쓰기 잠금 (with 문)"""
+        return self._hold(fcntl.LOCK_EX if fcntl is not None else None)
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+def _attach_shared_memory(name):
+    """구독자 측 공유 메모리 연결 (종료 시 삭제하지 않도록 추적 해제)"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python 3.12 이하: resource_tracker가 종료 시 unlink하지 않도록 등록 해제
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+        return shm
+
+class FramePublisher:
+    """카메라를 소유하고 프레임을 공유 메모리 링에 기록하는 발행자"""
+
+    def __init__(self, camera=None, name=DEFAULT_BUS_NAME, slots=4):
+        if slots < 2:
+            raise ValueError("슬롯은 최소 2개 이상이어야 합니다.")
+
+        self.camera = camera if camera is not None else JetBotCamera()
+        self.name = name
+        self.slots = slots
+
+        self.shm = None
+        self.header = None
+        self.meta = None
+        self.frames = None
+
+        self.seq = 0
+        self.is_running = False
+        self._lock = None
+
+    def initialize(self):
+        """카메라 초기화 및 공유 메모리 생성"""
+        if not self.camera.initialize():
+            print("카메라 초기화 실패!")
+            return False
+
+        # 첫 프레임으로 실제 해상도 확인
+        ret, frame = self.camera.read_frame()
+        if not ret:
+            print("첫 프레임 읽기 실패!")
+            self.camera.release()
+            return False
+
+        height, width = frame.shape[:2]
+        channels = frame.shape[2] if frame.ndim == 3 else 1
+
+        try:
+            # 이전 실행에서 남은 버스가 있으면 제거
+            try:
+                stale = shared_memory.SharedMemory(name=self.name)
+                stale.close()
+                stale.unlink()
+            except FileNotFoundError:
+                pass
+
+            self.shm = shared_memory.SharedMemory(
+                name=self.name, create=True, size=_bus_size(self.slots, height, width, channels)
+            )
+        except Exception as e:
+            print(f"공유 메모리 생성 실패: {e}")
+            self.camera.release()
+            return False
+
+        self._lock = BusLock(self.name)
+        self.header, self.meta, self.frames = _map_bus(self.shm.buf, self.slots, height, width, channels)
+        with self._lock.exclusive():
+            self.meta[:] = 0
+            self.header[:] = 0
+            self.header[HDR_SLOTS] = self.slots
+            self.header[HDR_HEIGHT] = height
+            self.header[HDR_WIDTH] = width
+            self.header[HDR_CHANNELS] = channels
+            self.header[HDR_LATEST_SLOT] = -1
+            # 매직 값은 마지막에 기록 (구독자는 이 값을 보고 준비 완료를 판단)
+            self.header[HDR_MAGIC] = BUS_MAGIC
+
+        print(f"프레임 버스 시작: {self.name} ({width}x{height}x{channels}, 슬롯 {self.slots}개)")
+        return True
+
+    def publish_once(self):
+        """카메라 프레임 하나를 다음 슬롯에 직접 기록"""
+        slot = self.seq % self.slots
+        meta = self.meta[slot]
+
+        # seqlock 획득: 홀수 = 쓰는 중 (프레임을 쓰기 전에 구독자에게 보이도록 잠금 안에서 기록)
+        with self._lock.exclusive():
+            meta[META_LOCK] += 1
+        ret, _ = self.camera.read_into(self.frames[slot])
+
+        with self._lock.exclusive():
+            if not ret:
+                meta[META_LOCK] += 1
+                return False
+
+            self.seq += 1
+            meta[META_SEQ] = self.seq
+            meta[META_TIMESTAMP] = int(self.camera.frame_timestamp * 1e9)
+            meta[META_LOCK] += 1
+
+            self.header[HDR_LATEST_SLOT] = slot
+            self.header[HDR_LATEST_SEQ] = self.seq
+        return True
+
+    def run(self):
+        """발행 루프"""
+        if self.shm is None and not self.initialize():
+            return False
+
+        self.is_running = True
+        print("프레임 발행 중... (Ctrl+C로 종료)")
+
+        start_time = time.time()
+        try:
+            while self.is_running:
+                if not self.publish_once():
+                    print("프레임 읽기 실패")
+                    break
+
+        except KeyboardInterrupt:
+            print("사용자에 의해 중단됨")
+
+        finally:
+            elapsed_time = time.time() - start_time
+            if elapsed_time > 0:
+                print(f"발행 프레임: {self.seq}, 평균 FPS: {self.seq / elapsed_time:.1f}")
+            self.release()
+
+        return True
+
+    def stop(self):
+        """발행 루프 종료 요청"""
+        self.is_running = False
+
+    def release(self):
+        """공유 메모리 및 카메라 해제"""
+        self.is_running = False
+
+        if self.shm is not None:
+            with self._lock.exclusive():
+                self.header[HDR_CLOSED] = 1
+            self.header = self.meta = self.frames = None
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+            self._lock.close()
+
+        self.camera.release()
+
+class FrameSubscriber:
+    """
+    공유 메모리 프레임 버스 구독자
+    JetBotCamera와 같은 read_frame()/borrow_frame() 인터페이스 제공
+    borrow_frame()은 seqlock 검증 구간 안에서 구독자 버퍼로 한 번 복사하므로 처리 중에 덮어써지지 않음
+    복사 없는 borrow_view()는 사용 후 frame_valid()로 확인해야 함
+    """
+
+    def __init__(self, name=DEFAULT_BUS_NAME, poll_interval=0.001, connect_timeout=5.0):
+        self.name = name
+        self.poll_interval = poll_interval
+        self.connect_timeout = connect_timeout
+        self.read_timeout = 1.0
+
+        self.shm = None
+        self.header = None
+        self.meta = None
+        self.frames = None
+        self._views = []
+        self._lock = None
+
+        # borrow_frame용 구독자 버퍼 (번갈아 사용, 직전에 빌린 프레임은 다음 대여까지 유지)
+        self._buffers = []
+        self._buffer_views = []
+        self._next_buffer = 0
+
+        self.width = 0
+        self.height = 0
+        self.frame_seq = 0
+        self.frame_timestamp = None
+        self.dropped_frames = 0
+        self._last_read_seq = 0
+        self._lock_snapshot = (None, None)
+
+    def initialize(self):
+        """프레임 버스 연결"""
+        deadline = time.monotonic() + self.connect_timeout
+
+        while True:
+            try:
+                self.shm = _attach_shared_memory(self.name)
+                header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=self.shm.buf)
+                if header[HDR_MAGIC] == BUS_MAGIC:
+                    break
+                del header
+                self.shm.close()
+                self.shm = None
+            except FileNotFoundError:
+                pass
+
+            if time.monotonic() > deadline:
+                print(f"프레임 버스에 연결할 수 없습니다: {self.name}")
+                return False
+            time.sleep(0.1)
+
+        slots = int(header[HDR_SLOTS])
+        self.height = int(header[HDR_HEIGHT])
+        self.width = int(header[HDR_WIDTH])
+        channels = int(header[HDR_CHANNELS])
+        del header
+
+        self._lock = BusLock(self.name)
+        self.header, self.meta, self.frames = _map_bus(self.shm.buf, slots, self.height, self.width, channels)
+
+        # 구독자는 읽기 전용 뷰만 사용
+        self._views = [self._read_only(self.frames[slot]) for slot in range(slots)]
+        self._buffers = [np.empty(self.frames.shape[1:], dtype=np.uint8) for _ in range(2)]
+        self._buffer_views = [self._read_only(buffer) for buffer in self._buffers]
+
+        with self._lock.shared():
+            self._last_read_seq = int(self.header[HDR_LATEST_SEQ])
+        print(f"프레임 버스 연결 성공: {self.name} ({self.width}x{self.height})")
+        return True
+
+    @staticmethod
+    def _read_only(array):
+        view = array.view()
+        view.flags.writeable = False
+        return view
+
+    def is_closed(self):
+        """발행자 종료 여부"""
+        return self.header is None or self.header[HDR_CLOSED] != 0
+
+    def borrow_view(self, timeout=None):
+        """
+        최신 프레임의 읽기 전용 뷰 (복사 없음)
+        반환값: (ret, frame, slot)
+        뷰는 발행자가 슬롯을 다시 쓰기 전까지만 유효하므로 사용 후 frame_valid(slot)로 확인하고,
+        False면 결과를 버리거나 다시 읽어야 함
+        """
+        if self.header is None:
+            return None, None, None
+
+        if timeout is None:
+            timeout = self.read_timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            # 잠금 없이 새 프레임이 있는지만 먼저 확인 (폴링 비용 절약)
+            if int(self.header[HDR_LATEST_SEQ]) > self._last_read_seq:
+                with self._lock.shared():
+                    latest_seq = int(self.header[HDR_LATEST_SEQ])
+                    slot = int(self.header[HDR_LATEST_SLOT])
+                    lock = int(self.meta[slot, META_LOCK])
+                    frame_seq = int(self.meta[slot, META_SEQ])
+                    timestamp = int(self.meta[slot, META_TIMESTAMP])
+
+                # 쓰는 중이 아니고 최신 순번과 일치하면 읽기 성공
+                if lock % 2 == 0 and frame_seq == latest_seq:
+                    self.dropped_frames += max(0, latest_seq - self._last_read_seq - 1)
+                    self._last_read_seq = latest_seq
+                    self._lock_snapshot = (slot, lock)
+                    self.frame_seq = frame_seq
+                    self.frame_timestamp = timestamp / 1e9
+                    return True, self._views[slot], slot
+
+            elif self.is_closed():
+                return False, None, None
+
+            if time.monotonic() > deadline:
+                return False, None, None
+            time.sleep(self.poll_interval)
+
+    def frame_valid(self, slot):
+        """빌린 뷰가 아직 덮어써지지 않았는지 확인"""
+        snapshot_slot, lock = self._lock_snapshot
+        with self._lock.shared():
+            return snapshot_slot == slot and int(self.meta[slot, META_LOCK]) == lock
+
+    def _copy_latest(self, out, timeout):
+        """최신 프레임을 out에 복사 (복사 도중 덮어써지면 더 새로운 프레임으로 다시 시도)"""
+        if timeout is None:
+            timeout = self.read_timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            ret, view, slot = self.borrow_view(max(0.0, deadline - time.monotonic()))
+            if not ret:
+                return ret
+            np.copyto(out, view)
+            if self.frame_valid(slot):
+                return True
+
+    def borrow_frame(self, timeout=None):
+        """
+        최신 프레임 대여 (검증된 구독자 버퍼의 읽기 전용 뷰)
+        반환값: (ret, frame, slot) - 다음 다음 대여까지 유효, slot은 인터페이스 호환용 (항상 None)
+        """
+        if self.header is None:
+            return None, None, None
+
+        index = self._next_buffer
+        ret = self._copy_latest(self._buffers[index], timeout)
+        if not ret:
+            return ret, None, None
+
+        self._next_buffer = (index + 1) % len(self._buffers)
+        return True, self._buffer_views[index], None
+
+    def release_frame(self, slot):
+        """구독자 버퍼는 반납이 필요 없음 (인터페이스 호환용)"""
+        pass
+
+    def read_latest(self, timeout=None, out=None):
+        """
+        최신 프레임 사본 읽기
+        반환값: (ret, frame, seq, timestamp)
+        out: 프레임을 복사할 호출자 버퍼 (없으면 새로 할당)
+        """
+        if self.header is None:
+            return None, None, None, None
+
+        frame = out if out is not None else np.empty(self.frames.shape[1:], dtype=np.uint8)
+        if frame.shape != self.frames.shape[1:] or frame.dtype != np.uint8:
+            raise ValueError(f"버퍼 크기가 프레임과 다릅니다: {frame.shape} {frame.dtype}, 프레임 {self.frames.shape[1:]} uint8")
+
+        ret = self._copy_latest(frame, timeout)
+        if not ret:
+            return ret, None, None, None
+        return True, frame, self.frame_seq, self.frame_timestamp
+
+    def read_frame(self, out=None):
+        """프레임 읽기 (out: 프레임을 복사할 호출자 버퍼)"""
+        ret, frame, _, _ = self.read_latest(out=out)
+        return ret, frame
+
+    def release(self):
+        """프레임 버스 연결 해제"""
+        if self.shm is not None:
+            self.header = self.meta = self.frames = None
+            self._views = []
+            self.shm.close()
+            self.shm = None
+            self._lock.close()
+            print("프레임 버스 연결 해제됨")
+
+def main():
+    """프레임 버스 발행자 실행"""
+    parser = argparse.ArgumentParser(description="JetBot 공유 메모리 프레임 버스 발행자")
+    parser.add_argument("--name", default=DEFAULT_BUS_NAME, help="공유 메모리 이름")
+    parser.add_argument("--slots", type=int, default=4, help="링 슬롯 수")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--source", help="카메라 대신 발행할 녹화 데이터")
+    args = parser.parse_args()
+
+    camera = JetBotCamera(width=args.width, height=args.height, fps=args.fps,
+                          source=args.source, loop=args.source is not None)
+    publisher = FramePublisher(camera, name=args.name, slots=args.slots)
+
+    # 서비스로 실행될 때 SIGTERM에도 공유 메모리를 정리
+    signal.signal(signal.SIGTERM, lambda signum, frame: publisher.stop())
+    publisher.run()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+자율주행 루프용 해상도/프레임률 조절기
+프레임 처리 시간이 예산을 넘으면 해상도, ROI, 처리 FPS를 단계적으로 낮추고
+여유가 생기면 다시 올림 (발열로 클럭이 떨어진 Jetson Nano에서 제어 주기 유지)
+"""
+
+import time
+
+# (width, height, fps, roi_scale) - 0단계가 최고 품질
+# roi_scale은 검출기에 설정된 ROI 비율(--config 값)에 곱하는 배율 (1.0이면 설정값 그대로)
+DEFAULT_PROFILES = (
+    (640, 480, 30, 1.0),
+    (480, 360, 30, 1.0),
+    (320, 240, 30, 0.85),
+    (320, 240, 20, 0.85),
+    (320, 240, 15, 0.7),
+)
+
+class FrameGovernor:
+    """처리 시간 기반 품질 단계 조절기"""
+
+    def __init__(self, budget_ms=25.0, profiles=DEFAULT_PROFILES, level=0,
+                 smoothing=0.1, headroom=0.6, step_down_frames=10, step_up_frames=90, min_dwell=2.0):
+        self.budget_ms = budget_ms
+        self.profiles = tuple(profiles)
+        self.level = max(0, min(level, len(self.profiles) - 1))
+
+        # 지수 이동 평균 및 히스테리시스 설정
+        self.smoothing = smoothing
+        self.headroom = headroom
+        self.step_down_frames = step_down_frames
+        self.step_up_frames = step_up_frames
+        self.min_dwell = min_dwell
+
+        self.average_ms = None
+        self._over_count = 0
+        self._under_count = 0
+        self._last_change = time.monotonic()
+        self.changes = []
+
+    @property
+    def profile(self):
+        """현재 단계의 (width, height, fps, roi_scale)"""
+        return self.profiles[self.level]
+
+    def reset_statistics(self):
+        """단계 변경 후 측정값 초기화"""
+        self.average_ms = None
+        self._over_count = 0
+        self._under_count = 0
+        self._last_change = time.monotonic()
+
+    def update(self, processing_ms):
+        """
+        프레임 처리 시간 반영
+        반환값: 단계가 바뀌었으면 새 프로파일, 아니면 None
+        """
+        if self.average_ms is None:
+            self.average_ms = processing_ms
+        else:
+            self.average_ms += self.smoothing * (processing_ms - self.average_ms)
+
+        if self.average_ms > self.budget_ms:
+            self._over_count += 1
+            self._under_count = 0
+        elif self.average_ms < self.budget_ms * self.headroom:
+            self._under_count += 1
+            self._over_count = 0
+        else:
+            self._over_count = 0
+            self._under_count = 0
+
+        # 카메라 재설정 비용이 있으므로 너무 자주 바꾸지 않음
+        if time.monotonic() - self._last_change < self.min_dwell:
+            return None
+
+        new_level = self.level
+        if self._over_count >= self.step_down_frames and self.level < len(self.profiles) - 1:
+            new_level = self.level + 1
+        elif self._under_count >= self.step_up_frames and self.level > 0:
+            new_level = self.level - 1
+
+        if new_level == self.level:
+            return None
+
+        self.changes.append((time.monotonic(), self.level, new_level, self.average_ms))
+        self.level = new_level
+        self.reset_statistics()
+        return self.profile
@@ -7,6 +7,7 @@ JetBot C100 보드용 하드웨어 추상화 레이어
 import time
 import sys
 import os
+import threading
 try:
     import Jetson.GPIO as GPIO
     GPIO_AVAILABLE = True
@@ -204,12 +205,126 @@ class JetBotMotor:
         
         print("모터 제어 정리 완료")
 
+class MotorWatchdog:
+    """
+    명령 기한 감시기
+    마지막 새 명령(JetBotController.feed) 이후 deadline(초)이 지나면 ramp_time(초) 동안
+    선속도를 degraded_speed(0이면 정지)로, 각속도를 0으로 낮추고 기한 초과 횟수/시간을 기록
+    """
+    
+    def __init__(self, controller, deadline=0.25, degraded_speed=0.0, ramp_time=0.3, check_hz=50):
+        self.controller = controller
+        self.deadline = deadline
+        self.degraded_speed = degraded_speed
+        self.ramp_time = ramp_time
+        self.interval = 1.0 / check_hz
+        
+        self.tripped = False
+        self._trip_time = None
+        self._ramp_from = (0.0, 0.0)
+        self._settled = False
+        self._thread = None
+        self._running = False
+        
+        # 통계 (기한 초과 구간별 지속 시간, 초)
+        self.miss_durations = []
+    
+    def start(self):
+        """감시 스레드 시작"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._watch_loop, name="motor-watchdog", daemon=True)
+        self._thread.start()
+        print(f"모터 워치독 시작: 기한 {self.deadline * 1000.0:.0f}ms, 감속 목표 {self.degraded_speed}")
+    
+    def stop(self):
+        """감시 스레드 종료 및 통계 출력"""
+        if not self._running:
+            return
+        self._running = False
+        self._thread.join(1.0)
+        if self.tripped:
+            self._recover(time.monotonic())
+        self.report()
+    
+    def report(self):
+        """기한 초과 통계 출력"""
+        if not self.miss_durations:
+            print("모터 워치독: 기한 초과 없음")
+            return
+        durations = [d * 1000.0 for d in self.miss_durations]
+        print(f"모터 워치독: 기한 초과 {len(durations)}회, 총 {sum(durations) / 1000.0:.2f}초, "
+              f"평균 {sum(durations) / len(durations):.0f}ms, 최장 {max(durations):.0f}ms")
+    
+    def _watch_loop(self):
+        while self._running:
+            self.check()
+            time.sleep(self.interval)
+    
+    def check(self, now=None):
+        """명령 나이 확인 후 기한을 넘겼으면 감속 명령 (반환값: 기한 초과 중인지)"""
+        if now is None:
+            now = time.monotonic()
+        
+        controller = self.controller
+        # move()와 같은 잠금 안에서 명령 시각을 읽고 감속 명령을 써서, 그 사이 들어온 새 명령을 덮어쓰지 않음
+        with controller._motor_lock:
+            last = controller.last_command_time
+            if not controller.is_running or last is None or now - last <= self.deadline:
+                if self.tripped:
+                    self._recover(now)
+                return False
+            
+            tripping = not self.tripped
+            if tripping:
+                # 기한을 넘긴 시점부터 초과 구간 시작
+                self.tripped = True
+                self._trip_time = last + self.deadline
+                self._ramp_from = controller.command
+                self._settled = False
+            
+            # 감속이 끝나면 같은 명령을 반복해서 쓰지 않음
+            if not self._settled:
+                linear, angular = self._ramp_from
+                ratio = min(1.0, (now - self._trip_time) / self.ramp_time) if self.ramp_time > 0 else 1.0
+                target_linear = min(linear, self.degraded_speed) if linear > 0 else 0.0
+                controller._write(linear + (target_linear - linear) * ratio, angular * (1.0 - ratio))
+                self._settled = ratio >= 1.0
+        
+        if tripping:
+            print(f"모터 워치독: 명령이 {(now - last) * 1000.0:.0f}ms 동안 없어 감속")
+        return True
+    
+    def _recover(self, now):
+        self.tripped = False
+        self.miss_durations.append(now - self._trip_time)
+
 class JetBotController:
     """JetBot 통합 제어 클래스"""
     
     def __init__(self, use_pca9685=True):
         self.motor = JetBotMotor(use_pca9685)
         self.is_running = False
+        
+        # 제어 스레드/워치독과 move()/stop()이 동시에 모터를 쓰지 않도록 보호
+        # (move()는 명령 시각 갱신과 쓰기를 한 번에 하려고 잡은 채 _write()를 부르므로 재진입 잠금)
+        self._motor_lock = threading.RLock()
+        
+        # 마지막으로 모터에 보낸 명령 (linear, angular)과 마지막 새 명령 수신 시각
+        self.command = (0.0, 0.0)
+        self.last_command_time = None
+        
+        # 명령 기한 감시기 (MotorWatchdog, enable_watchdog로 시작)
+        self.watchdog = None
+        
+        # 고정 주기 제어 스레드 (start_control_loop)
+        self._control_thread = None
+        self._control_running = False
+        self.control_ticks = 0
+        self.control_overruns = 0
+        self.max_control_lateness = 0.0
+        self._control_start = None
     
     def initialize(self):
         """초기화"""
@@ -217,13 +332,27 @@ class JetBotController:
     
     def start(self):
         """제어 시작"""
+        self.last_command_time = time.monotonic()
         self.is_running = True
         print("JetBot 제어 시작")
     
+    def feed(self):
+        """새 명령을 받았음을 기록 (워치독 기한 갱신)"""
+        self.last_command_time = time.monotonic()
+    
+    def enable_watchdog(self, deadline=0.25, degraded_speed=0.0, ramp_time=0.3):
+        """명령 기한 감시 시작 (deadline 초 동안 새 명령이 없으면 감속)"""
+        if self.watchdog is None:
+            self.watchdog = MotorWatchdog(self, deadline, degraded_speed, ramp_time)
+            self.watchdog.start()
+        return self.watchdog
+    
     def stop(self):
         """제어 정지"""
-        self.is_running = False
-        self.motor.stop()
+        with self._motor_lock:
+            self.is_running = False
+            self.motor.stop()
+            self.command = (0.0, 0.0)
         print("JetBot 제어 정지")
     
     def move(self, linear_speed, angular_speed):
@@ -232,22 +361,108 @@ class JetBotController:
         linear_speed: 전진/후진 속도 (-1.0 ~ 1.0)
         angular_speed: 회전 속도 (-1.0 ~ 1.0, 음수는 좌회전)
         """
-        if not self.is_running:
+        with self._motor_lock:
+            self.feed()
+            self._write(linear_speed, angular_speed)
+    
+    def _write(self, linear_speed, angular_speed):
+        """차동 구동 계산 후 모터에 쓰기 (워치독 기한은 갱신하지 않음)"""
+        with self._motor_lock:
+            if not self.is_running:
+                return
+            
+            # 차동 구동 계산
+            left_speed = linear_speed - angular_speed
+            right_speed = linear_speed + angular_speed
+            
+            # 속도 제한
+            left_speed = max(-1.0, min(1.0, left_speed))
+            right_speed = max(-1.0, min(1.0, right_speed))
+            
+            self.motor.set_motor_speed('left', left_speed)
+            self.motor.set_motor_speed('right', right_speed)
+            self.command = (linear_speed, angular_speed)
+    
+    def start_control_loop(self, step, rate_hz=100, max_linear_accel=1.0, max_angular_accel=4.0):
+        """
+        고정 주기 제어 스레드 시작 (카메라 프레임 주기와 무관하게 모터 갱신)
+        step(dt): 최신 목표로 (linear, angular) 계산, dt는 직전 틱부터의 time.monotonic 간격(초)
+        max_*_accel: 초당 최대 명령 변화량 (슬루 제한)
+        """
+        if self._control_thread is not None:
             return
         
-        # 차동 구동 계산
-        left_speed = linear_speed - angular_speed
-        right_speed = linear_speed + angular_speed
+        self.control_ticks = 0
+        self.control_overruns = 0
+        self.max_control_lateness = 0.0
+        self._control_running = True
+        self._control_thread = threading.Thread(
+            target=self._control_loop, args=(step, 1.0 / rate_hz, max_linear_accel, max_angular_accel),
+            name="control-loop", daemon=True)
+        self._control_thread.start()
+        print(f"고정 주기 제어 시작: {rate_hz:.0f}Hz")
+    
+    def stop_control_loop(self):
+        """제어 스레드 종료 및 통계 출력"""
+        if self._control_thread is None:
+            return
         
-        # 속도 제한
-        left_speed = max(-1.0, min(1.0, left_speed))
-        right_speed = max(-1.0, min(1.0, right_speed))
+        self._control_running = False
+        self._control_thread.join(1.0)
+        self._control_thread = None
         
-        self.motor.set_motor_speed('left', left_speed)
-        self.motor.set_motor_speed('right', right_speed)
+        elapsed = time.monotonic() - self._control_start
+        rate = self.control_ticks / elapsed if elapsed > 0 else 0.0
+        print(f"제어 루프: {self.control_ticks}틱 ({rate:.1f}Hz), 주기 초과 {self.control_overruns}회, "
+              f"최대 지연 {self.max_control_lateness * 1000.0:.2f}ms")
+    
+    def _control_loop(self, step, period, max_linear_accel, max_angular_accel):
+        linear = angular = 0.0
+        self._control_start = last_time = next_time = time.monotonic()
+        try:
+            while self._control_running:
+                now = time.monotonic()
+                self.max_control_lateness = max(self.max_control_lateness, now - next_time)
+                dt = now - last_time
+                last_time = now
+                
+                target_linear, target_angular = step(dt)
+                if self.is_running:
+                    # 슬루 제한: 한 틱에 바뀔 수 있는 양을 가속도 × dt로 제한
+                    max_linear = max_linear_accel * dt
+                    max_angular = max_angular_accel * dt
+                    with self._motor_lock:
+                        if self.watchdog is not None and self.watchdog.tripped:
+                            # 기한 초과 중에는 워치독이 감속하고, 회복하면 그 명령부터 다시 가속
+                            linear, angular = self.command
+                        else:
+                            linear += max(-max_linear, min(max_linear, target_linear - linear))
+                            angular += max(-max_angular, min(max_angular, target_angular - angular))
+                            self._write(linear, angular)
+                else:
+                    # 정지 중에는 명령을 0으로 두고 재시작하면 0부터 다시 가속
+                    linear = angular = 0.0
+                self.control_ticks += 1
+                
+                # 다음 틱까지 대기 (한 주기 이상 밀리면 따라잡지 않고 현재 시각부터 다시 맞춤)
+                next_time += period
+                delay = next_time - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                elif delay < -period:
+                    self.control_overruns += 1
+                    next_time = time.monotonic()
+        except Exception as e:
+            # 목표 계산이 실패하면 마지막 명령으로 계속 달리지 않도록 정지
+            print(f"제어 루프 오류: {e}")
+            self.stop()
     
     def cleanup(self):
         """리소스 정리"""
+        self.stop_control_loop()
+        if self.watchdog is not None:
+            self.watchdog.stop()
+            self.watchdog = None
         self.stop()
         self.motor.cleanup()
 
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+LaneDetector 직선 분류/피팅 마이크로벤치마크
+기존 반복문 방식(classify_lines + average_line)과
+NumPy 배열 연산 방식(classify_lines_vectorized + fit_line)의 처리 시간과 결과 차이 비교
+"""
+
+import time
+import argparse
+import numpy as np
+
+from autonomous_driving import LaneDetector
+
+def random_segments(count, width=640, height=288, rng=None):
+    """
+    HoughLinesP 출력 형태(N x 1 x 4, int32)의 무작위 선분
+    좌/우 차선 선분과 바닥 잡음(수평/수직 포함)을 섞어서 생성
+    """
+    rng = np.random.default_rng(rng)
+
+    y1 = rng.integers(0, height, count)
+    y2 = rng.integers(0, height, count)
+    x1 = rng.integers(0, width, count)
+
+    # 1/3은 좌측 차선, 1/3은 우측 차선 기울기, 나머지는 임의 방향
+    kind = rng.integers(0, 3, count)
+    slope = np.where(kind == 0, rng.uniform(-3.0, -0.3, count),
+                     np.where(kind == 1, rng.uniform(0.3, 3.0, count), rng.uniform(-5.0, 5.0, count)))
+    x2 = np.clip(x1 + np.round((y2 - y1) / slope), 0, width - 1)
+
+    # 수직선(dx=0) 일부 포함
+    vertical = rng.random(count) < 0.05
+    x2[vertical] = x1[vertical]
+
+    lines = np.stack([x1, y1, x2, y2], axis=1).astype(np.int32)
+    return lines.reshape(-1, 1, 4)
+
+def fit_loop(detector, lines, width):
+    """기존 반복문 방식"""
+    left, right = detector.classify_lines(lines, width)
+    return detector.average_line(left), detector.average_line(right)
+
+def fit_vectorized(detector, lines, width):
+    """배열 연산 방식"""
+    left, right = detector.classify_lines_vectorized(lines, width)
+    return detector.fit_line(left), detector.fit_line(right)
+
+def time_call(func, repeat, *args):
+    """반복 호출 평균 시간 (us)"""
+    start_time = time.perf_counter()
+    for _ in range(repeat):
+        func(*args)
+    return (time.perf_counter() - start_time) / repeat * 1e6
+
+def max_difference(a, b):
+    """두 피팅 결과의 최대 절대 차이 (한쪽만 None이면 inf)"""
+    if a is None or b is None:
+        return 0.0 if a is None and b is None else float('inf')
+    return float(np.max(np.abs(np.asarray(a) - np.asarray(b))))
+
+def benchmark_segments(counts=(10, 50, 200, 500, 1000), repeat=200, width=640, height=288, seed=0):
+    """선분 수별 처리 시간 및 결과 차이"""
+    detector = LaneDetector()
+
+    print(f"{'segments':>8} {'loop(us)':>10} {'vector(us)':>11} {'speedup':>8} {'max diff':>10}")
+    for count in counts:
+        lines = random_segments(count, width, height, seed)
+
+        diff = 0.0
+        for a, b in zip(fit_loop(detector, lines, width), fit_vectorized(detector, lines, width)):
+            diff = max(diff, max_difference(a, b))
+
+        loop_us = time_call(fit_loop, repeat, detector, lines, width)
+        vector_us = time_call(fit_vectorized, repeat, detector, lines, width)
+        print(f"{count:>8} {loop_us:>10.1f} {vector_us:>11.1f} {loop_us / vector_us:>7.1f}x {diff:>10.2e}")
+
+def compare_lane_centers(frames=300, seed=0):
+    """합성 차선 프레임에서 두 방식의 차선 중앙 비교"""
+    from lane_scene import SyntheticLaneScene
+
+    scene = SyntheticLaneScene(seed=seed)
+    loop_detector = LaneDetector()
+    loop_detector.vectorized_lines = False
+    vector_detector = LaneDetector()
+
+    max_diff = 0.0
+    mismatched = 0
+    for _ in range(frames):
+        frame, _ = scene.render(**scene.random_params())
+        a, _, _, _ = loop_detector.get_lane_center(frame)
+        b, _, _, _ = vector_detector.get_lane_center(frame)
+
+        if (a is None) != (b is None):
+            mismatched += 1
+        elif a is not None:
+            max_diff = max(max_diff, abs(a - b))
+
+    print(f"합성 프레임 {frames}장: 차선 중앙 최대 차이 {max_diff:.2e}px, 검출 여부 불일치 {mismatched}")
+
+def main():
+    parser = argparse.ArgumentParser(description="LaneDetector 직선 분류/피팅 벤치마크")
+    parser.add_argument("--repeat", type=int, default=200, help="측정 반복 횟수")
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 50, 200, 500, 1000],
+                        help="측정할 선분 수")
+    parser.add_argument("--frames", type=int, default=300, help="차선 중앙 비교용 합성 프레임 수 (0이면 생략)")
+    args = parser.parse_args()
+
+    benchmark_segments(args.counts, args.repeat)
+    if args.frames:
+        compare_lane_centers(args.frames)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+차선 검출기 등록부와 자동 선택
+모든 검출기는 LaneDetector를 상속하고 get_lane_center(frame)이
+(lane_center, (left_poly, right_poly), roi, mask)를 반환
+시작할 때 몇 프레임으로 검출기별 처리 시간/오차를 재서 예산 안에서 가장 정확한 검출기를 선택
+"""
+
+import time
+import argparse
+import numpy as np
+
+# 이름 → (생성 함수, 설명, 합성 장면으로 학습하는지)
+DETECTORS = {}
+
+def register_detector(name, factory, description="", synthetic_trained=False):
+    """
+    검출기 등록 (factory(**options)가 LaneDetector 하위 클래스 인스턴스를 반환)
+    synthetic_trained: 합성 장면으로 학습하는 검출기 - 합성 프레임 프로브에서는 학습 데이터로 채점하는 셈이라 제외
+    """
+    DETECTORS[name] = (factory, description, synthetic_trained)
+
+def available_detectors(synthetic=False):
+    """등록된 검출기 이름 목록 (synthetic=True면 합성 프레임으로 공정하게 비교할 수 있는 것만)"""
+    return [name for name, (_, _, trained) in DETECTORS.items() if not (synthetic and trained)]
+
+def create_detector(name, configure=None, **options):
+    """
+    이름으로 검출기 생성
+    configure(detector): 준비 전 공통 설정 (설정 파일, 색상 룩업 테이블 등)
+    가중치가 필요한 검출기는 설정을 적용한 뒤 prepare()로 준비 (첫 프레임에서 학습하지 않도록)
+    """
+    if name not in DETECTORS:
+        raise ValueError(f"등록되지 않은 차선 검출기: {name} (사용 가능: {', '.join(DETECTORS)})")
+    detector = DETECTORS[name][0](**options)
+    if configure is not None:
+        configure(detector)
+    if hasattr(detector, 'prepare'):
+        detector.prepare()
+    return detector
+
+def _hough(**options):
+    from autonomous_driving import LaneDetector
+    return LaneDetector(**options)
+
+def _sliding(**options):
+    from lane_tracking import SlidingWindowDetector
+    return SlidingWindowDetector(**options)
+
+def _histogram(**options):
+    from lane_histogram import HistogramLaneDetector
+    return HistogramLaneDetector(**options)
+
+def _birdseye(**options):
+    from birdseye import BirdsEyeDetector
+    return BirdsEyeDetector(**options)
+
+def _learned(**options):
+    from lane_learned import LearnedLaneDetector
+    return LearnedLaneDetector(**options)
+
+register_detector('hough', _hough, "Canny + 허프 변환 (기본)")
+register_detector('sliding', _sliding, "이전 프레임 차선 주변 슬라이딩 윈도우 추적 + 허프 재검출")
+register_detector('histogram', _histogram, "가로 띠 열 히스토그램 (테이프 트랙용)")
+register_detector('birdseye', _birdseye, "버드아이뷰 변환 + 2차 다항식 (곡률 제공)")
+register_detector('learned', _learned, "색상 마스크 격자 릿지 회귀", synthetic_trained=True)
+
+def synthetic_frames(count=30, width=640, height=480, seed=0):
+    """프로브용 연속 합성 주행 프레임과 실제 차선 중앙"""
+    from lane_scene import SyntheticLaneSource
+
+    source = SyntheticLaneSource(frames=count, realtime=False, width=width, height=height, seed=seed)
+    frames = np.empty((count, height, width, 3), dtype=np.uint8)
+    truths = np.empty(count)
+    for i in range(count):
+        _, truths[i] = source.scene.render(out=frames[i], **source.params_at(i))
+    return frames, truths
+
+def probe_detectors(frames, truths=None, names=None, configure=None):
+    """
+    검출기별 처리 시간과 정확도 측정
+    truths가 없으면 프레임마다 검출기들의 중앙값을 기준으로 오차 계산
+    configure(detector): 측정 전 공통 설정 (색상 룩업 테이블 등)
+    반환값: [{name, detector, mean_ms, p95_ms, detection_rate, mean_error_px, score}, ...]
+    """
+    names = names or available_detectors()
+    width = frames[0].shape[1]
+    results = []
+    centers = np.full((len(names), len(frames)), np.nan)
+
+    for i, name in enumerate(names):
+        detector = create_detector(name, configure)
+
+        # 첫 호출의 테이블 계산 시간은 제외
+        detector.get_lane_center(frames[0])
+        detector.reset()
+
+        times = np.empty(len(frames))
+        for j, frame in enumerate(frames):
+            t0 = time.perf_counter()
+            lane_center, _, _, _ = detector.get_lane_center(frame)
+            times[j] = time.perf_counter() - t0
+            if lane_center is not None:
+                centers[i, j] = lane_center
+        detector.reset()
+
+        times_ms = times * 1000.0
+        results.append({
+            "name": name,
+            "detector": detector,
+            "mean_ms": float(times_ms.mean()),
+            "p95_ms": float(np.percentile(times_ms, 95)),
+            "detection_rate": float(np.mean(~np.isnan(centers[i])))
+        })
+
+    if truths is None:
+        with np.errstate(all='ignore'):
+            truths = np.nanmedian(centers, axis=0)
+
+    for i, result in enumerate(results):
+        result["mean_error_px"], result["score"] = accuracy(centers[i], truths, width)
+
+    return results
+
+def accuracy(centers, truths, width):
+    """
+    검출 정확도 (centers는 검출 실패 프레임이 NaN)
+    반환값: (검출 프레임 평균 오차 또는 None, 점수) - 점수는 놓친 프레임을 프레임 폭의 1/4 오차로 본 평균 (낮을수록 좋음)
+    """
+    miss_penalty = width / 4.0
+    errors = np.abs(np.asarray(centers, dtype=np.float64) - truths)
+    found = ~np.isnan(errors)
+    mean_error = float(errors[found].mean()) if found.any() else None
+    score = float(np.where(found, np.minimum(errors, miss_penalty), miss_penalty).mean())
+    return mean_error, score
+
+def print_results(results, budget_ms=None):
+    """검출기별 측정 결과 표 출력"""
+    print(f"{'검출기':<10} {'평균ms':>8} {'p95ms':>8} {'검출률':>7} {'오차px':>8} {'점수':>7}")
+    for r in results:
+        error = f"{r['mean_error_px']:.1f}" if r['mean_error_px'] is not None else "-"
+        over = " (예산 초과)" if budget_ms is not None and r['p95_ms'] > budget_ms else ""
+        print(f"{r['name']:<10} {r['mean_ms']:>8.2f} {r['p95_ms']:>8.2f} "
+              f"{r['detection_rate'] * 100:>6.1f}% {error:>8} {r['score']:>7.1f}{over}")
+
+def choose_detector(results, budget_ms=None):
+    """p95 처리 시간이 예산 안인 검출기 중 점수가 가장 좋은 것 (없으면 가장 빠른 것)"""
+    fitting = [r for r in results if budget_ms is None or r['p95_ms'] <= budget_ms]
+    if not fitting:
+        print(f"예산 {budget_ms:.1f}ms 안에 드는 검출기가 없어 가장 빠른 검출기를 사용합니다.")
+        return min(results, key=lambda r: r['p95_ms'])
+    return min(fitting, key=lambda r: (r['score'], r['mean_ms']))
+
+def select_detector(budget_ms=None, frames=None, truths=None, names=None, configure=None, count=30,
+                    synthetic=False):
+    """
+    시작 프로브: 검출기들을 측정하고 예산 안에서 가장 정확한 검출기 반환
+    frames가 없으면 count장의 합성 주행 프레임(정답 포함) 사용
+    synthetic: frames가 합성 프레임인지 - names를 주지 않으면 합성 장면으로 학습하는 검출기는 제외
+    반환값: (이름, 검출기)
+    """
+    if frames is None:
+        frames, truths = synthetic_frames(count)
+        synthetic = True
+
+    if names is None and synthetic:
+        names = available_detectors(synthetic=True)
+        excluded = [name for name in available_detectors() if name not in names]
+        if excluded:
+            print(f"합성 프레임 프로브에서 제외: {', '.join(excluded)} (합성 장면으로 학습, 녹화 프레임으로 프로브하면 포함)")
+
+    budget = f"{budget_ms:.1f}ms" if budget_ms is not None else "없음"
+    print(f"차선 검출기 프로브 ({len(frames)} 프레임, 예산 {budget})")
+    results = probe_detectors(frames, truths, names, configure)
+    print_results(results, budget_ms)
+
+    best = choose_detector(results, budget_ms)
+    print(f"선택한 차선 검출기: {best['name']}")
+    return best['name'], best['detector']
+
+def load_frames(source, count):
+    """재생 소스에서 프레임 읽기 (합성 소스면 실제 차선 중앙도 반환)"""
+    from camera_test import JetBotCamera
+
+    camera = JetBotCamera(source=source, realtime=False, buffer_count=2)
+    if not camera.initialize():
+        print("재생 소스 초기화 실패!")
+        return None, None
+
+    frames = []
+    truths = []
+    try:
+        while len(frames) < count:
+            ret, frame, slot = camera.borrow_frame()
+            if not ret:
+                break
+            try:
+                frames.append(frame.copy())
+                truths.append(getattr(camera.cap, 'last_lane_center', None))
+            finally:
+                camera.release_frame(slot)
+    finally:
+        camera.release()
+
+    if not frames:
+        print("읽은 프레임이 없습니다.")
+        return None, None
+    if any(truth is None for truth in truths):
+        truths = None
+    return frames, truths
+
+def main():
+    parser = argparse.ArgumentParser(description="차선 검출기 비교 벤치마크")
+    parser.add_argument("--source", help="녹화 영상, 이미지 디렉토리, .npy 파일 또는 synthetic[:N] (기본: 합성 주행)")
+    parser.add_argument("--frames", type=int, default=300, help="측정 프레임 수")
+    parser.add_argument("--budget", type=float, metavar="MS", help="프레임당 검출 예산 (ms)")
+    parser.add_argument("--detectors", nargs="+", choices=available_detectors(),
+                        help="비교할 검출기 (기본: 전체, 합성 프레임이면 합성 장면으로 학습하는 검출기 제외)")
+    args = parser.parse_args()
+
+    if args.source:
+        frames, truths = load_frames(args.source, args.frames)
+        if frames is None:
+            return
+    else:
+        frames, truths = synthetic_frames(args.frames)
+
+    synthetic = not args.source or args.source.startswith("synthetic")
+    select_detector(args.budget, frames, truths, args.detectors, synthetic=synthetic)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+학습 기반 차선 검출
+ROI 색상 마스크를 작은 격자(띠 x 열 구간)의 차선 픽셀 비율로 줄이고,
+릿지 회귀로 ROI 상/하단의 좌/우 차선 위치를 바로 예측 (가중치는 디스크에 캐시)
+"""
+
+import os
+import hashlib
+import cv2
+import numpy as np
+
+from autonomous_driving import LaneDetector
+from color_lut import DEFAULT_CACHE_DIR
+
+class LearnedLaneDetector(LaneDetector):
+    """
+    릿지 회귀 차선 검출기 (LaneDetector.get_lane_center와 같은 반환값)
+    예측값: ROI 하단/상단 행의 좌/우 차선 x (프레임 폭 대비 비율) → 좌/우 직선
+    가중치가 없으면 합성 차선 장면으로 학습 (실제 트랙은 fit()에 녹화 데이터 사용 권장)
+    """
+
+    backend = 'learned'
+
+    def __init__(self, roi_height_ratio=0.6, input_size=(160, 72), grid=(64, 8), ridge=1e-3,
+                 min_pixels=20, train_frames=2000, seed=0, cache_dir=DEFAULT_CACHE_DIR):
+        super().__init__(roi_height_ratio)
+
+        # 색상 마스크를 만들 축소 ROI 크기와 특징 격자 (열 구간 수, 띠 수)
+        self.input_size = input_size
+        self.grid = grid
+        self.ridge = ridge
+
+        # 축소 마스크의 차선 픽셀이 이보다 적으면 검출 실패
+        self.min_pixels = min_pixels
+
+        # 합성 학습 설정과 가중치 캐시 위치 (None이면 캐시 안 함)
+        self.train_frames = train_frames
+        self.seed = seed
+        self.cache_dir = cache_dir
+
+        self.weights = None
+        # 현재 가중치를 학습/로드할 때의 cache_key() (ROI 비율 등이 바뀌면 가중치를 다시 준비)
+        self._weights_key = None
+
+        self._small = None
+        self._mask = None
+
+    def cache_key(self):
+        """특징/학습 설정과 색상 임계값으로 만든 캐시 키"""
+        values = [self.roi_height_ratio, *self.input_size, *self.grid, self.ridge, self.train_frames, self.seed]
+        values += [int(v) for lower, upper in self.color_ranges() for v in (*lower, *upper)]
+        return hashlib.sha1(",".join(map(str, values)).encode("ascii")).hexdigest()[:16]
+
+    def features(self, roi):
+        """
+        ROI → 특징 벡터
+        반환값: (features, small_mask) - 띠마다 합이 1이 되도록 정규화한 격자 + 상수항
+        """
+        shape = (self.input_size[1], self.input_size[0]) + roi.shape[2:]
+        if self._small is None or self._small.shape != shape:
+            self._small = np.empty(shape, dtype=np.uint8)
+        cv2.resize(roi, self.input_size, dst=self._small, interpolation=cv2.INTER_AREA)
+        small_mask = self.detect_color_lanes(self._small)
+
+        cells = cv2.resize(small_mask, self.grid, interpolation=cv2.INTER_AREA).astype(np.float64)
+        cells /= np.maximum(cells.sum(axis=1, keepdims=True), 1.0)
+        return np.append(cells.ravel(), 1.0), small_mask
+
+    def fit(self, features, targets):
+        """
+        릿지 회귀 학습
+        features: [N, F] (features() 결과), targets: [N, 4] - 하단 좌/우, 상단 좌/우 x / 프레임 폭
+        """
+        X = np.asarray(features, dtype=np.float64)
+        Y = np.asarray(targets, dtype=np.float64)
+
+        regularizer = self.ridge * np.eye(X.shape[1])
+        regularizer[-1, -1] = 0.0  # 상수항은 규제하지 않음
+        self.weights = np.linalg.solve(X.T @ X + regularizer, X.T @ Y)
+        self._weights_key = self.cache_key()
+
+        return float(np.mean(np.abs(X @ self.weights - Y)))
+
+    def train_synthetic(self, count=None, width=640, height=480):
+        """합성 차선 장면으로 학습, 반환값: 학습 데이터 평균 오차 (px)"""
+        from lane_scene import SyntheticLaneScene
+
+        count = count or self.train_frames
+        scene = SyntheticLaneScene(width, height, seed=self.seed)
+        frame = np.empty((height, width, 3), dtype=np.uint8)
+        roi_top = int(height * (1 - self.roi_height_ratio))
+
+        features = np.empty((count, self.grid[0] * self.grid[1] + 1))
+        targets = np.empty((count, 4))
+        for i in range(count):
+            params = scene.random_params()
+            scene.render(out=frame, **params)
+            features[i] = self.features(frame[roi_top:height])[0]
+
+            curve = (params["curvature"], params["offset"])
+            targets[i] = scene.lane_edges_at(height - 1, *curve) + scene.lane_edges_at(roi_top, *curve)
+
+        return self.fit(features, targets / width) * width
+
+    def _cache_path(self):
+        return os.path.join(self.cache_dir, f"lane_ridge_{self.cache_key()}.npy")
+
+    def load(self, filename):
+        """가중치 파일 로드"""
+        try:
+            weights = np.load(filename)
+        except (OSError, ValueError) as e:
+            print(f"차선 회귀 가중치 로드 실패: {e}")
+            return False
+
+        if weights.shape != (self.grid[0] * self.grid[1] + 1, 4):
+            print(f"차선 회귀 가중치 크기가 맞지 않습니다: {weights.shape}")
+            return False
+
+        self.weights = weights
+        self._weights_key = self.cache_key()
+        return True
+
+    def save(self, filename):
+        """가중치 파일 저장"""
+        try:
+            os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+            np.save(filename, self.weights)
+            return True
+        except OSError as e:
+            print(f"차선 회귀 가중치 저장 실패: {e}")
+            return False
+
+    def reset(self):
+        """
+        ROI 비율/색상 임계값 등이 가중치를 준비한 뒤 바뀌었으면 가중치를 버림
+        (조절기나 set_params로 바뀐 경우 다음 prepare()가 맞는 캐시를 로드하거나 다시 학습)
+        """
+        if self.weights is not None and self._weights_key != self.cache_key():
+            self.weights = None
+
+    def prepare(self):
+        """가중치 준비 (캐시가 있으면 로드, 없으면 합성 장면으로 학습 후 저장)"""
+        if self.weights is not None:
+            return
+
+        path = self._cache_path() if self.cache_dir else None
+        if path and os.path.exists(path) and self.load(path):
+            return
+
+        print(f"차선 회귀 모델 학습 중 (합성 프레임 {self.train_frames}장)...")
+        error = self.train_synthetic()
+        print(f"학습 완료: 평균 오차 {error:.1f}px")
+        if path:
+            self.save(path)
+
+    def get_lane_center(self, frame):
+        """회귀 모델로 차선 중앙 계산"""
+        self.prepare()
+
+        roi, _ = self.extract_roi(frame)
+        height, width = roi.shape[:2]
+        self._trace('preprocess')
+
+        features, small_mask = self.features(roi)
+        self._trace('color_mask')
+
+        # 디버그 화면용 마스크는 ROI 크기로 확대
+        if self._mask is None or self._mask.shape != (height, width):
+            self._mask = np.empty((height, width), dtype=np.uint8)
+        cv2.resize(small_mask, (width, height), dst=self._mask, interpolation=cv2.INTER_NEAREST)
+
+        if cv2.countNonZero(small_mask) < self.min_pixels:
+            self._trace('fit')
+            return None, (None, None), roi, self._mask
+
+        bottom_left, bottom_right, top_left, top_right = features @ self.weights * width
+        rows = max(height - 1, 1)
+        left_poly = np.array([(bottom_left - top_left) / rows, top_left])
+        right_poly = np.array([(bottom_right - top_right) / rows, top_right])
+
+        lane_center = self.lane_center_from_polys(left_poly, right_poly, height, width)
+        self._trace('fit')
+        return lane_center, (left_poly, right_poly), roi, self._mask
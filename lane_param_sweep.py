@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+LaneDetector 파라미터 탐색
+실제 차선 중앙이 있는 합성/녹화 데이터셋에서 Canny/허프/HSV/ROI 파라미터 조합을
+프로세스 풀로 병렬 평가하고, 정확도-처리 시간 파레토 전선과 선택한 설정(JSON)을 출력
+"""
+
+import os
+import time
+import random
+import argparse
+import itertools
+import numpy as np
+import cv2
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from autonomous_driving import LaneDetector
+from lane_detectors import accuracy
+
+# 파라미터별 후보 값 (HSV 범위는 [H, S, V])
+DEFAULT_SPACE = {
+    "roi_height_ratio": [0.4, 0.5, 0.6],
+    "canny_low": [30, 50, 80],
+    "canny_high": [100, 150, 200],
+    "hough_threshold": [20, 35, 50, 80],
+    "hough_min_line_length": [40, 70, 100],
+    "hough_max_line_gap": [20, 50, 80],
+    "yellow_lower": [[15, 100, 100], [20, 80, 80]],
+    "yellow_upper": [[35, 255, 255], [30, 255, 255]],
+    "white_lower": [[0, 0, 200], [0, 0, 180]],
+    "white_upper": [[255, 30, 255], [255, 50, 255]]
+}
+
+# 작업 프로세스별 데이터셋 (공유 메모리에 연결한 프레임과 정답)
+_frames = None
+_truths = None
+_shm = None
+
+def grid_configs(space):
+    """모든 조합 (허용되지 않는 canny_low >= canny_high 조합은 제외)"""
+    names = list(space)
+    for values in itertools.product(*(space[name] for name in names)):
+        params = dict(zip(names, values))
+        if params.get("canny_low", 0) < params.get("canny_high", 1):
+            yield params
+
+def random_configs(space, count, seed=0):
+    """무작위 조합 count개 (중복 제외)"""
+    rng = random.Random(seed)
+    seen = set()
+    for _ in range(count * 20):
+        if len(seen) >= count:
+            break
+        params = {name: rng.choice(values) for name, values in space.items()}
+        key = repr(sorted(params.items()))
+        if key in seen or params["canny_low"] >= params["canny_high"]:
+            continue
+        seen.add(key)
+        yield params
+
+def _init_worker(shm_name, shape, truths):
+    """작업 프로세스 초기화: 공유 메모리 프레임 연결 (복사 없음)"""
+    global _frames, _truths, _shm
+
+    # 프로세스마다 한 코어씩 쓰도록 OpenCV 내부 스레드는 끔
+    cv2.setNumThreads(1)
+
+    _shm = shared_memory.SharedMemory(name=shm_name)
+    _frames = np.ndarray(shape, dtype=np.uint8, buffer=_shm.buf)
+    _truths = truths
+
+def evaluate(params):
+    """파라미터 조합 하나를 데이터셋 전체에서 평가"""
+    detector = LaneDetector()
+    detector.set_params(params)
+    detector.get_lane_center(_frames[0])
+
+    centers = np.full(len(_frames), np.nan)
+    times = np.empty(len(_frames))
+    for i, frame in enumerate(_frames):
+        t0 = time.perf_counter()
+        lane_center, _, _, _ = detector.get_lane_center(frame)
+        times[i] = time.perf_counter() - t0
+        if lane_center is not None:
+            centers[i] = lane_center
+
+    mean_error, score = accuracy(centers, _truths, _frames.shape[2])
+    times_ms = times * 1000.0
+    return {
+        "params": params,
+        "mean_ms": float(times_ms.mean()),
+        "p95_ms": float(np.percentile(times_ms, 95)),
+        "detection_rate": float(np.mean(~np.isnan(centers))),
+        "mean_error_px": mean_error,
+        "score": score
+    }
+
+def run_sweep(frames, truths, configs, workers=None):
+    """데이터셋을 공유 메모리에 올리고 조합들을 프로세스 풀로 평가"""
+    frames = np.asarray(frames, dtype=np.uint8)
+    truths = np.asarray(truths, dtype=np.float64)
+
+    shm = shared_memory.SharedMemory(create=True, size=frames.nbytes)
+    try:
+        np.ndarray(frames.shape, dtype=np.uint8, buffer=shm.buf)[:] = frames
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(shm.name, frames.shape, truths)) as pool:
+            return list(pool.map(evaluate, configs, chunksize=4))
+    finally:
+        shm.close()
+        shm.unlink()
+
+def pareto_front(results):
+    """처리 시간이 더 짧으면서 점수도 더 좋은 조합이 없는 결과들 (시간순)"""
+    front = []
+    best_score = float("inf")
+    for result in sorted(results, key=lambda r: (r["mean_ms"], r["score"])):
+        if result["score"] < best_score:
+            front.append(result)
+            best_score = result["score"]
+    return front
+
+def choose_config(front, budget_ms=None):
+    """예산 안에서 점수가 가장 좋은 결과 (예산 안에 없으면 가장 빠른 것)"""
+    fitting = [r for r in front if budget_ms is None or r["mean_ms"] <= budget_ms]
+    if not fitting:
+        return front[0]
+    return min(fitting, key=lambda r: r["score"])
+
+def describe(params, baseline):
+    """기본값과 다른 파라미터만 요약"""
+    changed = [f"{name}={value}" for name, value in params.items() if baseline.get(name) != value]
+    return ", ".join(changed) if changed else "(기본값)"
+
+def load_dataset(args):
+    """명령행 인자에 맞는 라벨 데이터셋 (frames, truths)"""
+    if args.source is None:
+        from lane_scene import SyntheticLaneScene
+        scene = SyntheticLaneScene(seed=args.seed)
+        frames, truths, _ = scene.generate_dataset(args.frames)
+        return frames, truths
+
+    from lane_detectors import load_frames
+    frames, truths = load_frames(args.source, args.frames)
+    if frames is None:
+        return None, None
+
+    if args.labels:
+        # 한 줄에 프레임 하나의 실제 차선 중앙 x (텍스트) 또는 .npy 배열
+        labels = np.load(args.labels) if args.labels.endswith(".npy") else np.loadtxt(args.labels)
+        truths = np.asarray(labels, dtype=np.float64)[:len(frames)]
+        frames = frames[:len(truths)]
+
+    if truths is None:
+        print("정답 차선 중앙이 없는 소스입니다. --labels로 프레임별 차선 중앙을 지정하세요.")
+        return None, None
+    return np.stack(frames), truths
+
+def main():
+    parser = argparse.ArgumentParser(description="LaneDetector 파라미터 탐색 (정확도-처리 시간 파레토 전선)")
+    parser.add_argument("--source", help="녹화 영상, 이미지 디렉토리, .npy 파일 또는 synthetic[:N] (기본: 무작위 합성 장면)")
+    parser.add_argument("--labels", help="--source 프레임별 실제 차선 중앙 (텍스트 또는 .npy)")
+    parser.add_argument("--frames", type=int, default=100, help="데이터셋 프레임 수")
+    parser.add_argument("--search", choices=("random", "grid"), default="random", help="탐색 방식")
+    parser.add_argument("--count", type=int, default=200, help="무작위 탐색 조합 수")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="작업 프로세스 수")
+    parser.add_argument("--budget", type=float, metavar="MS", help="선택할 설정의 평균 처리 시간 상한")
+    parser.add_argument("--output", metavar="FILE", help="선택한 설정을 저장할 JSON 파일")
+    parser.add_argument("--seed", type=int, default=0, help="합성 장면/무작위 탐색 시드")
+    args = parser.parse_args()
+
+    frames, truths = load_dataset(args)
+    if frames is None:
+        return
+
+    baseline = LaneDetector().get_params()
+    if args.search == "grid":
+        configs = list(grid_configs(DEFAULT_SPACE))
+    else:
+        configs = list(random_configs(DEFAULT_SPACE, args.count, args.seed))
+    configs.insert(0, baseline)
+
+    print(f"데이터셋 {len(frames)} 프레임, 조합 {len(configs)}개, 작업 프로세스 {args.workers}개")
+    start_time = time.perf_counter()
+    results = run_sweep(frames, truths, configs, args.workers)
+    print(f"탐색 완료: {time.perf_counter() - start_time:.1f}초 (병렬 측정이므로 처리 시간은 상대 비교용)")
+
+    front = pareto_front(results)
+    print(f"\n파레토 전선 ({len(front)}개)")
+    print(f"{'평균ms':>8} {'p95ms':>8} {'검출률':>7} {'오차px':>8} {'점수':>7}  파라미터")
+    for r in front:
+        error = f"{r['mean_error_px']:.1f}" if r['mean_error_px'] is not None else "-"
+        print(f"{r['mean_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['detection_rate'] * 100:>6.1f}% "
+              f"{error:>8} {r['score']:>7.1f}  {describe(r['params'], baseline)}")
+
+    base = results[0]
+    best = choose_config(front, args.budget)
+    print(f"\n기본 설정: {base['mean_ms']:.2f}ms, 점수 {base['score']:.1f}")
+    print(f"선택한 설정: {best['mean_ms']:.2f}ms, 점수 {best['score']:.1f} - {describe(best['params'], baseline)}")
+
+    if args.output:
+        detector = LaneDetector()
+        detector.set_params(best["params"])
+        summary = {key: best[key] for key in ("mean_ms", "p95_ms", "detection_rate", "mean_error_px", "score")}
+        if detector.save_config(args.output, **summary):
+            print(f"설정 저장됨: {args.output} (autonomous_driving.py --config {args.output})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+합성 차선 영상 생성기
+LaneDetector의 HSV 임계값에 맞는 노란색(좌)/흰색(우) 차선을 NumPy로 그리고
+프레임마다 실제 차선 중앙(ground truth)을 함께 제공
+"""
+
+import math
+import cv2
+import numpy as np
+
+from camera_sources import ReplaySource
+
+# BGR 색상
+YELLOW = np.array([0, 220, 230], dtype=np.float32)
+WHITE = np.array([245, 245, 245], dtype=np.float32)
+FLOOR = np.array([70, 75, 80], dtype=np.float32)
+OCCLUDER = np.array([30, 30, 30], dtype=np.uint8)
+
+class SyntheticLaneScene:
+    """원근 투영된 차선 장면 렌더러"""
+
+    def __init__(self, width=640, height=480, horizon_ratio=0.3, lane_width_ratio=0.75,
+                 line_width=12, noise_bank=2, seed=None):
+        self.width = width
+        self.height = height
+        self.horizon = int(height * horizon_ratio)
+        self.half_lane = width * lane_width_ratio / 2
+        self.line_width = line_width
+        self.rng = np.random.default_rng(seed)
+
+        # 행별 원근 깊이 (수평선 0 ~ 화면 하단 1)
+        rows = np.arange(self.horizon, height, dtype=np.float32)
+        self._rows = rows.astype(np.int64)
+        self._depth = (rows - self.horizon) / (height - 1 - self.horizon)
+
+        # 행마다 그릴 최대 선 두께 (가까울수록 두꺼움)
+        self._max_thickness = max(2, int(line_width))
+        self._thickness = np.maximum(2, np.round(line_width * self._depth)).astype(np.int64)
+        self._offsets = np.arange(self._max_thickness, dtype=np.int64)
+
+        # 조명/노이즈 캐시
+        self._backgrounds = {}
+        self._noise_bank_size = noise_bank
+        self._noise = {}
+
+    def _background(self, brightness):
+        """밝기별 바닥 배경 (위쪽이 어두운 그라데이션)"""
+        key = round(brightness, 2)
+        background = self._backgrounds.get(key)
+        if background is None:
+            gradient = np.linspace(0.6, 1.0, self.height, dtype=np.float32)[:, None, None]
+            background = np.clip(FLOOR * gradient * key, 0, 255).astype(np.uint8)
+            background = np.broadcast_to(background, (self.height, self.width, 3)).copy()
+            self._backgrounds[key] = background
+        return background
+
+    def _noise_fields(self, sigma):
+        """표준편차별 노이즈 필드 (양/음 성분을 uint8로 분리해 포화 연산)"""
+        key = round(sigma)
+        fields = self._noise.get(key)
+        if fields is None:
+            fields = []
+            for _ in range(self._noise_bank_size):
+                noise = self.rng.normal(0, key, (self.height, self.width, 3))
+                positive = np.clip(noise, 0, 255).astype(np.uint8)
+                negative = np.clip(-noise, 0, 255).astype(np.uint8)
+                fields.append((positive, negative))
+            self._noise[key] = fields
+        return fields
+
+    def lane_center_at(self, y, curvature=0.0, offset=0.0):
+        """y 행의 실제 차선 중앙 x 좌표"""
+        depth = (y - self.horizon) / (self.height - 1 - self.horizon)
+        return self.width / 2 + offset * depth + curvature * (1 - depth) ** 2
+
+    def lane_edges_at(self, y, curvature=0.0, offset=0.0):
+        """y 행의 실제 좌/우 차선 x 좌표"""
+        depth = (y - self.horizon) / (self.height - 1 - self.horizon)
+        half_width = self.half_lane * max(depth, 0.02)
+        center = self.lane_center_at(y, curvature, offset)
+        return center - half_width, center + half_width
+
+    def _draw_line(self, flat, x_centers, color):
+        """행별 중심 x에 두께만큼 픽셀을 인덱스로 한 번에 칠함"""
+        x_start = np.round(x_centers).astype(np.int64) - self._thickness // 2
+
+        # (행, 두께) 인덱스 격자에서 실제 두께와 화면 범위 밖은 제외
+        cols = x_start[:, None] + self._offsets[None, :]
+        valid = (self._offsets[None, :] < self._thickness[:, None]) & (cols >= 0) & (cols < self.width)
+        index = (self._rows[:, None] * self.width + cols)[valid]
+        flat[index] = color
+
+    def render(self, curvature=0.0, offset=0.0, brightness=1.0, noise=0.0, occluders=0, out=None):
+        """
+        장면 렌더링
+        curvature: 수평선 쪽 차선 휨 (px), offset: 화면 하단 기준 차선 중앙 이동 (px)
+        brightness: 조명 배율, noise: 가우시안 노이즈 표준편차, occluders: 가림 사각형 수
+        반환값: (frame, lane_center) - lane_center는 화면 최하단 행의 실제 차선 중앙
+        """
+        if out is None:
+            out = np.empty((self.height, self.width, 3), dtype=np.uint8)
+
+        np.copyto(out, self._background(brightness))
+
+        # 행별 차선 중앙과 좌/우 차선 위치
+        centers = self.width / 2 + offset * self._depth + curvature * (1 - self._depth) ** 2
+        half_width = self.half_lane * np.maximum(self._depth, 0.02)
+
+        flat = out.reshape(-1, 3)
+        light = min(brightness, 255.0 / WHITE.max())
+        self._draw_line(flat, centers - half_width, np.clip(YELLOW * light, 0, 255).astype(np.uint8))
+        self._draw_line(flat, centers + half_width, np.clip(WHITE * light, 0, 255).astype(np.uint8))
+
+        # 가림 물체 (어두운 사각형)
+        for _ in range(int(occluders)):
+            w = int(self.rng.integers(self.width // 16, self.width // 5))
+            h = int(self.rng.integers(self.height // 16, self.height // 5))
+            x = int(self.rng.integers(0, self.width - w))
+            y = int(self.rng.integers(self.horizon, self.height - h))
+            out[y:y + h, x:x + w] = OCCLUDER
+
+        if noise > 0:
+            positive, negative = self._noise_fields(noise)[int(self.rng.integers(self._noise_bank_size))]
+            # 포화 덧셈/뺄셈
+            cv2.add(out, positive, dst=out)
+            cv2.subtract(out, negative, dst=out)
+
+        lane_center = self.width / 2 + offset
+        return out, lane_center
+
+    def random_params(self, curvature_range=(-150, 150), offset_range=(-80, 80),
+                      brightness_range=(0.85, 1.15), noise_range=(0, 8), max_occluders=2):
+        """무작위 장면 파라미터"""
+        return {
+            "curvature": float(self.rng.uniform(*curvature_range)),
+            "offset": float(self.rng.uniform(*offset_range)),
+            "brightness": float(self.rng.uniform(*brightness_range)),
+            "noise": float(self.rng.uniform(*noise_range)),
+            "occluders": int(self.rng.integers(0, max_occluders + 1))
+        }
+
+    def generate_dataset(self, count, **ranges):
+        """
+        무작위 라벨 데이터셋 생성
+        반환값: (frames[N,H,W,3], lane_centers[N], params 목록)
+        """
+        frames = np.empty((count, self.height, self.width, 3), dtype=np.uint8)
+        centers = np.empty(count, dtype=np.float64)
+        params = []
+
+        for i in range(count):
+            p = self.random_params(**ranges)
+            _, centers[i] = self.render(out=frames[i], **p)
+            params.append(p)
+
+        return frames, centers, params
+
+class SyntheticLaneSource(ReplaySource):
+    """
+    합성 차선 카메라 소스 (JetBotCamera(source='synthetic')로 사용)
+    시간에 따라 곡률/횡방향 위치가 천천히 변하는 주행 장면을 생성
+    """
+
+    def __init__(self, frames=1000, fps=30.0, realtime=True, loop=False,
+                 width=640, height=480, noise=3.0, occluders=0, seed=0):
+        super().__init__(fps, realtime, loop)
+        self.scene = SyntheticLaneScene(width, height, seed=seed)
+        self.frames = frames
+        self.noise = noise
+        self.occluders = occluders
+
+        self._buffer = np.empty((height, width, 3), dtype=np.uint8)
+        self.last_lane_center = None
+        self.last_params = None
+        self._opened = True
+
+    def frame_count(self):
+        return self.frames
+
+    def params_at(self, index):
+        """index 번째 프레임의 장면 파라미터"""
+        t = index / self.fps
+        return {
+            "curvature": 120.0 * math.sin(2 * math.pi * t / 8.0),
+            "offset": 60.0 * math.sin(2 * math.pi * t / 5.0),
+            "brightness": 1.0 + 0.1 * math.sin(2 * math.pi * t / 11.0),
+            "noise": self.noise,
+            "occluders": self.occluders
+        }
+
+    def _load_frame(self, index):
+        self.last_params = self.params_at(index)
+        _, self.last_lane_center = self.scene.render(out=self._buffer, **self.last_params)
+        return self._buffer
+
+def benchmark_scene(count=2000, width=640, height=480):
+    """렌더링 처리량 측정"""
+    import time
+
+    scene = SyntheticLaneScene(width, height, seed=0)
+    out = np.empty((height, width, 3), dtype=np.uint8)
+    params = [scene.random_params() for _ in range(count)]
+
+    # 조명/노이즈 캐시를 먼저 채움
+    for p in params:
+        scene.render(out=out, **p)
+
+    start_time = time.perf_counter()
+    for p in params:
+        scene.render(out=out, **p)
+    elapsed_time = time.perf_counter() - start_time
+
+    print(f"{width}x{height} 합성 프레임 {count}장: {count / elapsed_time:.0f} FPS")
+
+if __name__ == "__main__":
+    benchmark_scene()
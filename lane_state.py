@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+차선 상태 칼만 필터
+횡방향 오프셋, 방향(차선 중앙선 기울기), 곡률을 추정하고
+검출이 없는 프레임은 명령한 선속도/각속도로 예측해 제어 출력을 끊기지 않게 유지
+"""
+
+import numpy as np
+
+# 조향 부호: AutonomousDriving.control은 차선 중앙이 화면 오른쪽(양수 오프셋)이면 양수 각속도를 내고
+# 그 명령이 차선 쪽으로 조향하므로, 양수 각속도는 화면 속 차선의 오프셋/방향을 줄이는 쪽
+# (칼만 예측과 pid_tuner 시뮬레이션이 모두 steering_shift()로 이 부호를 사용)
+STEERING_SIGN = -1.0
+
+def steering_shift(angular_speed, dt, rad_per_angular=2.0, px_per_radian=500.0):
+    """
+    명령 각속도로 dt초 동안 회전했을 때 화면 속 차선의 변화 (배열 입력 가능)
+    반환값: (오프셋 변화 px, 방향 변화)
+    """
+    rotation = STEERING_SIGN * angular_speed * rad_per_angular * dt
+    return px_per_radian * rotation, rotation
+
+class LaneStateEstimator:
+    """
+    상수 곡률 운동 모델 칼만 필터 (이미지 좌표계)
+    상태: [offset(px), heading(px/행), curvature(px/행^2)]
+    - offset: ROI 하단에서 차선 중앙 - 화면 중앙
+    - heading: 앞쪽(위쪽) 한 행마다 차선 중앙이 옮겨가는 픽셀 수
+    - curvature: 한 행마다 heading이 변하는 양
+    """
+
+    def __init__(self, rows_per_speed=400.0, rad_per_angular=2.0, px_per_radian=500.0,
+                 process_noise=(20.0, 0.05, 1e-4), offset_noise=10.0, heading_noise=0.05,
+                 single_side_scale=3.0, max_coast=1.0):
+        # 운동 모델 (선속도 1.0일 때 초당 지나가는 ROI 행 수, 각속도 1.0일 때 초당 회전각,
+        # 회전 1라디안당 화면 가로 이동 픽셀, 각속도 부호는 STEERING_SIGN 참고)
+        self.rows_per_speed = rows_per_speed
+        self.rad_per_angular = rad_per_angular
+        self.px_per_radian = px_per_radian
+
+        # 초당 프로세스 노이즈 표준편차와 측정 노이즈 표준편차
+        self.process_noise = np.asarray(process_noise, dtype=np.float64)
+        self.offset_noise = offset_noise
+        self.heading_noise = heading_noise
+        self.single_side_scale = single_side_scale
+
+        # 검출 없이 예측만으로 버티는 최대 시간 (초)
+        self.max_coast = max_coast
+
+        self._H = np.array([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
+        self.reset()
+
+    def reset(self):
+        """추정 초기화"""
+        self.x = np.zeros(3)
+        self.P = np.diag([1e4, 1.0, 1e-4])
+        self.initialized = False
+        self.coast_time = 0.0
+
+        # 통계
+        self.predictions = 0
+        self.updates = 0
+
+    @property
+    def offset(self):
+        return self.x[0]
+
+    @property
+    def heading(self):
+        return self.x[1]
+
+    @property
+    def curvature(self):
+        return self.x[2]
+
+    @property
+    def is_valid(self):
+        """제어에 써도 되는 추정인지 (측정 없이 max_coast를 넘기면 무효)"""
+        return self.initialized and self.coast_time <= self.max_coast
+
+    def predict(self, linear_speed, angular_speed, dt):
+        """명령한 속도로 dt초 후 상태 예측"""
+        if not self.initialized or dt <= 0:
+            return
+
+        distance = linear_speed * self.rows_per_speed * dt
+
+        F = np.array([[1.0, distance, 0.5 * distance * distance],
+                      [0.0, 1.0, distance],
+                      [0.0, 0.0, 1.0]])
+
+        self.x = F @ self.x
+        # 회전하면 화면 속 차선이 가로로 이동하고 기울기도 같은 각도만큼 바뀜
+        shift, rotation = steering_shift(angular_speed, dt, self.rad_per_angular, self.px_per_radian)
+        self.x[0] += shift
+        self.x[1] += rotation
+
+        Q = np.diag((self.process_noise ** 2) * dt)
+        self.P = F @ self.P @ F.T + Q
+
+        self.coast_time += dt
+        self.predictions += 1
+
+    def update(self, offset, heading, single_side=False):
+        """검출된 오프셋/방향으로 보정 (한쪽 차선만 보이면 측정 신뢰도를 낮춤)"""
+        z = np.array([offset, heading])
+        scale = self.single_side_scale if single_side else 1.0
+
+        if not self.initialized:
+            self.x[:2] = z
+            self.x[2] = 0.0
+            self.initialized = True
+            self.coast_time = 0.0
+            self.updates += 1
+            return
+
+        R = np.diag([(self.offset_noise * scale) ** 2, (self.heading_noise * scale) ** 2])
+        H = self._H
+
+        innovation = z - H @ self.x
+        S = H @ self.P @ H.T + R
+        K = self.P @ H.T @ np.linalg.inv(S)
+
+        self.x = self.x + K @ innovation
+        self.P = (np.eye(3) - K @ H) @ self.P
+
+        self.coast_time = 0.0
+        self.updates += 1
+
+    def measure(self, lane_center, lane_polys, height, frame_center):
+        """
+        검출 결과에서 측정값 계산 (get_lane_center 반환값 사용)
+        반환값: (offset, heading, single_side) 또는 None
+        차선 다항식은 차수와 관계없이 ROI 하단에서의 기울기를 heading으로 사용
+        """
+        if lane_center is None or lane_polys is None:
+            return None
+
+        left_poly, right_poly = lane_polys
+        if left_poly is not None and right_poly is not None:
+            slope = (np.polyval(np.polyder(left_poly), height - 1) + np.polyval(np.polyder(right_poly), height - 1)) / 2
+            single_side = False
+        elif left_poly is not None or right_poly is not None:
+            poly = left_poly if left_poly is not None else right_poly
+            slope = np.polyval(np.polyder(poly), height - 1)
+            single_side = True
+        else:
+            return None
+
+        # 위쪽(앞쪽)으로 갈수록 y가 작아지므로 부호 반전
+        return lane_center - frame_center, -slope, single_side
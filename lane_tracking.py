@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+프레임 간 차선 추적기
+이전 프레임의 좌/우 차선 직선 주변만 슬라이딩 윈도우로 탐색하고,
+신뢰도가 떨어지거나 일정 프레임마다 LaneDetector의 전체 허프 검출로 다시 초기화
+"""
+
+import numpy as np
+
+from autonomous_driving import LaneDetector
+
+def fit_points(xs, ys):
+    """
+    점들로 x = a*y + b 최소자승 피팅 (LaneDetector.fit_line도 선분 끝점으로 이 함수를 호출)
+    np.polyfit 대신 정규방정식의 닫힌 해를 사용 (평균을 빼서 수치 안정성 유지)
+    """
+    xs = np.asarray(xs, dtype=np.float64)
+    ys = np.asarray(ys, dtype=np.float64)
+
+    x_mean = xs.mean()
+    y_mean = ys.mean()
+    ys = ys - y_mean
+
+    syy = np.dot(ys, ys)
+    if syy == 0:
+        return None
+
+    slope = np.dot(ys, xs - x_mean) / syy
+    return np.array([slope, x_mean - slope * y_mean])
+
+class LaneTracker:
+    """
+    슬라이딩 윈도우 차선 추적기
+    update()는 LaneDetector.get_lane_center()와 같은 값을 반환하고,
+    confidence(0~1)와 mode('track' 또는 'hough')로 이번 프레임의 검출 상태를 알려줌
+    """
+
+    def __init__(self, detector, windows=8, margin=40, min_pixels=30,
+                 min_confidence=0.6, redetect_interval=30, width_tolerance=0.25, full_search=None):
+        self.detector = detector
+        # 전체 검출 함수 (기본은 detector.get_lane_center)
+        self._detect = full_search if full_search is not None else detector.get_lane_center
+
+        # 윈도우 설정 (ROI를 windows개 띠로 나누고 예측 위치 ±margin 픽셀 탐색)
+        self.windows = windows
+        self.margin = margin
+        self.min_pixels = min_pixels
+
+        # 전체 검출로 돌아가는 조건
+        self.min_confidence = min_confidence
+        self.redetect_interval = redetect_interval
+        self.width_tolerance = width_tolerance
+
+        self._columns = np.arange(2 * margin + 1, dtype=np.float64)
+
+        # 통계
+        self.tracked_frames = 0
+        self.full_frames = 0
+
+        self.reset()
+
+    def reset(self):
+        """추적 상태 초기화 (해상도/ROI가 바뀐 경우)"""
+        self.left_poly = None
+        self.right_poly = None
+        self.lane_width = None
+        self.confidence = 0.0
+        self.mode = None
+        self._since_full = 0
+
+    @property
+    def tracked_ratio(self):
+        """전체 프레임 중 윈도우 추적으로 처리한 비율"""
+        total = self.tracked_frames + self.full_frames
+        return self.tracked_frames / total if total else 0.0
+
+    def update(self, frame):
+        """
+        차선 중앙 계산
+        반환값: (lane_center, (left_poly, right_poly), roi, mask)
+        """
+        can_track = (self.left_poly is not None or self.right_poly is not None) \
+            and self.confidence >= self.min_confidence \
+            and self._since_full < self.redetect_interval
+
+        if can_track:
+            result = self._track(frame)
+            if self.confidence >= self.min_confidence:
+                self.mode = 'track'
+                self.tracked_frames += 1
+                self._since_full += 1
+                return result
+
+        return self._full_search(frame)
+
+    def _full_search(self, frame):
+        """LaneDetector 전체 허프 검출로 추적 상태 재설정"""
+        lane_center, lane_polys, roi, mask = self._detect(frame)
+        left_poly, right_poly = lane_polys if lane_polys is not None else (None, None)
+
+        self.mode = 'hough'
+        self.full_frames += 1
+        self._since_full = 0
+
+        # 허프 결과가 윈도우 안의 픽셀과 얼마나 맞는지로 신뢰도 평가
+        left_coverage = self._search(mask, left_poly)[1]
+        right_coverage = self._search(mask, right_poly)[1]
+        self.confidence = self._score(left_poly, right_poly, left_coverage, right_coverage, mask.shape[0])
+
+        self._accept(left_poly, right_poly, mask.shape[0])
+        return lane_center, (left_poly, right_poly), roi, mask
+
+    def _track(self, frame):
+        """이전 직선 주변 윈도우만 탐색"""
+        roi, _ = self.detector.extract_roi(frame)
+        height, width = roi.shape[:2]
+        self.detector._trace('preprocess')
+
+        mask = self.detector.detect_color_lanes(roi)
+        self.detector._trace('color_mask')
+
+        left_seed, right_seed = self._seeds(height)
+        left_poly, left_coverage = self._search(mask, left_seed)
+        right_poly, right_coverage = self._search(mask, right_seed)
+
+        self.confidence = self._score(left_poly, right_poly, left_coverage, right_coverage, height)
+        lane_center = self.detector.lane_center_from_polys(left_poly, right_poly, height, width)
+        self.detector._trace('fit')
+
+        if self.confidence >= self.min_confidence:
+            self._accept(left_poly, right_poly, height)
+
+        return lane_center, (left_poly, right_poly), roi, mask
+
+    def _seeds(self, height):
+        """탐색 시작 직선 (한쪽만 알면 마지막 차선 폭만큼 옮겨서 추정)"""
+        left_seed, right_seed = self.left_poly, self.right_poly
+
+        if self.lane_width is not None:
+            if left_seed is None and right_seed is not None:
+                left_seed = right_seed - (0.0, self.lane_width)
+            elif right_seed is None and left_seed is not None:
+                right_seed = left_seed + (0.0, self.lane_width)
+
+        return left_seed, right_seed
+
+    def _search(self, mask, poly):
+        """
+        아래쪽 띠부터 예측 위치 주변의 차선 픽셀 무게중심을 찾고 직선 피팅
+        반환값: (poly 또는 None, 픽셀을 찾은 윈도우 비율)
+        """
+        if poly is None:
+            return None, 0.0
+
+        height, width = mask.shape[:2]
+        band = height / self.windows
+        xs = []
+        ys = []
+        drift = 0.0
+
+        for i in range(self.windows):
+            y_bottom = int(round(height - i * band))
+            y_top = int(round(height - (i + 1) * band))
+            y_mid = (y_top + y_bottom - 1) / 2.0
+
+            predicted = poly[0] * y_mid + poly[1]
+            x_left = max(0, int(predicted + drift) - self.margin)
+            x_right = min(width, int(predicted + drift) + self.margin + 1)
+            if x_right <= x_left:
+                continue
+
+            # 열별 차선 픽셀 수 → 무게중심
+            counts = np.count_nonzero(mask[y_top:y_bottom, x_left:x_right], axis=0)
+            total = counts.sum()
+            if total < self.min_pixels:
+                continue
+
+            x_found = x_left + np.dot(counts, self._columns[:x_right - x_left]) / total
+            xs.append(x_found)
+            ys.append(y_mid)
+
+            # 다음(위쪽) 윈도우는 찾은 위치와 예측의 차이만큼 옮겨서 탐색
+            drift = x_found - predicted
+
+        coverage = len(xs) / self.windows
+        if len(xs) < 2:
+            return None, coverage
+
+        return fit_points(xs, ys), coverage
+
+    def _score(self, left_poly, right_poly, left_coverage, right_coverage, height):
+        """윈도우 적중률과 차선 폭 일관성으로 신뢰도 계산"""
+        confidence = (left_coverage + right_coverage) / 2.0
+
+        if left_poly is not None and right_poly is not None:
+            y_eval = height - 1
+            width = (right_poly[0] - left_poly[0]) * y_eval + (right_poly[1] - left_poly[1])
+            if width <= 0:
+                return 0.0
+            if self.lane_width is not None and abs(width - self.lane_width) > self.width_tolerance * self.lane_width:
+                confidence *= 0.5
+
+        return confidence
+
+    def _accept(self, left_poly, right_poly, height):
+        """검출 결과를 다음 프레임의 탐색 기준으로 저장"""
+        self.left_poly = left_poly
+        self.right_poly = right_poly
+
+        if left_poly is not None and right_poly is not None:
+            y_eval = height - 1
+            self.lane_width = (right_poly[0] - left_poly[0]) * y_eval + (right_poly[1] - left_poly[1])
+
+class SlidingWindowDetector(LaneDetector):
+    """
+    슬라이딩 윈도우 추적을 내장한 검출기 (LaneDetector.get_lane_center와 같은 반환값)
+    전체 검출은 상속한 허프 검출을 사용하고, 추적 설정은 LaneTracker와 같음
+    """
+
+    backend = 'sliding'
+
+    def __init__(self, roi_height_ratio=0.6, **tracker_options):
+        super().__init__(roi_height_ratio)
+        self.tracker = LaneTracker(self, full_search=super().get_lane_center, **tracker_options)
+
+    def reset(self):
+        self.tracker.reset()
+
+    def get_lane_center(self, frame):
+        """이전 프레임 차선 주변 윈도우 추적 (신뢰도가 낮으면 허프 검출)"""
+        return self.tracker.update(frame)
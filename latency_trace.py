@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+캡처부터 모터 명령까지 프레임 지연 추적
+프레임마다 단계별 완료 시각(time.monotonic)을 미리 할당한 배열에 기록
+"""
+
+import json
+import time
+import numpy as np
+
+# 자율주행 루프 단계 (순서대로 기록됨)
+DRIVING_STAGES = ('read', 'preprocess', 'color_mask', 'canny', 'hough', 'fit', 'pid', 'motor', 'display')
+
+# 허프 차선 검출기 내부 단계 (LaneDetector.enable_profiling)
+DETECTOR_STAGES = ('gray', 'blur', 'hsv', 'inrange', 'canny', 'combine', 'hough', 'classify', 'fit')
+
+# 프레임 간격 히스토그램 구간 (ms)
+INTERVAL_BINS_MS = (0, 10, 20, 30, 40, 50, 67, 100, 150, 250, 500, float('inf'))
+
+class LatencyTracer:
+    """프레임별 단계 시각 기록기"""
+
+    def __init__(self, stages=DRIVING_STAGES, capacity=1024):
+        self.stages = tuple(stages)
+        self.capacity = capacity
+        self._stage_index = {name: i for i, name in enumerate(self.stages)}
+
+        # 링 버퍼 (최근 capacity 프레임)
+        self.capture_times = np.full(capacity, np.nan)
+        self.seqs = np.zeros(capacity, dtype=np.int64)
+        self.marks = np.full((capacity, len(self.stages)), np.nan)
+
+        self.count = 0
+        self._row = None
+
+    def reset(self):
+        """기록 초기화"""
+        self.capture_times[:] = np.nan
+        self.marks[:] = np.nan
+        self.count = 0
+        self._row = None
+
+    def begin_frame(self, seq, capture_time=None):
+        """
+        새 프레임 기록 시작 (capture_time은 time.monotonic 기준)
+        반환값: 기록 행 번호 (다른 스레드에서 이 프레임의 단계를 기록할 때 mark()에 전달)
+        """
+        row = self.count % self.capacity
+        self.seqs[row] = seq
+        self.capture_times[row] = capture_time if capture_time is not None else time.monotonic()
+        self.marks[row] = np.nan
+        self._row = row
+        self.count += 1
+        return row
+
+    def mark(self, stage, row=None):
+        """프레임의 단계 완료 시각 기록 (row가 없으면 마지막으로 시작한 프레임)"""
+        if row is None:
+            row = self._row
+        if row is not None:
+            self.marks[row, self._stage_index[stage]] = time.monotonic()
+
+    def _rows(self):
+        """기록된 행을 시간 순서로 반환"""
+        n = min(self.count, self.capacity)
+        if self.count <= self.capacity:
+            order = np.arange(n)
+        else:
+            start = self.count % self.capacity
+            order = np.concatenate([np.arange(start, self.capacity), np.arange(start)])
+        return self.capture_times[order], self.seqs[order], self.marks[order]
+
+    def stage_durations(self):
+        """
+        단계별 소요 시간 (초), 형태: (프레임 수, 단계 수)
+        각 단계는 직전에 기록된 단계(없으면 캡처 시각)부터 측정, 건너뛴 단계는 NaN
+        """
+        capture_times, _, marks = self._rows()
+        timeline = np.column_stack([capture_times, marks])
+
+        # 시각은 단조 증가하므로 NaN을 건너뛴 누적 최대값이 직전 기록 시각
+        previous = np.fmax.accumulate(timeline, axis=1)[:, :-1]
+        return marks - previous
+
+    def end_to_end(self, stage='motor'):
+        """캡처부터 지정 단계까지의 지연 (초)"""
+        capture_times, _, marks = self._rows()
+        return marks[:, self._stage_index[stage]] - capture_times
+
+    def frame_totals(self):
+        """프레임별 시작부터 마지막 기록 단계까지의 시간 (초)"""
+        capture_times, _, marks = self._rows()
+        valid = ~np.all(np.isnan(marks), axis=1)
+        return np.nanmax(marks[valid], axis=1) - capture_times[valid]
+
+    def frame_intervals(self):
+        """연속 캡처 프레임 간격 (초)"""
+        capture_times, seqs, _ = self._rows()
+        valid = ~np.isnan(capture_times)
+        capture_times, seqs = capture_times[valid], seqs[valid]
+        if len(capture_times) < 2:
+            return np.empty(0)
+
+        order = np.argsort(seqs, kind='stable')
+        return np.diff(capture_times[order])
+
+    def summary(self):
+        """단계별 p50/p95/p99 지연 및 프레임 간격 지터 요약 (ms)"""
+        def percentiles(values):
+            values = values[~np.isnan(values)] * 1000.0
+            if len(values) == 0:
+                return None
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            return {"count": int(len(values)), "mean": float(values.mean()),
+                    "p50": float(p50), "p95": float(p95), "p99": float(p99)}
+
+        durations = self.stage_durations()
+        result = {
+            "frames": int(min(self.count, self.capacity)),
+            "stages": {name: percentiles(durations[:, i]) for i, name in enumerate(self.stages)}
+        }
+
+        if 'motor' in self._stage_index:
+            result["capture_to_motor"] = percentiles(self.end_to_end('motor'))
+
+        intervals = self.frame_intervals() * 1000.0
+        if len(intervals) > 0:
+            counts, _ = np.histogram(intervals, bins=INTERVAL_BINS_MS)
+            result["frame_interval"] = {
+                "mean": float(intervals.mean()),
+                "jitter": float(intervals.std()),
+                "p50": float(np.percentile(intervals, 50)),
+                "p99": float(np.percentile(intervals, 99)),
+                "histogram": {
+                    f"{INTERVAL_BINS_MS[i]:g}-{INTERVAL_BINS_MS[i + 1]:g}ms": int(c)
+                    for i, c in enumerate(counts)
+                }
+            }
+
+        return result
+
+    def report(self):
+        """요약을 표로 출력"""
+        summary = self.summary()
+        print(f"=== 지연 추적 (최근 {summary['frames']} 프레임, 단위 ms) ===")
+        print(f"{'단계':<18}{'p50':>8}{'p95':>8}{'p99':>8}{'평균':>8}")
+
+        rows = list(summary["stages"].items())
+        if "capture_to_motor" in summary:
+            rows.append(("capture->motor", summary["capture_to_motor"]))
+
+        for name, stats in rows:
+            if stats is None:
+                continue
+            print(f"{name:<18}{stats['p50']:>8.2f}{stats['p95']:>8.2f}{stats['p99']:>8.2f}{stats['mean']:>8.2f}")
+
+        interval = summary.get("frame_interval")
+        if interval:
+            print(f"프레임 간격: 평균 {interval['mean']:.2f}ms, 지터(표준편차) {interval['jitter']:.2f}ms, "
+                  f"p99 {interval['p99']:.2f}ms")
+            for label, count in interval["histogram"].items():
+                if count:
+                    print(f"  {label:<14}{count}")
+
+        return summary
+
+    def breakdown(self):
+        """단계별 평균/p50/p95와 전체 대비 비율을 표로 출력 (검출기 프로파일용)"""
+        summary = self.summary()
+        totals = self.frame_totals() * 1000.0
+        total_mean = float(totals.mean()) if len(totals) else 0.0
+
+        print(f"=== 단계별 처리 시간 ({summary['frames']} 프레임, 단위 ms) ===")
+        print(f"{'단계':<12}{'평균':>8}{'p50':>8}{'p95':>8}{'비율':>8}{'프레임':>8}")
+        for name, stats in summary["stages"].items():
+            if stats is None:
+                continue
+            stats["share"] = stats["mean"] * stats["count"] / len(totals) / total_mean if total_mean else 0.0
+            print(f"{name:<12}{stats['mean']:>8.3f}{stats['p50']:>8.3f}{stats['p95']:>8.3f}"
+                  f"{stats['share'] * 100:>7.1f}%{stats['count']:>8}")
+
+        if len(totals):
+            p50, p95 = np.percentile(totals, [50, 95])
+            summary["total"] = {"count": int(len(totals)), "mean": total_mean, "p50": float(p50), "p95": float(p95)}
+            print(f"{'합계':<12}{total_mean:>8.3f}{p50:>8.3f}{p95:>8.3f}{100.0:>7.1f}%{len(totals):>8}")
+
+        return summary
+
+    def save_csv(self, filename):
+        """프레임별 단계 시간(ms)을 CSV로 저장 (건너뛴 단계는 빈 칸)"""
+        capture_times, seqs, marks = self._rows()
+        durations = self.stage_durations() * 1000.0
+        totals = (np.max(np.where(np.isnan(marks), -np.inf, marks), axis=1) - capture_times) * 1000.0
+
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(",".join(("seq",) + self.stages + ("total",)) + "\n")
+            for seq, row, total in zip(seqs, durations, totals):
+                if not np.isfinite(total):
+                    continue
+                values = ["" if np.isnan(v) else f"{v:.4f}" for v in row]
+                f.write(",".join([str(int(seq))] + values + [f"{total:.4f}"]) + "\n")
+
+    def save(self, filename):
+        """요약을 JSON으로 저장"""
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, ensure_ascii=False, indent=2)
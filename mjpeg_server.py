@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+디버그 화면 원격 확인용 MJPEG 스트리밍 서버 (표준 라이브러리 HTTP 서버)
+발행된 프레임은 별도 스레드에서 한 번만 JPEG로 인코딩하고
+같은 바이트를 모든 시청자에게 전달 (느린 시청자는 중간 프레임을 건너뜀)
+"""
+
+import time
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import cv2
+import numpy as np
+
+BOUNDARY = "jetbotframe"
+
+INDEX_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>JetBot Stream</title></head>
+<body style="margin:0;background:#111">
+<img src="/stream" style="display:block;margin:auto;max-width:100%">
+</body></html>
+"""
+
+class _StreamHandler(BaseHTTPRequestHandler):
+    """HTTP 요청 처리 (/, /stream, /snapshot.jpg)"""
+
+    server_version = "JetBotMJPEG/1.0"
+
+    def log_message(self, format, *args):
+        # 요청마다 로그를 찍지 않음
+        pass
+
+    def do_GET(self):
+        stream = self.server.stream
+        path = self.path.split('?', 1)[0]
+
+        if path == '/':
+            body = INDEX_PAGE.encode('utf-8')
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        elif path == '/snapshot.jpg':
+            seq, jpeg = stream.wait_for_frame(0, timeout=2.0)
+            if jpeg is None:
+                self.send_error(503, "No frame available")
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "image/jpeg")
+            self.send_header("Content-Length", str(len(jpeg)))
+            self.end_headers()
+            self.wfile.write(jpeg)
+
+        elif path == '/stream':
+            self._serve_stream(stream)
+
+        else:
+            self.send_error(404)
+
+    def _serve_stream(self, stream):
+        """multipart MJPEG 스트림 전송"""
+        self.send_response(200)
+        self.send_header("Cache-Control", "no-cache, private")
+        self.send_header("Pragma", "no-cache")
+        self.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={BOUNDARY}")
+        self.end_headers()
+
+        # 커널 송신 버퍼를 줄여 느린 시청자가 오래된 프레임을 쌓아두지 않도록 함
+        if stream.send_buffer:
+            try:
+                self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, stream.send_buffer)
+            except OSError:
+                pass
+
+        stream.client_connected()
+        last_seq = 0
+        last_sent = 0.0
+        min_interval = 1.0 / stream.max_client_fps if stream.max_client_fps else 0.0
+
+        try:
+            while stream.is_running:
+                # 시청자별 전송 속도 제한
+                delay = min_interval - (time.monotonic() - last_sent)
+                if delay > 0:
+                    time.sleep(delay)
+
+                # 항상 최신 프레임만 전송 (밀린 프레임은 건너뜀)
+                seq, jpeg = stream.wait_for_frame(last_seq, timeout=1.0)
+                if jpeg is None:
+                    continue
+
+                if last_seq and seq > last_seq + 1:
+                    stream.count_skipped(seq - last_seq - 1)
+
+                self.wfile.write(
+                    f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\nContent-Length: {len(jpeg)}\r\n\r\n".encode('ascii')
+                )
+                self.wfile.write(jpeg)
+                self.wfile.write(b"\r\n")
+                last_seq = seq
+                last_sent = time.monotonic()
+
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+        finally:
+            stream.client_disconnected()
+
+class MJPEGServer:
+    """한 번 인코딩해 여러 시청자에게 전달하는 MJPEG 서버"""
+
+    def __init__(self, host="0.0.0.0", port=8080, quality=80, max_fps=15, max_client_fps=15,
+                 send_buffer=64 * 1024):
+        self.host = host
+        self.port = port
+        self.quality = quality
+        self.max_fps = max_fps
+        self.max_client_fps = max_client_fps
+        self.send_buffer = send_buffer
+
+        self.is_running = False
+        self._httpd = None
+        self._server_thread = None
+        self._encoder_thread = None
+
+        # 발행 → 인코더 (최신 프레임 한 장만 유지)
+        self._input_lock = threading.Lock()
+        self._input_ready = threading.Event()
+        self._input_frame = None
+        self._encode_frame = None
+        self._last_publish = 0.0
+
+        # 인코더 → 시청자 (인코딩된 최신 JPEG)
+        self._output_cond = threading.Condition()
+        self._jpeg = None
+        self._jpeg_seq = 0
+
+        self._clients = 0
+        self._clients_lock = threading.Lock()
+
+        # 통계
+        self.encoded_frames = 0
+        self.skipped_frames = 0
+
+    @property
+    def client_count(self):
+        """현재 접속 중인 스트림 시청자 수"""
+        return self._clients
+
+    def start(self):
+        """HTTP 서버 및 인코더 스레드 시작"""
+        try:
+            self._httpd = ThreadingHTTPServer((self.host, self.port), _StreamHandler)
+        except OSError as e:
+            print(f"스트리밍 서버 시작 실패: {e}")
+            return False
+
+        self._httpd.daemon_threads = True
+        self._httpd.stream = self
+        self.is_running = True
+
+        self._server_thread = threading.Thread(target=self._httpd.serve_forever, name="MJPEGServer", daemon=True)
+        self._server_thread.start()
+        self._encoder_thread = threading.Thread(target=self._encoder_loop, name="MJPEGEncoder", daemon=True)
+        self._encoder_thread.start()
+
+        print(f"MJPEG 스트리밍 시작: http://{self.host}:{self.port}/")
+        return True
+
+    def publish(self, frame):
+        """
+        프레임 발행 (제어 루프에서 호출, 블로킹 없음)
+        시청자가 없거나 최대 FPS보다 빠르게 호출되면 아무것도 하지 않음
+        """
+        if not self.is_running or (self._clients == 0 and self._jpeg is not None):
+            return False
+
+        now = time.monotonic()
+        if self.max_fps and now - self._last_publish < 1.0 / self.max_fps:
+            return False
+        self._last_publish = now
+
+        with self._input_lock:
+            # 호출자가 버퍼를 재사용하므로 미리 할당한 버퍼에 복사
+            if self._input_frame is None or self._input_frame.shape != frame.shape:
+                self._input_frame = np.empty(frame.shape, dtype=frame.dtype)
+                self._encode_frame = np.empty(frame.shape, dtype=frame.dtype)
+            np.copyto(self._input_frame, frame)
+
+        self._input_ready.set()
+        return True
+
+    def _encoder_loop(self):
+        """발행된 최신 프레임을 한 번만 인코딩"""
+        params = [int(cv2.IMWRITE_JPEG_QUALITY), self.quality]
+
+        while self.is_running:
+            if not self._input_ready.wait(timeout=0.5):
+                continue
+
+            with self._input_lock:
+                self._input_ready.clear()
+                # 인코딩 중에도 발행할 수 있도록 버퍼 교체
+                self._input_frame, self._encode_frame = self._encode_frame, self._input_frame
+
+            ok, encoded = cv2.imencode('.jpg', self._encode_frame, params)
+            if not ok:
+                continue
+
+            with self._output_cond:
+                self._jpeg = encoded.tobytes()
+                self._jpeg_seq += 1
+                self.encoded_frames += 1
+                self._output_cond.notify_all()
+
+    def wait_for_frame(self, last_seq, timeout=1.0):
+        """last_seq 이후의 인코딩된 프레임 대기, 반환값: (seq, jpeg bytes 또는 None)"""
+        with self._output_cond:
+            self._output_cond.wait_for(lambda: self._jpeg_seq > last_seq or not self.is_running, timeout=timeout)
+            if self._jpeg_seq > last_seq:
+                return self._jpeg_seq, self._jpeg
+            return last_seq, None
+
+    def client_connected(self):
+        with self._clients_lock:
+            self._clients += 1
+
+    def client_disconnected(self):
+        with self._clients_lock:
+            self._clients -= 1
+
+    def count_skipped(self, count):
+        with self._clients_lock:
+            self.skipped_frames += count
+
+    def stop(self):
+        """서버 종료"""
+        if not self.is_running:
+            return
+
+        self.is_running = False
+        self._input_ready.set()
+        with self._output_cond:
+            self._output_cond.notify_all()
+
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._encoder_thread.join(timeout=2.0)
+        print(f"MJPEG 스트리밍 종료 (인코딩 {self.encoded_frames} 프레임, 시청자별 건너뜀 {self.skipped_frames})")
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+조향 PID 게인 탐색 시뮬레이터
+차동 구동 로봇의 차선 추종을 카메라 지연/처리 주기/픽셀 및 PWM 양자화까지 포함해 시뮬레이션하고,
+(kp, ki, kd, base_speed) 조합 수천 개를 NumPy 배열로 한 번에 평가해
+추종 오차, 오버슈트, 정착 시간으로 순위를 매김
+"""
+
+import json
+import time
+import argparse
+import itertools
+import numpy as np
+
+from lane_state import steering_shift
+
+# 현재 AutonomousDriving 설정 (비교 기준)
+CURRENT_GAINS = {"kp": 0.5, "ki": 0.1, "kd": 0.2, "base_speed": 0.2}
+
+# 기본 탐색 범위 (오차 단위가 픽셀이므로 kp는 로그 간격)
+DEFAULT_GRID = {
+    "kp": np.logspace(-4, 0, 17).tolist(),
+    "ki": [0.0, 0.0005, 0.002, 0.01, 0.05, 0.1],
+    "kd": [0.0, 0.0002, 0.0005, 0.001, 0.002, 0.005, 0.02, 0.2],
+    "base_speed": [0.1, 0.2, 0.3, 0.4]
+}
+
+def gain_grid(grid):
+    """모든 조합을 배열로 (반환값: 이름 → 길이 N 배열)"""
+    names = ("kp", "ki", "kd", "base_speed")
+    combos = np.array(list(itertools.product(*(grid[name] for name in names))), dtype=np.float64)
+    return {name: combos[:, i] for i, name in enumerate(names)}
+
+def simulate(kp, ki, kd, base_speed, duration=16.0, step_time=4.0, dt=0.005, fps=30.0, latency=0.06,
+             initial_offset=80.0, pixel_step=1.0, motor_step=0.01, max_steering=0.8, lost_offset=280.0,
+             settle_band=5.0, curve_amplitude=5e-4, curve_period=800.0,
+             rows_per_speed=400.0, rad_per_angular=2.0, px_per_radian=500.0):
+    """
+    게인 조합별 차선 추종 시뮬레이션 (입력은 같은 길이의 배열, 조합 축으로 동시에 계산)
+    - 0 ~ step_time: 직선 차선에서 initial_offset(px)만큼 벗어난 상태로 출발 (오버슈트, 정착 시간)
+    - step_time 이후: 곡률이 사인파로 바뀌는 차선 추종 (RMS 추종 오차)
+    제어는 fps 주기로 latency(초) 전 오프셋을 pixel_step 단위로 읽어 AutonomousDriving.control과
+    같은 PID/조향 제한/감속을 계산하고, 바퀴 명령은 motor_step(PWM 분해능) 단위로 양자화
+    운동 모델은 lane_state.LaneStateEstimator와 같은 이미지 좌표계 (오프셋 px, 방향 px/행, 곡률 px/행^2)이고
+    회전에 따른 차선 이동은 칼만 예측과 같은 lane_state.steering_shift() 사용
+    반환값: 지표 이름 → 길이 N 배열 (차선을 잃은 조합은 lost=True, 오차는 inf)
+    """
+    kp, ki, kd, base_speed = np.broadcast_arrays(*(np.asarray(v, dtype=np.float64) for v in (kp, ki, kd, base_speed)))
+    n = kp.size
+
+    steps = int(round(duration / dt))
+    step_steps = int(round(step_time / dt))
+    control_every = max(1, int(round(1.0 / (fps * dt))))
+    control_dt = control_every * dt
+    delay_steps = int(round(latency / dt))
+
+    # 지난 오프셋 링 버퍼 (카메라 지연)
+    history = np.full((delay_steps + 1, n), initial_offset)
+
+    offset = np.full(n, initial_offset)
+    heading = np.zeros(n)
+    distance = np.zeros(n)
+    curve_start = np.zeros(n)
+    linear = np.zeros(n)
+    angular = np.zeros(n)
+    lost = np.zeros(n, dtype=bool)
+
+    # PID 상태 (PIDController와 같이 prev_error=0에서 시작)
+    integral = np.zeros(n)
+    prev_error = np.zeros(n)
+
+    # 지표
+    direction = np.sign(initial_offset) or 1.0
+    overshoot = np.zeros(n)
+    settling_time = np.zeros(n)
+    squared_error = np.zeros(n)
+    curve_steps = 0
+
+    for i in range(steps):
+        t = i * dt
+        history[i % (delay_steps + 1)] = offset
+
+        if i % control_every == 0:
+            # latency 전 프레임에서 검출한 차선 중앙 (픽셀 양자화)
+            measured = np.round(history[(i + 1) % (delay_steps + 1)] / pixel_step) * pixel_step
+            lost |= np.abs(measured) > lost_offset
+
+            error = -measured
+            integral += error * control_dt
+            steering = kp * error + ki * integral + kd * (error - prev_error) / control_dt
+            prev_error = error
+            np.clip(steering, -max_steering, max_steering, out=steering)
+
+            command_linear = base_speed * (1.0 - np.abs(steering) * 0.5)
+            command_angular = -steering
+
+            # 차동 구동 바퀴 명령 양자화 (JetBotController.move와 같은 좌/우 계산)
+            left = np.round(np.clip(command_linear - command_angular, -1.0, 1.0) / motor_step) * motor_step
+            right = np.round(np.clip(command_linear + command_angular, -1.0, 1.0) / motor_step) * motor_step
+            linear = np.where(lost, 0.0, (left + right) / 2)
+            angular = np.where(lost, 0.0, (right - left) / 2)
+
+        if i == step_steps:
+            curve_start = distance.copy()
+
+        # 앞으로 간 거리만큼 차선 방향/곡률에 따라 오프셋 변화, 회전은 화면 속 차선을 가로로 이동
+        travel = linear * rows_per_speed * dt
+        if i >= step_steps:
+            curvature = curve_amplitude * np.sin(2 * np.pi * (distance - curve_start) / curve_period)
+            offset += heading * travel + 0.5 * curvature * travel * travel
+            heading += curvature * travel
+        else:
+            offset += heading * travel
+        shift, rotation = steering_shift(angular, dt, rad_per_angular, px_per_radian)
+        offset += shift
+        heading += rotation
+        distance += travel
+
+        if i < step_steps:
+            np.maximum(overshoot, -direction * offset, out=overshoot)
+            outside = np.abs(offset) > settle_band
+            settling_time[outside] = t + dt
+        else:
+            squared_error += offset * offset
+            curve_steps += 1
+
+    rms_error = np.sqrt(squared_error / max(curve_steps, 1))
+    rms_error[lost] = np.inf
+    return {
+        "rms_error_px": rms_error,
+        "overshoot_px": overshoot,
+        "settling_time_s": settling_time,
+        "settled": settling_time < step_time,
+        "mean_speed": distance / (rows_per_speed * duration),
+        "lost": lost
+    }
+
+def score(metrics, overshoot_weight=0.5, settle_weight=10.0):
+    """순위 점수 (낮을수록 좋음): RMS 오차 + 오버슈트(px) 가중치 + 정착 시간(초) 가중치"""
+    result = metrics["rms_error_px"] + overshoot_weight * metrics["overshoot_px"] \
+        + settle_weight * metrics["settling_time_s"]
+    return np.where(metrics["lost"], np.inf, result)
+
+def describe(gains, metrics, scores, index):
+    """결과 한 줄"""
+    if metrics["lost"][index]:
+        return (f"{gains['kp'][index]:>9.5f} {gains['ki'][index]:>8.4f} {gains['kd'][index]:>8.4f} "
+                f"{gains['base_speed'][index]:>6.2f}  차선 이탈")
+    settle = f"{metrics['settling_time_s'][index]:.2f}" if metrics["settled"][index] else "미수렴"
+    return (f"{gains['kp'][index]:>9.5f} {gains['ki'][index]:>8.4f} {gains['kd'][index]:>8.4f} "
+            f"{gains['base_speed'][index]:>6.2f} {metrics['rms_error_px'][index]:>8.1f} "
+            f"{metrics['overshoot_px'][index]:>8.1f} {settle:>8} {scores[index]:>8.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="조향 PID 게인 탐색 (차동 구동 차선 추종 시뮬레이션)")
+    parser.add_argument("--kp", type=float, nargs="+", help="kp 후보 (기본: 1e-4 ~ 1 로그 간격 17개)")
+    parser.add_argument("--ki", type=float, nargs="+", help="ki 후보")
+    parser.add_argument("--kd", type=float, nargs="+", help="kd 후보")
+    parser.add_argument("--speeds", type=float, nargs="+", help="base_speed 후보")
+    parser.add_argument("--fps", type=float, default=30.0, help="카메라/제어 주기 (기본 30)")
+    parser.add_argument("--latency", type=float, default=60.0, metavar="MS",
+                        help="캡처부터 모터 명령까지 지연 (기본 60ms, latency_*.json의 capture->motor 참고)")
+    parser.add_argument("--offset", type=float, default=80.0, metavar="PX", help="출발 오프셋 (기본 80px)")
+    parser.add_argument("--duration", type=float, default=16.0, help="시뮬레이션 시간 (초)")
+    parser.add_argument("--top", type=int, default=15, help="출력할 상위 조합 수")
+    parser.add_argument("--output", metavar="FILE", help="가장 좋은 조합을 저장할 JSON 파일")
+    args = parser.parse_args()
+
+    grid = dict(DEFAULT_GRID)
+    for name, values in (("kp", args.kp), ("ki", args.ki), ("kd", args.kd), ("base_speed", args.speeds)):
+        if values:
+            grid[name] = values
+
+    gains = gain_grid(grid)
+    count = len(gains["kp"])
+
+    # 현재 설정도 같이 평가해 비교
+    for name, value in CURRENT_GAINS.items():
+        gains[name] = np.append(gains[name], value)
+
+    options = dict(duration=args.duration, fps=args.fps, latency=args.latency / 1000.0, initial_offset=args.offset)
+    print(f"조합 {count}개 시뮬레이션 ({args.duration:.0f}초, {args.fps:.0f}FPS, 지연 {args.latency:.0f}ms)")
+    start_time = time.perf_counter()
+    metrics = simulate(gains["kp"], gains["ki"], gains["kd"], gains["base_speed"], **options)
+    print(f"완료: {time.perf_counter() - start_time:.2f}초")
+
+    scores = score(metrics)
+    order = np.argsort(scores[:count], kind="stable")
+    header = f"{'kp':>9} {'ki':>8} {'kd':>8} {'속도':>6} {'RMS px':>8} {'오버슈트':>8} {'정착 s':>8} {'점수':>8}"
+
+    print(f"\n상위 {min(args.top, count)}개 (차선 이탈 {int(metrics['lost'][:count].sum())}개)")
+    print(header)
+    for index in order[:args.top]:
+        print(describe(gains, metrics, scores, index))
+
+    print("\n속도별 최적")
+    print(header)
+    for speed in sorted(set(grid["base_speed"])):
+        candidates = order[gains["base_speed"][order] == speed]
+        if len(candidates):
+            print(describe(gains, metrics, scores, candidates[0]))
+
+    print("\n현재 설정")
+    print(header)
+    print(describe(gains, metrics, scores, count))
+
+    if args.output:
+        best = order[0]
+        result = {name: float(gains[name][best]) for name in CURRENT_GAINS}
+        result.update({name: (bool(values[best]) if values.dtype == bool else float(values[best]))
+                       for name, values in metrics.items()})
+        result["score"] = float(scores[best])
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\n저장됨: {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+파이프라인 실행 도구
+단계 사이를 깊이 1 최신값 큐로 연결해 느린 단계가 앞 단계를 막지 않고,
+각 단계는 항상 가장 최근 값만 처리 (밀린 값은 버림)
+"""
+
+import time
+import threading
+
+class LatestValue:
+    """
+    깊이 1 최신값 큐 (소비자 하나)
+    put()은 기다리지 않고 아직 가져가지 않은 값을 덮어쓰며, get()은 새 값이 올 때까지 대기
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._value = None
+        self._pending = False
+        self._closed = False
+
+        # 통계
+        self.put_count = 0
+        self.dropped = 0
+
+    def put(self, value):
+        """
+        값 교체 (블로킹 없음)
+        반환값: 소비되지 않고 밀려난 이전 값 (버퍼 재사용용, 없으면 None)
+        """
+        with self._cond:
+            displaced = self._value if self._pending else None
+            if self._pending:
+                self.dropped += 1
+            self._value = value
+            self._pending = True
+            self.put_count += 1
+            self._cond.notify()
+        return displaced
+
+    def get(self, timeout=None):
+        """새 값 가져오기 (timeout 동안 없거나 닫히면 None)"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._pending or self._closed, timeout):
+                return None
+            if not self._pending:
+                return None
+            value = self._value
+            self._value = None
+            self._pending = False
+            return value
+
+    def close(self):
+        """대기 중인 소비자를 깨우고 이후 get()은 남은 값 이후 None"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+class PipelineStage:
+    """
+    단계 스레드
+    source가 있으면 새 값마다 work(value), 없으면 work()를 반복 호출 (work가 직접 대기)
+    work가 False를 반환하거나 예외가 나면 stop_event를 설정해 전체 파이프라인 정지
+    """
+
+    def __init__(self, name, work, stop_event, source=None, poll_interval=0.1):
+        self.name = name
+        self.work = work
+        self.stop_event = stop_event
+        self.source = source
+        self.poll_interval = poll_interval
+
+        # 통계 (처리 횟수와 처리에 쓴 시간)
+        self.iterations = 0
+        self.busy_time = 0.0
+        self.error = None
+
+        self._thread = None
+        self._start_time = None
+
+    def start(self):
+        self._start_time = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name=f"pipeline-{self.name}", daemon=True)
+        self._thread.start()
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        try:
+            while not self.stop_event.is_set():
+                if self.source is not None:
+                    value = self.source.get(self.poll_interval)
+                    if value is None:
+                        continue
+                    t0 = time.perf_counter()
+                    result = self.work(value)
+                else:
+                    t0 = time.perf_counter()
+                    result = self.work()
+
+                self.busy_time += time.perf_counter() - t0
+                self.iterations += 1
+                if result is False:
+                    break
+        except Exception as e:
+            self.error = e
+            print(f"파이프라인 {self.name} 단계 오류: {e}")
+        finally:
+            self.stop_event.set()
+
+    def stats(self):
+        """처리율(Hz), 처리 1회 평균 시간(ms), 가동률"""
+        elapsed = time.perf_counter() - self._start_time if self._start_time else 0.0
+        rate = self.iterations / elapsed if elapsed > 0 else 0.0
+        mean_ms = self.busy_time / self.iterations * 1000.0 if self.iterations else 0.0
+        utilization = self.busy_time / elapsed if elapsed > 0 else 0.0
+        return rate, mean_ms, utilization
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+주행 세션 녹화기
+제어 루프는 프레임과 조향/속도를 큐에 넣기만 하고, 인코딩은 별도 스레드에서 처리
+큐가 가득 차면 기다리지 않고 프레임을 버림
+"""
+
+import os
+import csv
+import time
+import queue
+import threading
+import cv2
+import numpy as np
+
+INDEX_FILENAME = "index.csv"
+INDEX_FIELDS = ("frame", "chunk", "chunk_frame", "seq", "timestamp", "linear_speed", "angular_speed")
+
+class SessionRecorder:
+    """MJPEG 청크 + 프레임 인덱스 녹화기"""
+
+    def __init__(self, output_dir="recordings", fps=30, chunk_frames=900, queue_size=32, fourcc="MJPG"):
+        self.output_dir = output_dir
+        self.fps = fps
+        self.chunk_frames = chunk_frames
+        self.queue_size = queue_size
+        self.fourcc = fourcc
+
+        self.session_dir = None
+        self.is_recording = False
+
+        # 미리 할당한 프레임 버퍼 풀 (start()에 크기를 주면 그때, 아니면 기록 스레드가 첫 프레임 크기로 생성)
+        # 해상도가 바뀌면 기록 스레드가 이전 크기 프레임을 모두 쓴 뒤 새 크기로 다시 할당
+        self._free = queue.Queue()
+        self._pending = queue.Queue(maxsize=queue_size)
+        self._buffer_format = None
+        self._pool_format = None
+        self._writer_thread = None
+
+        # 통계
+        self.recorded_frames = 0
+        self.written_frames = 0
+        self.dropped_frames = 0
+        self.record_time_total = 0.0
+        self.record_time_max = 0.0
+
+    def start(self, frame_shape=None, dtype=np.uint8):
+        """
+        새 세션 디렉토리를 만들고 기록 스레드 시작
+        frame_shape: 기록할 프레임 크기를 알면 버퍼 풀을 여기서 미리 할당 (제어 루프의 첫 기록이 느려지지 않도록)
+        """
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        self.session_dir = os.path.join(self.output_dir, f"session_{timestamp}")
+        os.makedirs(self.session_dir, exist_ok=True)
+
+        if frame_shape is not None:
+            self._allocate_buffers(tuple(frame_shape), np.dtype(dtype))
+            self._buffer_format = self._pool_format
+
+        self.is_recording = True
+        self._writer_thread = threading.Thread(target=self._writer_loop, name="SessionRecorder", daemon=True)
+        self._writer_thread.start()
+
+        print(f"주행 녹화 시작: {self.session_dir}")
+        return True
+
+    def _allocate_buffers(self, shape, dtype):
+        """버퍼 풀을 주어진 크기로 다시 생성 (이전 크기 버퍼는 버림, 페이지를 미리 채워 첫 복사가 느리지 않게)"""
+        while True:
+            try:
+                self._free.get_nowait()
+            except queue.Empty:
+                break
+        for _ in range(self.queue_size + 2):
+            self._free.put(np.full(shape, 0, dtype=dtype))
+        self._pool_format = (shape, dtype)
+
+    def record(self, frame, linear_speed, angular_speed, seq=None, timestamp=None):
+        """
+        프레임과 제어 출력 기록 요청 (블로킹 없음)
+        해상도가 바뀐 프레임은 사본으로 보내고, 기록 스레드가 새 크기 버퍼 풀을 할당할 때까지 사본 사용
+        반환값: 큐에 들어갔으면 True, 버려졌으면 False
+        """
+        if not self.is_recording:
+            return False
+
+        t0 = time.perf_counter()
+
+        frame_format = (frame.shape, frame.dtype)
+        self._buffer_format = frame_format
+
+        buffer = None
+        pooled = False
+        if frame_format == self._pool_format:
+            try:
+                buffer = self._free.get_nowait()
+                pooled = True
+            except queue.Empty:
+                pass
+            if buffer is not None and buffer.shape != frame.shape:
+                # 기록 스레드가 아직 비우지 않은 이전 크기 버퍼
+                buffer = None
+        else:
+            # 새 크기 버퍼 풀이 준비되기 전 (해상도 변경 직후 몇 프레임)
+            buffer = np.empty_like(frame)
+
+        accepted = False
+        if buffer is not None:
+            np.copyto(buffer, frame)
+            if timestamp is None:
+                timestamp = time.monotonic()
+            try:
+                self._pending.put_nowait((buffer, pooled, seq, timestamp, linear_speed, angular_speed))
+                accepted = True
+            except queue.Full:
+                if pooled:
+                    self._free.put_nowait(buffer)
+
+        if accepted:
+            self.recorded_frames += 1
+        else:
+            self.dropped_frames += 1
+
+        elapsed = time.perf_counter() - t0
+        self.record_time_total += elapsed
+        self.record_time_max = max(self.record_time_max, elapsed)
+        return accepted
+
+    def _open_chunk(self, chunk, frame_shape):
+        """새 영상 청크 파일 열기"""
+        height, width = frame_shape[:2]
+        path = os.path.join(self.session_dir, f"chunk_{chunk:04d}.avi")
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*self.fourcc), self.fps,
+                                 (width, height), len(frame_shape) == 3)
+        if not writer.isOpened():
+            print(f"녹화 파일을 열 수 없습니다: {path}")
+        return writer
+
+    def _writer_loop(self):
+        """큐에서 프레임을 꺼내 인코딩 및 인덱스 기록"""
+        writer = None
+        chunk = -1
+        chunk_frame = 0
+        chunk_shape = None
+
+        with open(os.path.join(self.session_dir, INDEX_FILENAME), 'w', newline='') as index_file:
+            index = csv.writer(index_file)
+            index.writerow(INDEX_FIELDS)
+
+            while True:
+                item = self._pending.get()
+                if item is None:
+                    break
+
+                buffer, pooled, seq, timestamp, linear_speed, angular_speed = item
+                try:
+                    frame_format = (buffer.shape, buffer.dtype)
+                    if frame_format != self._pool_format and frame_format == self._buffer_format:
+                        # 이전 크기 프레임은 큐 순서대로 모두 기록됐으므로 새 크기로 버퍼 풀 재할당
+                        self._allocate_buffers(*frame_format)
+
+                    # 청크 단위로 파일 분할 (해상도가 바뀌어도 새 청크)
+                    if writer is None or chunk_frame >= self.chunk_frames or buffer.shape != chunk_shape:
+                        if writer is not None:
+                            writer.release()
+                        chunk += 1
+                        chunk_frame = 0
+                        chunk_shape = buffer.shape
+                        writer = self._open_chunk(chunk, chunk_shape)
+
+                    writer.write(buffer)
+                    index.writerow((self.written_frames, chunk, chunk_frame, seq,
+                                    f"{timestamp:.6f}", f"{linear_speed:.4f}", f"{angular_speed:.4f}"))
+                    chunk_frame += 1
+                    self.written_frames += 1
+
+                except Exception as e:
+                    print(f"녹화 프레임 기록 실패: {e}")
+
+                finally:
+                    if pooled and (buffer.shape, buffer.dtype) == self._pool_format:
+                        self._free.put(buffer)
+
+        if writer is not None:
+            writer.release()
+
+    def stop(self):
+        """남은 프레임을 모두 기록하고 종료"""
+        if not self.is_recording:
+            return
+
+        self.is_recording = False
+        self._pending.put(None)
+        if self._writer_thread is not None:
+            self._writer_thread.join()
+            self._writer_thread = None
+
+        total = self.recorded_frames + self.dropped_frames
+        avg_ms = self.record_time_total / total * 1000 if total else 0.0
+        print(f"주행 녹화 종료: {self.session_dir}")
+        print(f"기록 프레임: {self.written_frames}, 버린 프레임: {self.dropped_frames}, "
+              f"제어 루프 비용: 평균 {avg_ms:.3f}ms, 최대 {self.record_time_max * 1000:.3f}ms")
@@ -11,6 +11,7 @@ import json
 import os
 import sys
 import base64
+import argparse
 from io import BytesIO
 
 try:
@@ -194,8 +195,9 @@ class VisionLanguageModel:
 class IntelligentJetBot:
     """AI 기반 JetBot 제어 시스템"""
     
-    def __init__(self, model_type="mock"):
-        self.camera = JetBotCamera()
+    def __init__(self, model_type="mock", camera=None, stream=None):
+        # camera: JetBotCamera 또는 frame_bus.FrameSubscriber
+        self.camera = camera if camera is not None else JetBotCamera()
         self.controller = JetBotController()
         self.vlm = VisionLanguageModel(model_type)
         
@@ -206,6 +208,14 @@ class IntelligentJetBot:
         # 행동 이력
         self.action_history = []
         self.max_history = 10
+        
+        # 화면 표시용 버퍼 (프레임마다 새로 할당하지 않도록 재사용)
+        self._info_frame = None
+        
+        # 원격 화면 스트리밍 (mjpeg_server.MJPEGServer, 선택)
+        # show_window=False면 로컬 창 없이 스트림으로만 확인 (헤드리스, Ctrl+C로 종료)
+        self.stream = stream
+        self.show_window = True
     
     def initialize(self):
         """시스템 초기화"""
@@ -219,6 +229,9 @@ class IntelligentJetBot:
             print("하드웨어 초기화 실패!")
             return False
         
+        if self.stream is not None and not self.stream.is_running:
+            self.stream.start()
+        
         print("AI JetBot 초기화 완료!")
         return True
     
@@ -305,7 +318,7 @@ class IntelligentJetBot:
                 # 디버그 정보 표시
                 self._display_ai_info(frame, result)
                 
-                key = cv2.waitKey(1) & 0xFF
+                key = self._wait_key()
                 if key == 27:  # ESC
                     break
                 elif key == ord('s'):  # 일시정지
@@ -324,14 +337,17 @@ class IntelligentJetBot:
         print("=== AI 대화형 모드 ===")
         print("카메라 이미지를 보고 질문하세요")
         
+        if not self.show_window:
+            print("창 없이 실행 중이라 키 입력을 받을 수 없습니다 (스트림 확인만 가능, Ctrl+C로 종료)")
+        
         try:
             while True:
                 ret, frame = self.camera.read_frame()
                 
                 if ret:
-                    cv2.imshow('AI JetBot Camera', frame)
+                    self._show('AI JetBot Camera', frame)
                     
-                    key = cv2.waitKey(1) & 0xFF
+                    key = self._wait_key()
                     if key == ord('q'):
                         break
                     elif key == ord(' '):  # 스페이스바로 분석
@@ -358,11 +374,14 @@ class IntelligentJetBot:
             print("사용자에 의해 중단됨")
         
         finally:
-            cv2.destroyAllWindows()
+            self._close_windows()
     
     def _display_ai_info(self, frame, result):
         """AI 정보 표시"""
-        info_frame = frame.copy()
+        if self._info_frame is None or self._info_frame.shape != frame.shape:
+            self._info_frame = np.empty_like(frame)
+        info_frame = self._info_frame
+        np.copyto(info_frame, frame)
         
         # 기본 정보
         cv2.putText(info_frame, "AI JetBot", (10, 30), 
@@ -393,14 +412,33 @@ class IntelligentJetBot:
             cv2.putText(info_frame, f"History: {len(self.action_history)} actions", 
                        (10, 160), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1)
         
-        cv2.imshow('AI JetBot Control', info_frame)
+        self._show('AI JetBot Control', info_frame)
+    
+    def _show(self, window_name, frame):
+        """화면 표시 및 스트림 발행"""
+        if self.stream is not None:
+            self.stream.publish(frame)
+        if self.show_window:
+            cv2.imshow(window_name, frame)
+    
+    def _wait_key(self):
+        """키 입력 확인 (창이 없으면 키 입력 없음)"""
+        if not self.show_window:
+            return 0xFF
+        return cv2.waitKey(1) & 0xFF
+    
+    def _close_windows(self):
+        if self.show_window:
+            cv2.destroyAllWindows()
     
     def cleanup(self):
         """리소스 정리"""
         self.is_running = False
         self.controller.cleanup()
         self.camera.release()
-        cv2.destroyAllWindows()
+        self._close_windows()
+        if self.stream is not None:
+            self.stream.stop()
         
         # 행동 이력 저장
         if self.action_history:
@@ -434,8 +472,33 @@ def setup_ollama():
     print("4. 모델 확인:")
     print("   ollama list")
 
+def create_jetbot(model_type, args):
+    """명령행 옵션(--stream, --no-window, --bus)을 적용한 AI JetBot 생성"""
+    camera = None
+    if args.bus is not None:
+        from frame_bus import FrameSubscriber
+        camera = FrameSubscriber(args.bus)
+    
+    stream = None
+    if args.stream is not None:
+        from mjpeg_server import MJPEGServer
+        stream = MJPEGServer(port=args.stream)
+    
+    jetbot = IntelligentJetBot(model_type, camera, stream)
+    jetbot.show_window = not args.no_window
+    return jetbot
+
 def main():
     """메인 함수"""
+    parser = argparse.ArgumentParser(description="JetBot AI 통합 시스템")
+    parser.add_argument("--stream", type=int, nargs="?", const=8080, metavar="PORT",
+                        help="AI 화면을 HTTP MJPEG로 스트리밍 (기본 포트 8080)")
+    parser.add_argument("--no-window", action="store_true",
+                        help="로컬 창을 띄우지 않음 (헤드리스, --stream과 함께 사용)")
+    parser.add_argument("--bus", nargs="?", const="jetbot_frames", metavar="NAME",
+                        help="카메라 대신 공유 메모리 프레임 버스 구독 (frame_bus.py 발행자 필요)")
+    args = parser.parse_args()
+    
     print("JetBot AI 통합 시스템")
     print("1. AI 자율 주행")
     print("2. AI 대화형 모드")
@@ -447,13 +510,13 @@ def main():
         
         if choice == "1":
             model_type = input("모델 타입 (local/mock) [mock]: ").strip() or "mock"
-            jetbot = IntelligentJetBot(model_type)
+            jetbot = create_jetbot(model_type, args)
             if jetbot.initialize():
                 jetbot.run_autonomous_mode()
         
         elif choice == "2":
             model_type = input("모델 타입 (local/mock) [mock]: ").strip() or "mock"
-            jetbot = IntelligentJetBot(model_type)
+            jetbot = create_jetbot(model_type, args)
             if jetbot.initialize():
                 jetbot.interactive_mode()
         
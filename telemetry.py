@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+주행 텔레메트리 기록기
+프레임마다 차선 중앙/제어 명령/지연을 JSONL 또는 고정 길이 바이너리 레코드로 기록
+기록은 전용 스레드가 하므로 주행 루프는 큐에 넣기만 함 (가득 차면 버림)
+출력 맨 앞에 형식 헤더를 써서 읽는 쪽이 파일 이름과 상관없이 형식을 알 수 있음
+"""
+
+import os
+import json
+import time
+import queue
+import threading
+import numpy as np
+
+# 바이너리 레코드 (리틀 엔디언 36바이트)
+TELEMETRY_DTYPE = np.dtype([
+    ("seq", "<i8"),           # 카메라 프레임 순번
+    ("capture_time", "<f8"),  # 캡처 시각 (time.monotonic)
+    ("latency_ms", "<f4"),    # 캡처 → 모터 명령
+    ("lane_center", "<f4"),   # 차선 중앙 x (못 찾으면 NaN)
+    ("linear", "<f4"),
+    ("angular", "<f4"),
+    ("flags", "<u4")          # FLAG_* 비트
+])
+
+# 형식 헤더: 바이너리는 8바이트 매직 뒤에 레코드, JSONL은 첫 줄이 헤더 객체
+BINARY_MAGIC = b"JBTLM001"
+JSONL_HEADER = {"telemetry": "jetbot", "version": 1}
+
+FLAG_DETECTED = 1
+FLAG_MOTORS = 2
+FLAG_DEBUG = 4
+
+class TelemetryWriter:
+    """
+    텔레메트리 기록기
+    output: 파일 경로 또는 바이너리 쓰기 스트림 (예: sys.stdout.buffer)
+    fmt: 'jsonl' 또는 'binary' (TELEMETRY_DTYPE 레코드 연속)
+    """
+
+    def __init__(self, output, fmt="jsonl", queue_size=256):
+        if fmt not in ("jsonl", "binary"):
+            raise ValueError(f"지원하지 않는 텔레메트리 형식: {fmt}")
+
+        self.output = output
+        self.fmt = fmt
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stream = None
+        self._owns_stream = False
+        self._thread = None
+        self._record = np.zeros(1, dtype=TELEMETRY_DTYPE)
+
+        # 통계
+        self.written = 0
+        self.dropped = 0
+
+    def start(self):
+        """출력 열기, 형식 헤더 기록 및 기록 스레드 시작"""
+        write_header = True
+        if isinstance(self.output, str):
+            # 기존 파일에 이어 쓸 때는 같은 형식일 때만 헤더 없이 추가
+            if os.path.exists(self.output) and os.path.getsize(self.output) > 0:
+                existing = detect_format(self.output)
+                if existing != self.fmt:
+                    print(f"텔레메트리 파일 형식이 다릅니다: {self.output} ({existing or '알 수 없음'}, 요청 {self.fmt})")
+                    return False
+                write_header = False
+            try:
+                self._stream = open(self.output, "ab")
+            except OSError as e:
+                print(f"텔레메트리 파일 열기 실패: {e}")
+                return False
+            self._owns_stream = True
+        else:
+            self._stream = self.output
+
+        if write_header:
+            try:
+                self._stream.write(self._header())
+                self._stream.flush()
+            except (OSError, ValueError) as e:
+                print(f"텔레메트리 헤더 기록 실패: {e}")
+                if self._owns_stream:
+                    self._stream.close()
+                return False
+
+        self._thread = threading.Thread(target=self._write_loop, name="telemetry", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        """남은 레코드를 기록하고 종료"""
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(None, timeout=1.0)
+        except queue.Full:
+            pass
+        self._thread.join(2.0)
+        self._thread = None
+
+        if self._owns_stream:
+            self._stream.close()
+        print(f"텔레메트리: 기록 {self.written}개, 버림 {self.dropped}개")
+
+    def emit(self, seq, capture_time, lane_center, linear, angular, flags=0):
+        """레코드 하나 기록 요청 (블로킹 없음)"""
+        if self._thread is None:
+            return False
+
+        now = time.monotonic()
+        record = (seq, capture_time, (now - capture_time) * 1000.0,
+                  float("nan") if lane_center is None else lane_center, linear, angular, flags)
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _header(self):
+        if self.fmt == "binary":
+            return BINARY_MAGIC
+        header = dict(JSONL_HEADER, format="jsonl")
+        return (json.dumps(header, separators=(",", ":")) + "\n").encode("utf-8")
+
+    def _encode(self, record):
+        if self.fmt == "binary":
+            self._record[0] = record
+            return self._record.tobytes()
+
+        seq, capture_time, latency_ms, lane_center, linear, angular, flags = record
+        return (json.dumps({
+            "seq": int(seq),
+            "t": round(capture_time, 4),
+            "latency_ms": round(latency_ms, 2),
+            "lane_center": None if lane_center != lane_center else round(lane_center, 1),
+            "linear": round(linear, 3),
+            "angular": round(angular, 3),
+            "flags": int(flags)
+        }, separators=(",", ":")) + "\n").encode("utf-8")
+
+    def _write_loop(self):
+        try:
+            while True:
+                record = self._queue.get()
+                if record is None:
+                    break
+                self._stream.write(self._encode(record))
+                self.written += 1
+
+                # 밀린 레코드가 없을 때만 flush (받는 쪽이 바로 읽을 수 있도록)
+                if self._queue.empty():
+                    self._stream.flush()
+        except (OSError, ValueError) as e:
+            print(f"텔레메트리 기록 중단: {e}")
+
+def detect_format(filename):
+    """파일 앞부분의 헤더로 형식 판별 (반환값: 'binary', 'jsonl' 또는 헤더가 없으면 None)"""
+    with open(filename, "rb") as f:
+        head = f.readline(256)
+    if head.startswith(BINARY_MAGIC):
+        return "binary"
+    try:
+        header = json.loads(head)
+    except ValueError:
+        return None
+    if isinstance(header, dict) and header.get("telemetry") == JSONL_HEADER["telemetry"]:
+        return header.get("format", "jsonl")
+    return None
+
+def read_telemetry(filename, fmt=None):
+    """
+    텔레메트리 파일 읽기 (형식은 TelemetryWriter가 쓴 헤더로 판별)
+    fmt: 헤더가 없는 파일의 형식 ('jsonl' 또는 'binary')
+    반환값: TELEMETRY_DTYPE 구조체 배열 (JSONL 파일도 같은 형태로 변환)
+    """
+    detected = detect_format(filename)
+    if detected is None and fmt is None:
+        raise ValueError(f"텔레메트리 형식 헤더가 없습니다: {filename} (fmt로 형식 지정)")
+    fmt = detected or fmt
+
+    if fmt == "binary":
+        offset = len(BINARY_MAGIC) if detected else 0
+        return np.fromfile(filename, dtype=TELEMETRY_DTYPE, offset=offset)
+
+    rows = []
+    with open(filename, "r", encoding="utf-8") as f:
+        for line in f:
+            r = json.loads(line)
+            if "telemetry" in r:
+                continue
+            lane_center = r["lane_center"] if r["lane_center"] is not None else float("nan")
+            rows.append((r["seq"], r["t"], r["latency_ms"], lane_center, r["linear"], r["angular"], r["flags"]))
+    return np.array(rows, dtype=TELEMETRY_DTYPE)
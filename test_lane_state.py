@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+차선 상태 칼만 필터 예측 부호 확인
+제어기가 낸 명령으로 예측하면 차선 오프셋이 0 쪽으로 줄어야 함
+(pytest test_lane_state.py 또는 python3 test_lane_state.py)
+"""
+
+from autonomous_driving import AutonomousDriving
+from lane_state import LaneStateEstimator
+
+def _controller():
+    """카메라/모터 없이 control()만 쓰는 자율주행 객체"""
+    autonomous = AutonomousDriving(camera=object())
+    autonomous.frame_center = 320
+    return autonomous
+
+def test_predict_with_controller_command_reduces_offset():
+    for offset in (50.0, -50.0):
+        autonomous = _controller()
+        estimator = LaneStateEstimator()
+        estimator.update(offset, 0.0)
+
+        # 검출을 건너뛰는 프레임처럼 마지막 명령을 유지한 채 예측만 반복
+        command = autonomous.control(autonomous.frame_center + offset)
+        assert command[1] != 0.0
+
+        previous = abs(estimator.offset)
+        for _ in range(3):
+            estimator.predict(*command, 0.01)
+            assert abs(estimator.offset) < previous
+            previous = abs(estimator.offset)
+
+def test_pid_tuner_shares_estimator_model():
+    import numpy as np
+    from pid_tuner import simulate
+
+    # 지연 없는 비례 제어는 출발 오프셋을 줄여 정착해야 함 (칼만 예측과 같은 조향 부호)
+    metrics = simulate(np.array([0.005]), np.array([0.0]), np.array([0.0]), np.array([0.2]),
+                       duration=4.0, step_time=3.0, latency=0.0)
+    assert not metrics["lost"][0]
+    assert metrics["settled"][0]
+
+if __name__ == "__main__":
+    test_predict_with_controller_command_reduces_offset()
+    test_pid_tuner_shares_estimator_model()
+    print("통과")
@@ -12,12 +12,13 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import json
 import os
+import argparse
 from datetime import datetime
 
 class WindowsJetBot:
     """윈도우용 JetBot 시뮬레이션 클래스"""
     
-    def __init__(self):
+    def __init__(self, detector_name="hough", budget_ms=None):
         self.camera = None
         self.is_running = False
         self.current_mode = "idle"
@@ -26,6 +27,11 @@ class WindowsJetBot:
         self.lane_detection_active = False
         self.face_detection_active = False
         
+        # 차선 검출기 (로봇과 같은 lane_detectors 등록부 사용, "auto"면 시작할 때 측정해서 선택)
+        self.detector_name = detector_name
+        self.budget_ms = budget_ms
+        self.lane_detector = None
+        
         # PID 제어 변수
         self.pid_error = 0
         self.pid_integral = 0
@@ -65,40 +71,44 @@ class WindowsJetBot:
             print(f"❌ 카메라 초기화 실패: {e}")
             return False
     
+    def create_lane_detector(self):
+        """차선 검출기 생성 (자율주행과 같은 검출 코드)"""
+        import lane_detectors
+        
+        if self.detector_name == "auto":
+            height, width = 480, 640
+            if self.camera is not None and self.camera.isOpened():
+                width = int(self.camera.get(cv2.CAP_PROP_FRAME_WIDTH)) or width
+                height = int(self.camera.get(cv2.CAP_PROP_FRAME_HEIGHT)) or height
+            frames, truths = lane_detectors.synthetic_frames(30, width, height)
+            self.detector_name, detector = lane_detectors.select_detector(self.budget_ms, frames, truths,
+                                                                                synthetic=True)
+            return detector
+        
+        return lane_detectors.create_detector(self.detector_name)
+    
     def detect_lanes(self, frame):
         """차선 검출"""
-        # 그레이스케일 변환
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        
-        # 가우시안 블러
-        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
-        
-        # 엣지 검출
-        edges = cv2.Canny(blurred, 50, 150)
-        
-        # 관심 영역 설정 (하단 절반)
-        height, width = edges.shape
-        roi_vertices = np.array([
-            [(0, height), (width//2, height//2), (width, height)]
-        ], dtype=np.int32)
+        if self.lane_detector is None:
+            self.lane_detector = self.create_lane_detector()
         
-        mask = np.zeros_like(edges)
-        cv2.fillPoly(mask, roi_vertices, 255)
-        masked_edges = cv2.bitwise_and(edges, mask)
+        lane_center, lane_polys, roi, _ = self.lane_detector.get_lane_center(frame)
         
-        # 직선 검출
-        lines = cv2.HoughLinesP(masked_edges, 1, np.pi/180, 50, 
-                               minLineLength=100, maxLineGap=50)
-        
-        if lines is not None:
-            # 차선 그리기
-            for line in lines:
-                x1, y1, x2, y2 = line[0]
-                cv2.line(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
+        if lane_center is not None:
+            height, width = frame.shape[:2]
+            
+            # 차선 그리기 (ROI가 원본 프레임 하단을 자른 경우만, 버드아이뷰는 좌표계가 다름)
+            if roi.shape[1] == width:
+                roi_top = height - roi.shape[0]
+                for poly in lane_polys:
+                    if poly is not None:
+                        x1 = int(poly[0] * (roi.shape[0] - 1) + poly[1])
+                        x2 = int(poly[1])
+                        cv2.line(frame, (x1, height - 1), (x2, roi_top), (0, 255, 0), 2)
+            cv2.circle(frame, (int(lane_center), height - 10), 8, (0, 0, 255), -1)
             
             # 중앙선 계산
             center_x = width // 2
-            lane_center = np.mean([line[0][0] for line in lines])
             self.pid_error = center_x - lane_center
             
             # PID 제어
@@ -302,6 +312,9 @@ class WindowsJetBot:
                    (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
         cv2.putText(frame, f"Mode: {self.current_mode}", 
                    (10, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+        if self.current_mode == "lane":
+            cv2.putText(frame, f"Detector: {self.detector_name}", 
+                       (10, 120), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
         
         # OpenCV 이미지를 Tkinter용으로 변환
         frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
@@ -363,6 +376,14 @@ class WindowsJetBot:
 
 def main():
     """메인 함수"""
+    from lane_detectors import available_detectors
+    
+    parser = argparse.ArgumentParser(description="윈도우용 JetBot 시뮬레이션")
+    parser.add_argument("--detector", choices=available_detectors() + ["auto"], default="hough",
+                        help="차선 검출기 (autonomous_driving.py --detector와 같음)")
+    parser.add_argument("--budget", type=float, metavar="MS", help="--detector auto의 프레임당 검출 예산 (ms)")
+    args = parser.parse_args()
+    
     print("=" * 60)
     print("윈도우용 JetBot 시뮬레이션 시스템")
     print("=" * 60)
@@ -371,7 +392,7 @@ def main():
     print("Space: 정지")
     print("=" * 60)
     
-    jetbot = WindowsJetBot()
+    jetbot = WindowsJetBot(args.detector, args.budget)
     jetbot.run()
 
 if __name__ == "__main__":